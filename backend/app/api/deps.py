@@ -1,28 +1,48 @@
 from __future__ import annotations
 
+import hmac
+
 from fastapi import Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..core.database import get_db
+from ..core.async_database import get_async_db, get_async_read_db
+from ..core.database import get_db, get_read_db
+from ..core.scheduler import Scheduler
 from ..core.settings import settings
-from ..db.models import User
+from ..core.write_queue import WriteQueue
+from ..repositories.users import UserRecord
 from ..services.ai_service import AiService
 from ..services.auth_service import AuthService, OtpRateLimiter
 from ..services.delivery_service import DeliveryService
 from ..services.evotor_auth import EvotorWebhookAuth
 from ..services.evotor_service import EvotorService
 from ..services.errors import UnauthorizedError
+from ..services.leases import LeaseManager
+from ..services.maintenance_service import MaintenanceService
+from ..services.order_events import OrderEventBus
 from ..services.order_service import OrderService
 from ..services.rate_limiter import FixedWindowRateLimiter
+from ..services.readiness import ReadinessProbe
+from ..services.reporting_service import ReportingService
 from ..services.sms import SmsSender
+from ..services.warmup import StartupWarmup
+from ..utils.http import HttpTransport
 
 
 def get_sms_sender(request: Request) -> SmsSender:
     return request.app.state.sms_sender
 
 
-def get_otp_rate_limiter(db: Session = Depends(get_db)) -> OtpRateLimiter:
-    return OtpRateLimiter(db=db)
+def get_write_queue(request: Request) -> WriteQueue | None:
+    return request.app.state.write_queue
+
+
+def get_otp_rate_limiter(
+    db: Session = Depends(get_db),
+    writer: WriteQueue | None = Depends(get_write_queue),
+) -> OtpRateLimiter:
+    return OtpRateLimiter(db=db, writer=writer)
 
 
 def get_delivery_service(request: Request) -> DeliveryService:
@@ -41,25 +61,89 @@ def get_evotor_service(request: Request) -> EvotorService:
     return request.app.state.evotor_service
 
 
-def get_rate_limiter(db: Session = Depends(get_db)) -> FixedWindowRateLimiter:
-    return FixedWindowRateLimiter(db=db)
+def get_http_transport(request: Request) -> HttpTransport:
+    return request.app.state.http_transport
+
+
+def get_readiness(request: Request) -> ReadinessProbe:
+    return request.app.state.readiness
+
+
+def get_warmup(request: Request) -> StartupWarmup:
+    return request.app.state.warmup
+
+
+def get_scheduler(request: Request) -> Scheduler:
+    return request.app.state.scheduler
+
+
+def get_leases(request: Request) -> LeaseManager | None:
+    return request.app.state.leases
+
+
+def get_maintenance_service(request: Request) -> MaintenanceService:
+    return request.app.state.maintenance_service
+
+
+def get_order_events(request: Request) -> OrderEventBus:
+    return request.app.state.order_events
+
+
+def get_rate_limiter(
+    db: Session = Depends(get_db),
+    writer: WriteQueue | None = Depends(get_write_queue),
+    async_db: AsyncSession | None = Depends(get_async_db),
+) -> FixedWindowRateLimiter:
+    return FixedWindowRateLimiter(db=db, writer=writer, async_db=async_db)
 
 
 def get_auth_service(
     db: Session = Depends(get_db),
     sms_sender: SmsSender = Depends(get_sms_sender),
     rate_limiter: OtpRateLimiter = Depends(get_otp_rate_limiter),
+    writer: WriteQueue | None = Depends(get_write_queue),
+    read_db: Session = Depends(get_read_db),
+    async_read_db: AsyncSession | None = Depends(get_async_read_db),
 ) -> AuthService:
-    return AuthService(db=db, sms_sender=sms_sender, rate_limiter=rate_limiter)
-
-
-def get_order_service(db: Session = Depends(get_db)) -> OrderService:
-    return OrderService(db=db)
+    return AuthService(
+        db=db,
+        sms_sender=sms_sender,
+        rate_limiter=rate_limiter,
+        writer=writer,
+        read_db=read_db,
+        async_read_db=async_read_db,
+    )
 
 
-def require_user(request: Request, response: Response, auth_service: AuthService = Depends(get_auth_service)) -> User:
+def get_order_service(
+    db: Session = Depends(get_db),
+    evotor_service: EvotorService = Depends(get_evotor_service),
+    events: OrderEventBus = Depends(get_order_events),
+    writer: WriteQueue | None = Depends(get_write_queue),
+    read_db: Session = Depends(get_read_db),
+    async_read_db: AsyncSession | None = Depends(get_async_read_db),
+) -> OrderService:
+    return OrderService(
+        db=db,
+        catalog=evotor_service.catalog_index(),
+        events=events,
+        writer=writer,
+        read_db=read_db,
+        async_read_db=async_read_db,
+    )
+
+
+def get_reporting_service(db: Session = Depends(get_read_db)) -> ReportingService:
+    return ReportingService(db=db)
+
+
+async def require_user(
+    request: Request,
+    response: Response,
+    auth_service: AuthService = Depends(get_auth_service),
+) -> UserRecord:
     token = request.cookies.get(settings.session_cookie_name)
-    user, rotated_token = auth_service.authenticate_session(token)
+    user, rotated_token = await auth_service.authenticate_session_async(token)
     if not user:
         raise UnauthorizedError()
 
@@ -82,3 +166,13 @@ def require_evotor_webhook_auth(
 ) -> None:
     if not auth.is_authorized(request.headers.get('authorization')):
         raise UnauthorizedError()
+
+
+def require_admin(request: Request) -> None:
+    expected = settings.admin_api_token
+    header = (request.headers.get('authorization') or '').strip()
+    if header.lower().startswith('bearer '):
+        header = header[len('bearer ') :].strip()
+
+    if not expected or not hmac.compare_digest(header.encode('utf-8'), expected.encode('utf-8')):
+        raise UnauthorizedError()
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from fastapi import APIRouter
 
-from .routers import ai, auth, delivery, evotor, health, orders
+from .routers import admin, ai, auth, delivery, evotor, health, kitchen, orders
 
 api_router = APIRouter()
 api_router.include_router(health.router)
@@ -11,3 +11,5 @@ api_router.include_router(orders.router)
 api_router.include_router(delivery.router)
 api_router.include_router(evotor.router)
 api_router.include_router(ai.router)
+api_router.include_router(admin.router)
+api_router.include_router(kitchen.router)
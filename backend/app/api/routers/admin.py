@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Query
+
+from ...core.scheduler import Scheduler
+from ...core.write_queue import WriteQueue
+from ...services.evotor_service import EvotorService
+from ...services.leases import LeaseManager
+from ...services.maintenance_service import MaintenanceService
+from ...services.reporting_service import ReportingService
+from ...utils.http import HttpTransport
+from ..deps import (
+    get_evotor_service,
+    get_http_transport,
+    get_leases,
+    get_maintenance_service,
+    get_reporting_service,
+    get_scheduler,
+    get_write_queue,
+    require_admin,
+)
+
+router = APIRouter(prefix='/admin', dependencies=[Depends(require_admin)])
+
+
+@router.get('/metrics')
+def metrics(
+    transport: HttpTransport = Depends(get_http_transport),
+    evotor_service: EvotorService = Depends(get_evotor_service),
+    writer: WriteQueue | None = Depends(get_write_queue),
+    maintenance: MaintenanceService = Depends(get_maintenance_service),
+) -> dict[str, object]:
+    return {
+        'http': transport.metrics(),
+        'evotor': evotor_service.client.metrics(),
+        'writeQueue': writer.metrics() if writer is not None else None,
+        'expirySweep': maintenance.expiry_metrics(),
+    }
+
+
+@router.get('/jobs')
+def jobs(scheduler: Scheduler = Depends(get_scheduler)) -> dict[str, object]:
+    return scheduler.status()
+
+
+@router.get('/leases')
+def leases(lease_manager: LeaseManager | None = Depends(get_leases)) -> dict[str, object]:
+    if lease_manager is None:
+        return {'enabled': False, 'worker': None, 'leases': []}
+    return {'enabled': True, **lease_manager.snapshot()}
+
+
+@router.get('/reports/top-dishes')
+def top_dishes(
+    days: int = Query(default=30, ge=1, le=366),
+    limit: int = Query(default=10, ge=1, le=100),
+    reporting: ReportingService = Depends(get_reporting_service),
+) -> dict[str, object]:
+    return {'days': days, 'items': reporting.top_dishes(days=days, limit=limit)}
+
+
+@router.get('/reports/revenue')
+def revenue(
+    days: int = Query(default=30, ge=1, le=366),
+    reporting: ReportingService = Depends(get_reporting_service),
+) -> dict[str, object]:
+    return {'days': days, 'items': reporting.revenue_by_day(days=days)}
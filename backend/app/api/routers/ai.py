@@ -3,6 +3,7 @@ from __future__ import annotations
 import time
 
 from fastapi import APIRouter, Depends, Request
+from starlette.concurrency import run_in_threadpool
 
 from ...core.settings import settings
 from ...services.ai_service import AiService
@@ -15,7 +16,7 @@ router = APIRouter(prefix='/ai')
 
 
 @router.post('/recommendation')
-def recommendation(
+async def recommendation(
     payload: dict,
     request: Request,
     ai_service: AiService = Depends(get_ai_service),
@@ -30,7 +31,7 @@ def recommendation(
     client_ip = get_client_ip(request)
     now_ms = int(time.time() * 1000)
 
-    retry_after = limiter.consume(
+    retry_after = await limiter.consume_async(
         key=f'ai:recommendation:minute:{client_ip}',
         limit=settings.ai_max_requests_per_minute_ip,
         window_ms=60 * 1000,
@@ -39,7 +40,7 @@ def recommendation(
     if retry_after is not None:
         raise TooManyRequestsError(retry_after_ms=retry_after)
 
-    retry_after = limiter.consume(
+    retry_after = await limiter.consume_async(
         key=f'ai:recommendation:hour:{client_ip}',
         limit=settings.ai_max_requests_per_hour_ip,
         window_ms=60 * 60 * 1000,
@@ -51,7 +52,9 @@ def recommendation(
     history = payload.get('history') if isinstance(payload, dict) else []
     menu_items = payload.get('menuItems') if isinstance(payload, dict) else []
 
-    text = ai_service.recommendation(
+    # The Gemini client is blocking; keep it off the event loop.
+    text = await run_in_threadpool(
+        ai_service.recommendation,
         message=message,
         history=history if isinstance(history, list) else [],
         menu_items=menu_items if isinstance(menu_items, list) else [],
@@ -60,7 +63,7 @@ def recommendation(
 
 
 @router.post('/address-zone')
-def ai_address_zone(
+async def ai_address_zone(
     payload: dict,
     request: Request,
     ai_service: AiService = Depends(get_ai_service),
@@ -75,7 +78,7 @@ def ai_address_zone(
     client_ip = get_client_ip(request)
     now_ms = int(time.time() * 1000)
 
-    retry_after = limiter.consume(
+    retry_after = await limiter.consume_async(
         key=f'ai:address-zone:minute:{client_ip}',
         limit=settings.ai_max_requests_per_minute_ip,
         window_ms=60 * 1000,
@@ -84,7 +87,7 @@ def ai_address_zone(
     if retry_after is not None:
         raise TooManyRequestsError(retry_after_ms=retry_after)
 
-    retry_after = limiter.consume(
+    retry_after = await limiter.consume_async(
         key=f'ai:address-zone:hour:{client_ip}',
         limit=settings.ai_max_requests_per_hour_ip,
         window_ms=60 * 60 * 1000,
@@ -93,4 +96,4 @@ def ai_address_zone(
     if retry_after is not None:
         raise TooManyRequestsError(retry_after_ms=retry_after)
 
-    return ai_service.address_zone(address=address_str)
+    return await run_in_threadpool(ai_service.address_zone, address=address_str)
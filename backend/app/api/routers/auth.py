@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, Request, Response
 
 from ...core.settings import settings
 from ...db.models import User
+from ...repositories.users import UserRecord
 from ...services.auth_service import AuthService
 from ...utils.network import get_client_ip
 from ...utils.time import isoformat_z
@@ -13,7 +14,7 @@ from ..schemas import ProfilePatchIn, RequestOtpIn, VerifyOtpIn
 router = APIRouter(prefix='/auth')
 
 
-def _serialize_user(user: User) -> dict[str, object]:
+def _serialize_user(user: User | UserRecord) -> dict[str, object]:
     return {
         'id': user.id,
         'phone': user.phone,
@@ -24,9 +25,9 @@ def _serialize_user(user: User) -> dict[str, object]:
 
 
 @router.get('/me')
-def me(request: Request, response: Response, auth_service: AuthService = Depends(get_auth_service)) -> dict[str, object]:
+async def me(request: Request, response: Response, auth_service: AuthService = Depends(get_auth_service)) -> dict[str, object]:
     token = request.cookies.get(settings.session_cookie_name)
-    user, rotated_token = auth_service.authenticate_session(token)
+    user, rotated_token = await auth_service.authenticate_session_async(token)
     if rotated_token:
         response.set_cookie(
             settings.session_cookie_name,
@@ -78,7 +79,7 @@ def verify_otp(payload: VerifyOtpIn, response: Response, auth_service: AuthServi
 @router.patch('/profile')
 def profile(
     payload: ProfilePatchIn,
-    user: User = Depends(require_user),
+    user: UserRecord = Depends(require_user),
     auth_service: AuthService = Depends(get_auth_service),
 ) -> dict[str, object]:
     updated = auth_service.update_profile(user, name_raw=payload.name)
@@ -3,6 +3,7 @@ from __future__ import annotations
 import time
 
 from fastapi import APIRouter, Depends, Request
+from starlette.concurrency import run_in_threadpool
 
 from ...core.settings import settings
 from ...services.delivery_service import DeliveryService
@@ -15,7 +16,7 @@ router = APIRouter(prefix='/delivery')
 
 
 @router.post('/address-zone')
-def address_zone(
+async def address_zone(
     payload: dict[str, object],
     request: Request,
     delivery_service: DeliveryService = Depends(get_delivery_service),
@@ -32,7 +33,7 @@ def address_zone(
     client_ip = get_client_ip(request)
     now_ms = int(time.time() * 1000)
 
-    retry_after = limiter.consume(
+    retry_after = await limiter.consume_async(
         key=f'delivery:address-zone:minute:{client_ip}',
         limit=settings.delivery_max_requests_per_minute_ip,
         window_ms=60 * 1000,
@@ -41,7 +42,7 @@ def address_zone(
     if retry_after is not None:
         raise TooManyRequestsError(retry_after_ms=retry_after)
 
-    retry_after = limiter.consume(
+    retry_after = await limiter.consume_async(
         key=f'delivery:address-zone:hour:{client_ip}',
         limit=settings.delivery_max_requests_per_hour_ip,
         window_ms=60 * 60 * 1000,
@@ -50,4 +51,5 @@ def address_zone(
     if retry_after is not None:
         raise TooManyRequestsError(retry_after_ms=retry_after)
 
-    return delivery_service.resolve_zone(address_str)
+    # Geocoding and routing calls are blocking HTTP; keep them off the event loop.
+    return await run_in_threadpool(delivery_service.resolve_zone, address_str)
@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+import json
+import logging
+from collections.abc import Iterator
+from typing import Any
+
 from fastapi import APIRouter, Depends, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from ...services.errors import ServiceError
 from ...services.evotor_service import EvotorService
@@ -9,6 +14,17 @@ from ..deps import get_evotor_service, require_evotor_webhook_auth
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
+
+def _parse_since(since_raw: str | None) -> str | int | None:
+    if since_raw is None:
+        return None
+    try:
+        return int(str(since_raw).strip())
+    except ValueError:
+        return str(since_raw).strip() or None
+
 
 @router.post('/v1/user/token')
 def evotor_user_token(request: Request, payload: dict, evotor_service: EvotorService = Depends(get_evotor_service)) -> JSONResponse:
@@ -67,13 +83,7 @@ def evotor_cloud_products(
 ) -> JSONResponse:
     user_id = request.query_params.get('userId')
     cursor = request.query_params.get('cursor')
-    since_raw = request.query_params.get('since')
-    since: str | int | None = None
-    if since_raw is not None:
-        try:
-            since = int(str(since_raw).strip())
-        except ValueError:
-            since = str(since_raw).strip() or None
+    since = _parse_since(request.query_params.get('since'))
 
     try:
         products, _source = evotor_service.cloud_products(
@@ -90,6 +100,36 @@ def evotor_cloud_products(
         raise ServiceError(str(exc) or 'Evotor Cloud request failed', 502, tokenSource=resolved.source) from exc
 
 
+@router.get('/evotor/cloud/stores/{store_id}/products/stream')
+def evotor_cloud_products_stream(
+    store_id: str,
+    request: Request,
+    _auth: None = Depends(require_evotor_webhook_auth),
+    evotor_service: EvotorService = Depends(get_evotor_service),
+) -> StreamingResponse:
+    """All pages of a store's products as NDJSON (one product per line)."""
+    user_id = request.query_params.get('userId')
+    since = _parse_since(request.query_params.get('since'))
+
+    try:
+        products, _source = evotor_service.stream_cloud_products(query_user_id=user_id, store_id=store_id, since=since)
+    except ValueError as exc:
+        raise ServiceError(str(exc) or 'Request failed', 400) from exc
+    except Exception as exc:
+        resolved = evotor_service.resolve_cloud_token(user_id)
+        raise ServiceError(str(exc) or 'Evotor Cloud request failed', 502, tokenSource=resolved.source) from exc
+
+    def ndjson_lines(items: Iterator[dict[str, Any]]) -> Iterator[str]:
+        try:
+            for item in items:
+                yield json.dumps(item, ensure_ascii=False) + '\n'
+        except Exception:
+            # Headers are already sent; the client sees a truncated stream.
+            logger.exception('Evotor Cloud product stream failed for store %s', store_id)
+
+    return StreamingResponse(ndjson_lines(products), media_type='application/x-ndjson')
+
+
 @router.post('/evotor/store')
 def evotor_set_store(
     payload: dict,
@@ -110,3 +150,11 @@ def evotor_products(evotor_service: EvotorService = Depends(get_evotor_service))
         return evotor_service.products_menu_items()
     except Exception:
         return []
+
+
+@router.get('/evotor/menus')
+def evotor_menus(evotor_service: EvotorService = Depends(get_evotor_service)) -> dict:
+    try:
+        return {'stores': evotor_service.multi_store_menu_items()}
+    except Exception:
+        return {'stores': []}
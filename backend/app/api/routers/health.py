@@ -2,11 +2,11 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Depends
 from fastapi.responses import JSONResponse
-from sqlalchemy import inspect, text
-from sqlalchemy.orm import Session
 
-from ...core.database import get_db
 from ...core.settings import settings
+from ...services.readiness import ReadinessProbe
+from ...services.warmup import StartupWarmup
+from ..deps import get_readiness, get_warmup
 
 router = APIRouter()
 
@@ -26,23 +26,12 @@ def health() -> dict[str, object]:
 
 
 @router.get('/ready')
-def ready(db: Session = Depends(get_db)) -> JSONResponse:
-    try:
-        db.execute(text('SELECT 1')).scalar()
-    except Exception:
-        return JSONResponse(status_code=503, content={'ok': False, 'db': {'ok': False}})
-
-    try:
-        inspector = inspect(db.get_bind())
-        tables = set(inspector.get_table_names())
-        required = {'users', 'sessions', 'otp_codes', 'orders'}
-        missing = sorted(required - tables)
-        if missing:
-            return JSONResponse(
-                status_code=503,
-                content={'ok': False, 'db': {'ok': True}, 'schema': {'ok': False, 'missingTables': missing}},
-            )
-    except Exception:
-        return JSONResponse(status_code=503, content={'ok': False, 'db': {'ok': True}, 'schema': {'ok': False}})
-
-    return JSONResponse(status_code=200, content={'ok': True, 'db': {'ok': True}, 'schema': {'ok': True}})
+def ready(
+    readiness: ReadinessProbe = Depends(get_readiness),
+    warmup: StartupWarmup = Depends(get_warmup),
+) -> JSONResponse:
+    ok, content = readiness.check()
+    if ok:
+        content['warmup'] = warmup.status()
+        ok = bool(content['warmup']['ready'])
+    return JSONResponse(status_code=200 if ok else 503, content={'ok': ok, **content})
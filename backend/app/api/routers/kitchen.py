@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from ...services.order_events import OrderEvent, OrderEventBus, order_cursor
+from ...services.order_service import OrderService
+from ...utils.time import utc_now
+from ..deps import get_order_events, get_order_service, require_admin
+from ..schemas import BulkOrderStatusIn, OrderStatusPatchIn
+
+router = APIRouter(prefix='/kitchen', dependencies=[Depends(require_admin)])
+
+HEARTBEAT_INTERVAL_S = 5.0
+
+
+def _format_sse(event: OrderEvent) -> str:
+    lines = []
+    if event.cursor:
+        lines.append(f'id: {event.cursor}')
+    lines.append(f'event: {event.type}')
+    lines.append(f'data: {json.dumps(event.payload, ensure_ascii=False)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+@router.get('/orders/stream')
+async def order_stream(
+    request: Request,
+    after: str | None = Query(default=None, max_length=200),
+    bus: OrderEventBus = Depends(get_order_events),
+) -> StreamingResponse:
+    """
+    Server-sent events for new orders and status changes.
+
+    Resume with the standard Last-Event-ID header (or ?after=<cursor>): orders from shortly
+    before that cursor on are replayed from the DB once, so an order committed after a later one
+    is not lost; clients dedupe by order id. Without a cursor the stream starts at "now". Orders
+    written by other worker processes arrive through the bus's shared poller.
+    """
+    cursor = request.headers.get('last-event-id') or after
+    # Created events dated before this are dropped for a client that did not ask for history.
+    not_before = None if cursor else order_cursor(utc_now(), '')
+
+    async def events() -> AsyncIterator[str]:
+        with bus.subscribe() as subscription:
+            yield 'retry: 3000\n\n'
+            replayed_ids: set[str] = set()
+            if cursor:
+                for replayed in await run_in_threadpool(bus.replay_after, cursor):
+                    replayed_ids.add(replayed.payload['id'])
+                    yield _format_sse(replayed)
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=HEARTBEAT_INTERVAL_S)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ': keepalive\n\n'
+                    continue
+
+                if event is None:
+                    # Fell too far behind; the client reconnects with Last-Event-ID.
+                    return
+                if event.cursor:
+                    if not_before and event.cursor < not_before:
+                        continue
+                    if event.payload['id'] in replayed_ids:
+                        continue
+                yield _format_sse(event)
+
+    return StreamingResponse(
+        events(),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-store', 'X-Accel-Buffering': 'no'},
+    )
+
+
+@router.post('/orders/{order_id}/status')
+def set_order_status(
+    order_id: str,
+    payload: OrderStatusPatchIn,
+    order_service: OrderService = Depends(get_order_service),
+) -> dict[str, object]:
+    order = order_service.transition_status(order_id=order_id, status=payload.status, expected_version=payload.version)
+    return {'order': {'id': order.id, 'status': order.status, 'version': order.version}}
+
+
+@router.post('/orders/status')
+def bulk_set_order_status(
+    payload: BulkOrderStatusIn,
+    order_service: OrderService = Depends(get_order_service),
+) -> dict[str, object]:
+    updated, skipped = order_service.bulk_transition_status(order_ids=payload.orderIds, status=payload.status)
+    return {
+        'updated': [{'id': order_id, 'status': payload.status, 'version': version} for order_id, version in updated],
+        'skipped': skipped,
+    }
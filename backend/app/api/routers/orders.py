@@ -1,9 +1,13 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+from typing import Literal
 
-from ...db.models import Order, User
-from ...services.order_service import OrderService
+from fastapi import APIRouter, Depends, Header, Query
+
+from ...db.models import Order
+from ...repositories.orders import OrderSummary
+from ...repositories.users import UserRecord
+from ...services.order_service import MAX_IDEMPOTENCY_KEY_LENGTH, MAX_PAGE_SIZE, OrderService
 from ...utils.time import isoformat_z
 from ..deps import get_order_service, require_user
 from ..schemas import CreateOrderIn
@@ -19,20 +23,60 @@ def _serialize_order(order: Order) -> dict[str, object]:
         'items': order.items,
         'total': order.total,
         'status': order.status,
+        'version': order.version,
+        'pointsRedeemed': order.points_redeemed,
+        'pointsEarned': order.points_earned,
+    }
+
+
+def _serialize_order_summary(summary: OrderSummary) -> dict[str, object]:
+    return {
+        'id': summary.id,
+        'userId': summary.user_id,
+        'date': isoformat_z(summary.date),
+        'itemCount': summary.item_count,
+        'total': summary.total,
+        'status': summary.status,
     }
 
 
 @router.get('/orders')
-def list_orders(user: User = Depends(require_user), order_service: OrderService = Depends(get_order_service)) -> dict[str, object]:
-    orders = order_service.list_orders(user_id=user.id)
-    return {'orders': [_serialize_order(order) for order in orders]}
+async def list_orders(
+    limit: int = Query(default=MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None, max_length=200),
+    view: Literal['full', 'summary'] = 'full',
+    user: UserRecord = Depends(require_user),
+    order_service: OrderService = Depends(get_order_service),
+) -> dict[str, object]:
+    if view == 'summary':
+        summaries, next_cursor = await order_service.list_order_summaries_async(user_id=user.id, limit=limit, cursor=cursor)
+        return {'orders': [_serialize_order_summary(item) for item in summaries], 'nextCursor': next_cursor}
+
+    orders, next_cursor = await order_service.list_orders_async(user_id=user.id, limit=limit, cursor=cursor)
+    return {'orders': [_serialize_order(order) for order in orders], 'nextCursor': next_cursor}
+
+
+@router.get('/orders/{order_id}')
+async def get_order(
+    order_id: str,
+    user: UserRecord = Depends(require_user),
+    order_service: OrderService = Depends(get_order_service),
+) -> dict[str, object]:
+    order = await order_service.get_order_async(user_id=user.id, order_id=order_id)
+    return {'order': _serialize_order(order)}
 
 
 @router.post('/orders')
 def create_order(
     payload: CreateOrderIn,
-    user: User = Depends(require_user),
+    idempotency_key: str | None = Header(default=None, alias='Idempotency-Key', max_length=MAX_IDEMPOTENCY_KEY_LENGTH),
+    user: UserRecord = Depends(require_user),
     order_service: OrderService = Depends(get_order_service),
 ) -> dict[str, object]:
-    order = order_service.create_order(user_id=user.id, items=[item.model_dump() for item in payload.items])
-    return {'order': _serialize_order(order)}
+    order = order_service.create_order(
+        user_id=user.id,
+        items=[item.model_dump() for item in payload.items],
+        idempotency_key=idempotency_key,
+        redeem_points=payload.redeemPoints,
+    )
+    return {'order': _serialize_order(order), 'loyaltyPoints': order_service.loyalty_balance(user.id)}
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Literal
+
 from pydantic import BaseModel, ConfigDict, Field
 
 
@@ -27,4 +29,18 @@ class CartItemIn(BaseModel):
 
 class CreateOrderIn(BaseModel):
     items: list[CartItemIn]
+    redeemPoints: int = Field(default=0, ge=0)
+
+
+
+OrderStatusIn = Literal['cooking', 'delivering', 'delivered', 'cancelled']
+
+
+class OrderStatusPatchIn(BaseModel):
+    status: OrderStatusIn
+    version: int = Field(ge=1)
+
 
+class BulkOrderStatusIn(BaseModel):
+    orderIds: list[str] = Field(min_length=1, max_length=500)
+    status: OrderStatusIn
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import importlib.util
+import logging
+from collections.abc import AsyncIterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from .database import _connect_args, _is_sqlite_memory, _pool_args, _sqlite_pragmas
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+_ASYNC_DRIVERS = {'sqlite': 'aiosqlite', 'postgresql': 'asyncpg'}
+
+
+def to_async_url(url: str) -> str | None:
+    """Map a sync DATABASE_URL to its async driver (sqlite+aiosqlite, postgresql+asyncpg)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == 'postgres':
+        backend = 'postgresql'
+    driver = _ASYNC_DRIVERS.get(backend)
+    if driver is None:
+        return None
+    return parsed.set(drivername=f'{backend}+{driver}').render_as_string(hide_password=False)
+
+
+def _create_async_engine(url: str) -> AsyncEngine | None:
+    async_url = to_async_url(url)
+    if async_url is None:
+        logger.warning('async_db_unsupported_backend', extra={'url': make_url(url).get_backend_name()})
+        return None
+
+    driver = make_url(async_url).get_driver_name()
+    if importlib.util.find_spec(driver) is None or importlib.util.find_spec('greenlet') is None:
+        logger.warning('async_db_driver_missing', extra={'driver': driver})
+        return None
+
+    is_sqlite = async_url.startswith('sqlite')
+    async_engine = create_async_engine(
+        async_url,
+        connect_args=_connect_args() if is_sqlite else {},
+        pool_pre_ping=True,
+        **_pool_args(),
+    )
+    if is_sqlite:
+        event.listen(async_engine.sync_engine, 'connect', _sqlite_pragmas)
+    return async_engine
+
+
+def _create_engines() -> tuple[AsyncEngine | None, AsyncEngine | None]:
+    # In-memory SQLite can't be shared between the sync and async pools, so it stays sync-only.
+    if not settings.db_async or _is_sqlite_memory(settings.database_url):
+        return None, None
+    primary = _create_async_engine(settings.database_url)
+    if primary is None:
+        return None, None
+    replica = _create_async_engine(settings.database_read_url) if settings.database_read_url else None
+    return primary, replica or primary
+
+
+async_engine, async_read_engine = _create_engines()
+
+AsyncSessionLocal = (
+    async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False) if async_engine else None
+)
+AsyncReadSessionLocal = (
+    async_sessionmaker(bind=async_read_engine, autoflush=False, expire_on_commit=False) if async_read_engine else None
+)
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession | None]:
+    """AsyncSession on the primary, or None when DB_ASYNC is off or the driver is not installed."""
+    if AsyncSessionLocal is None:
+        yield None
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db() -> AsyncIterator[AsyncSession | None]:
+    if AsyncReadSessionLocal is None:
+        yield None
+        return
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engines() -> None:
+    for async_db_engine in {async_engine, async_read_engine}:
+        if async_db_engine is not None:
+            await async_db_engine.dispose()
@@ -1,16 +1,26 @@
 from __future__ import annotations
 
+import time
 from collections.abc import Iterator
 
-from sqlalchemy import create_engine, event
+from sqlalchemy import Engine, create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from ..db.models import Base
 from .settings import settings
+from .sqlite_profiles import apply_sqlite_profile, get_sqlite_profile
+from .write_queue import WriteQueue
+
+# Tables the API cannot serve without; checked by scripts/migrate.py and the readiness probe.
+REQUIRED_TABLES = frozenset({'users', 'sessions', 'otp_codes', 'orders'})
+
+_IS_SQLITE = settings.database_url.startswith('sqlite')
+_SQLITE_PROFILE = get_sqlite_profile(settings.sqlite_profile) if _IS_SQLITE else None
 
 
 def _connect_args() -> dict[str, object]:
-    if settings.database_url.startswith('sqlite'):
+    if _IS_SQLITE:
         return {
             'check_same_thread': False,
             'timeout': max(0.0, settings.sqlite_busy_timeout_ms / 1000.0),
@@ -18,12 +28,36 @@ def _connect_args() -> dict[str, object]:
     return {}
 
 
-engine = create_engine(settings.database_url, connect_args=_connect_args(), pool_pre_ping=True)
+def _is_sqlite_memory(url: str) -> bool:
+    return url.startswith('sqlite') and (':memory:' in url or url.rstrip('/') == 'sqlite:')
+
+
+def _pool_args() -> dict[str, object]:
+    # In-memory SQLite uses a single-connection pool that does not accept sizing arguments.
+    if _is_sqlite_memory(settings.database_url):
+        return {}
+
+    # Sized so the request threadpool mostly finds a free connection instead of waiting on the pool.
+    if _SQLITE_PROFILE is not None:
+        default_size, default_overflow = _SQLITE_PROFILE.pool_size, _SQLITE_PROFILE.max_overflow
+    else:
+        default_size, default_overflow = 5, 10
+    pool_size = settings.db_pool_size if settings.db_pool_size > 0 else default_size
+    max_overflow = settings.db_max_overflow if settings.db_max_overflow >= 0 else default_overflow
+    return {'pool_size': pool_size, 'max_overflow': max_overflow}
+
+
+engine = create_engine(
+    settings.database_url,
+    connect_args=_connect_args(),
+    pool_pre_ping=True,
+    **_pool_args(),
+)
 
 
 @event.listens_for(engine, 'connect')
 def _sqlite_pragmas(dbapi_connection: object, _connection_record: object) -> None:
-    if not settings.database_url.startswith('sqlite'):
+    if _SQLITE_PROFILE is None:
         return
 
     cursor = getattr(dbapi_connection, 'cursor', None)
@@ -42,12 +76,107 @@ def _sqlite_pragmas(dbapi_connection: object, _connection_record: object) -> Non
         if journal_mode:
             cur.execute(f'PRAGMA journal_mode={journal_mode}')
             cur.fetchall()
+
+        apply_sqlite_profile(cur, _SQLITE_PROFILE)
     finally:
         cur.close()
 
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
 
 
+def _create_read_engine() -> Engine:
+    """
+    Engine for read-only repository methods, so reads don't queue behind writers for pool slots.
+
+    SQLite: a second pool on the same file whose connections are `query_only`. PostgreSQL:
+    DATABASE_READ_URL (a replica) when set. Otherwise reads share the primary engine.
+    """
+    if not settings.db_read_routing or _is_sqlite_memory(settings.database_url):
+        return engine
+    if not _IS_SQLITE:
+        if not settings.database_read_url:
+            return engine
+        return create_engine(settings.database_read_url, pool_pre_ping=True, **_pool_args())
+
+    read_engine = create_engine(settings.database_url, connect_args=_connect_args(), pool_pre_ping=True, **_pool_args())
+
+    @event.listens_for(read_engine, 'connect')
+    def _read_only_pragmas(dbapi_connection: object, connection_record: object) -> None:
+        _sqlite_pragmas(dbapi_connection, connection_record)
+        cur = dbapi_connection.cursor()  # type: ignore[attr-defined]
+        try:
+            cur.execute('PRAGMA query_only=ON')
+        finally:
+            cur.close()
+
+    return read_engine
+
+
+read_engine = _create_read_engine()
+
+ReadSessionLocal = sessionmaker(bind=read_engine, autocommit=False, autoflush=False, expire_on_commit=False)
+
+
+def create_write_queue() -> WriteQueue | None:
+    """Writer thread for SQLite, where all writers share one file lock; None for other databases."""
+    if not _IS_SQLITE or not settings.sqlite_write_queue:
+        return None
+    return WriteQueue(
+        SessionLocal,
+        max_batch=settings.sqlite_write_batch_max,
+        max_delay_ms=settings.sqlite_write_batch_delay_ms,
+    )
+
+
+def pool_status(bind: Engine) -> dict[str, object] | None:
+    """Connections checked out of `bind`'s pool against its size + overflow; None for unsized pools."""
+    pool = bind.pool
+    if not isinstance(pool, QueuePool):
+        return None
+    capacity = max(1, pool.size() + int(_pool_args().get('max_overflow', 0)))
+    checked_out = pool.checkedout()
+    return {
+        'size': pool.size(),
+        'capacity': capacity,
+        'checkedOut': checked_out,
+        'saturationPercent': round(checked_out * 100.0 / capacity, 1),
+    }
+
+
+def sqlite_checkpoint_and_optimize() -> dict[str, int] | None:
+    """Truncate the WAL and refresh planner statistics; None for non-SQLite databases."""
+    if not _IS_SQLITE:
+        return None
+    with engine.connect() as connection:
+        busy, wal_pages, checkpointed = connection.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)').one()
+        connection.exec_driver_sql('PRAGMA optimize')
+        connection.commit()
+    return {'busy': int(busy), 'walPages': int(wal_pages), 'checkpointedPages': int(checkpointed)}
+
+
+# Tables read on most requests; their rows and indexes are pulled into the page cache at startup.
+_HOT_TABLES = ('sessions', 'users', 'orders', 'order_items', 'rate_limits', 'otp_codes')
+
+
+def sqlite_warm_hot_pages(*, deadline: float | None = None) -> dict[str, int] | None:
+    """
+    Scan the hot tables and each of their indexes once on the read engine so the first requests
+    after a restart don't fault pages in one by one (with mmap the OS page cache is shared by every
+    connection). Stops at `deadline` (time.monotonic()); rows scanned per table, None for non-SQLite.
+    """
+    if not _IS_SQLITE:
+        return None
+    scanned: dict[str, int] = {}
+    with read_engine.connect() as connection:
+        for table in _HOT_TABLES:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            scanned[table] = int(connection.exec_driver_sql(f'SELECT count(*) FROM "{table}" NOT INDEXED').scalar() or 0)
+            for index in connection.exec_driver_sql(f'PRAGMA index_list("{table}")').all():
+                connection.exec_driver_sql(f'SELECT count(*) FROM "{table}" INDEXED BY "{index[1]}"').scalar()
+    return scanned
+
+
 def init_db() -> None:
     Base.metadata.create_all(bind=engine)
 
@@ -58,3 +187,12 @@ def get_db() -> Iterator[Session]:
         yield db
     finally:
         db.close()
+
+
+def get_read_db() -> Iterator[Session]:
+    """Session on the read engine; only for requests (or parts of them) that never write."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Protocol
+
+from ..utils.time import isoformat_z, utc_now
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the run-time histogram buckets; the last bucket is unbounded.
+_HISTOGRAM_BOUNDS_MS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10_000, 30_000, 60_000)
+
+
+class Trigger(Protocol):
+    def next_after(self, now: datetime) -> datetime: ...
+
+    def describe(self) -> str: ...
+
+
+@dataclass(frozen=True)
+class IntervalTrigger:
+    seconds: float
+
+    def next_after(self, now: datetime) -> datetime:
+        return now + timedelta(seconds=max(0.1, self.seconds))
+
+    def describe(self) -> str:
+        return f'every {self.seconds:g}s'
+
+
+def _parse_cron_field(raw: str, low: int, high: int) -> frozenset[int]:
+    values: set[int] = set()
+    for part in raw.split(','):
+        step = 1
+        if '/' in part:
+            part, step_raw = part.split('/', 1)
+            step = int(step_raw)
+            if step <= 0:
+                raise ValueError(f'Invalid cron step: {raw!r}')
+        if part in ('*', ''):
+            start, end = low, high
+        elif '-' in part:
+            start_raw, end_raw = part.split('-', 1)
+            start, end = int(start_raw), int(end_raw)
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f'Cron field {raw!r} out of range {low}-{high}')
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronTrigger:
+    """
+    Standard 5-field cron (`minute hour day-of-month month day-of-week`, UTC, Sunday = 0 or 7).
+    As in cron, when both day fields are restricted a day matching either one qualifies.
+    """
+
+    def __init__(self, expression: str) -> None:
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f'Cron expression needs 5 fields: {expression!r}')
+        self.expression = expression
+        self._minutes = _parse_cron_field(fields[0], 0, 59)
+        self._hours = _parse_cron_field(fields[1], 0, 23)
+        self._days = _parse_cron_field(fields[2], 1, 31)
+        self._months = _parse_cron_field(fields[3], 1, 12)
+        self._weekdays = frozenset(day % 7 for day in _parse_cron_field(fields[4], 0, 7))
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    def _day_matches(self, value: datetime) -> bool:
+        day_ok = value.day in self._days
+        weekday_ok = (value.isoweekday() % 7) in self._weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, now: datetime) -> datetime:
+        candidate = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # Skips whole months/days/hours at a time; 5 years covers every satisfiable expression.
+        limit = now + timedelta(days=5 * 366)
+        while candidate <= limit:
+            if candidate.month not in self._months:
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if candidate.hour not in self._hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+            if candidate.minute not in self._minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError(f'Cron expression never fires: {self.expression!r}')
+
+    def describe(self) -> str:
+        return f'cron {self.expression}'
+
+
+@dataclass
+class JobStats:
+    runs: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    skipped_overlap: int = 0
+    skipped_not_leader: int = 0
+    last_run_at: datetime | None = None
+    last_duration_ms: float = 0.0
+    last_error: str | None = None
+    total_ms: float = 0.0
+    histogram: list[int] = field(default_factory=lambda: [0] * (len(_HISTOGRAM_BOUNDS_MS) + 1))
+
+    def record(self, duration_ms: float) -> None:
+        self.runs += 1
+        self.last_duration_ms = duration_ms
+        self.total_ms += duration_ms
+        self.histogram[bisect_left(_HISTOGRAM_BOUNDS_MS, duration_ms)] += 1
+
+
+@dataclass(eq=False)
+class _Job:
+    name: str
+    fn: Callable[[], object]
+    trigger: Trigger
+    jitter_s: float
+    timeout_s: float | None
+    lease: str | None
+    next_run_at: datetime
+    running: bool = False
+    started: float = 0.0
+    timed_out: bool = False
+    stats: JobStats = field(default_factory=JobStats)
+
+
+class Scheduler:
+    """
+    In-process scheduler for periodic jobs on a bounded thread pool.
+
+    Jobs have an interval or cron trigger plus random jitter, so workers and jobs don't fire in
+    lockstep. A job never overlaps itself: if it is still running when due, that run is skipped.
+    Timeouts are soft, because threads cannot be killed. A run past its timeout is counted and
+    logged; the job is not started again until the run returns.
+    A job with a `lease` runs only in the worker holding that lease (see services/leases.py).
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int = 4,
+        is_leader: Callable[[str], bool] | None = None,
+        register_lease: Callable[[str], None] | None = None,
+    ) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix='scheduler_job')
+        self._is_leader = is_leader
+        self._register_lease = register_lease
+        self._jobs: dict[str, _Job] = {}
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: threading.Thread | None = None
+
+    def add_job(
+        self,
+        name: str,
+        fn: Callable[[], object],
+        trigger: Trigger,
+        *,
+        jitter_s: float = 0.0,
+        timeout_s: float | None = None,
+        lease: str | None = None,
+    ) -> None:
+        if lease is not None and self._register_lease is not None:
+            self._register_lease(lease)
+        with self._cond:
+            if name in self._jobs:
+                raise ValueError(f'Job {name!r} is already scheduled')
+            job = _Job(
+                name=name,
+                fn=fn,
+                trigger=trigger,
+                jitter_s=max(0.0, float(jitter_s)),
+                timeout_s=timeout_s,
+                lease=lease,
+                next_run_at=utc_now(),
+            )
+            job.next_run_at = self._next_run(job, job.next_run_at)
+            self._jobs[name] = job
+            self._cond.notify()
+
+    def reschedule(self, name: str, *, delay_s: float) -> None:
+        """Bring the next run of `name` forward to at most `delay_s` from now."""
+        with self._cond:
+            job = self._jobs.get(name)
+            if job is None:
+                return
+            job.next_run_at = min(job.next_run_at, utc_now() + timedelta(seconds=max(0.0, delay_s)))
+            self._cond.notify()
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run_loop, daemon=True, name='scheduler')
+        self._thread.start()
+
+    def stop(self, *, timeout_s: float = 5.0) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout_s)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def status(self) -> dict[str, object]:
+        with self._cond:
+            jobs = list(self._jobs.values())
+            return {
+                'running': self._thread is not None and self._thread.is_alive(),
+                'jobs': [self._job_status(job) for job in jobs],
+            }
+
+    def _job_status(self, job: _Job) -> dict[str, object]:
+        stats = job.stats
+        return {
+            'name': job.name,
+            'trigger': job.trigger.describe(),
+            'lease': job.lease,
+            'leader': self._is_leader(job.lease) if job.lease and self._is_leader else None,
+            'running': job.running,
+            'nextRunAt': isoformat_z(job.next_run_at),
+            'runs': stats.runs,
+            'failures': stats.failures,
+            'timeouts': stats.timeouts,
+            'skippedOverlap': stats.skipped_overlap,
+            'skippedNotLeader': stats.skipped_not_leader,
+            'lastRunAt': isoformat_z(stats.last_run_at) if stats.last_run_at else None,
+            'lastDurationMs': round(stats.last_duration_ms, 3),
+            'avgDurationMs': round(stats.total_ms / stats.runs, 3) if stats.runs else 0.0,
+            'lastError': stats.last_error,
+            'histogramMs': {
+                **{str(bound): count for bound, count in zip(_HISTOGRAM_BOUNDS_MS, stats.histogram)},
+                '+Inf': stats.histogram[-1],
+            },
+        }
+
+    def _next_run(self, job: _Job, now: datetime) -> datetime:
+        jitter = random.uniform(0, job.jitter_s) if job.jitter_s else 0.0
+        return job.trigger.next_after(now) + timedelta(seconds=jitter)
+
+    def _run_loop(self) -> None:
+        with self._cond:
+            while not self._stopped:
+                now = utc_now()
+                for job in self._jobs.values():
+                    if job.next_run_at <= now:
+                        self._dispatch(job, now)
+                    elif job.running and not job.timed_out and job.timeout_s is not None:
+                        if time.monotonic() - job.started > job.timeout_s:
+                            job.timed_out = True
+                            job.stats.timeouts += 1
+                            logger.warning('job_timeout', extra={'job': job.name, 'timeoutS': job.timeout_s})
+
+                # Wake at the next due job, and at least once a second to check timeouts.
+                next_due = min((job.next_run_at for job in self._jobs.values()), default=now + timedelta(seconds=1))
+                self._cond.wait(timeout=min(1.0, max(0.01, (next_due - now).total_seconds())))
+
+    def _dispatch(self, job: _Job, now: datetime) -> None:
+        job.next_run_at = self._next_run(job, now)
+        if job.lease is not None and self._is_leader is not None and not self._is_leader(job.lease):
+            job.stats.skipped_not_leader += 1
+            return
+        if job.running:
+            job.stats.skipped_overlap += 1
+            return
+        job.running = True
+        job.timed_out = False
+        job.started = time.monotonic()
+        self._pool.submit(self._run_job, job)
+
+    def _run_job(self, job: _Job) -> None:
+        started = time.perf_counter()
+        error: str | None = None
+        try:
+            job.fn()
+        except Exception as exc:
+            error = f'{type(exc).__name__}: {exc}'
+            logger.exception('job_failed', extra={'job': job.name})
+
+        duration_ms = (time.perf_counter() - started) * 1000
+        with self._cond:
+            job.stats.record(duration_ms)
+            job.stats.last_run_at = utc_now()
+            if error is not None:
+                job.stats.failures += 1
+                job.stats.last_error = error
+            job.running = False
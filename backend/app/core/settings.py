@@ -80,6 +80,9 @@ def _default_database_url() -> str:
 @dataclass(frozen=True)
 class Settings:
     database_url: str = os.getenv('DATABASE_URL', _default_database_url())
+    database_read_url: str = os.getenv('DATABASE_READ_URL', '').strip()
+    db_read_routing: bool = _bool_env('DB_READ_ROUTING', True)
+    db_async: bool = _bool_env('DB_ASYNC', False)
 
     cookie_secure: bool = _bool_env('COOKIE_SECURE', False)
     session_cookie_name: str = os.getenv('SESSION_COOKIE_NAME', 'obedi_session')
@@ -87,6 +90,24 @@ class Settings:
     session_rotate_after_ms: int = _int_env('SESSION_ROTATE_AFTER_MS', 24 * 60 * 60 * 1000)
     session_single_active: bool = _bool_env('SESSION_SINGLE_ACTIVE', False)
     session_cleanup_interval_ms: int = _int_env('SESSION_CLEANUP_INTERVAL_MS', 5 * 60 * 1000)
+    expiry_sweep_batch_size: int = _int_env('EXPIRY_SWEEP_BATCH_SIZE', 500)
+    expiry_sweep_max_batches: int = _int_env('EXPIRY_SWEEP_MAX_BATCHES', 20)
+    order_history_trim_cron: str = os.getenv('ORDER_HISTORY_TRIM_CRON', '').strip()
+    evotor_menu_sync_interval_ms: int = _int_env('EVOTOR_MENU_SYNC_INTERVAL_MS', 4 * 60 * 1000)
+    scheduler_workers: int = _int_env('SCHEDULER_WORKERS', 4)
+    warmup_budget_ms: int = _int_env('WARMUP_BUDGET_MS', 15 * 1000)
+    warmup_hot_addresses: int = _int_env('WARMUP_HOT_ADDRESSES', 50)
+    ready_ping_timeout_ms: int = _int_env('READY_PING_TIMEOUT_MS', 500)
+    ready_ping_cache_ms: int = _int_env('READY_PING_CACHE_MS', 1000)
+    ready_max_pool_saturation_percent: int = _int_env('READY_MAX_POOL_SATURATION_PERCENT', 100)
+    ready_max_write_queue_depth: int = _int_env('READY_MAX_WRITE_QUEUE_DEPTH', 1000)
+    leader_election: bool = _bool_env('LEADER_ELECTION', True)
+    leader_lease_ttl_ms: int = _int_env('LEADER_LEASE_TTL_MS', 30 * 1000)
+
+    order_history_keep: int = _int_env('ORDER_HISTORY_KEEP', 50)
+
+    loyalty_accrual_percent: int = _int_env('LOYALTY_ACCRUAL_PERCENT', 5)
+    loyalty_max_redeem_percent: int = _int_env('LOYALTY_MAX_REDEEM_PERCENT', 30)
 
     otp_ttl_ms: int = _int_env('OTP_TTL_MS', 5 * 60 * 1000)
     otp_resend_cooldown_ms: int = _int_env('OTP_RESEND_COOLDOWN_MS', 30 * 1000)
@@ -112,15 +133,30 @@ class Settings:
     nominatim_base_url: str = os.getenv('NOMINATIM_BASE_URL', 'https://nominatim.openstreetmap.org').strip().rstrip('/')
     photon_base_url: str = os.getenv('PHOTON_BASE_URL', 'https://photon.komoot.io').strip().rstrip('/')
 
+    evotor_fetch_workers: int = _int_env('EVOTOR_FETCH_WORKERS', 4)
+
+    http_timeout_ms: int = _int_env('HTTP_TIMEOUT_MS', 8000)
+    http_max_retries: int = _int_env('HTTP_MAX_RETRIES', 1)
+    http_pool_size_per_host: int = _int_env('HTTP_POOL_SIZE_PER_HOST', 4)
+
     sqlite_busy_timeout_ms: int = _int_env('SQLITE_BUSY_TIMEOUT_MS', 5000)
     sqlite_journal_mode: str = os.getenv('SQLITE_JOURNAL_MODE', 'WAL').strip().upper()
     sqlite_foreign_keys: bool = _bool_env('SQLITE_FOREIGN_KEYS', True)
+    sqlite_profile: str = os.getenv('SQLITE_PROFILE', 'balanced').strip().lower()
+    sqlite_checkpoint_interval_ms: int = _int_env('SQLITE_CHECKPOINT_INTERVAL_MS', 15 * 60 * 1000)
+    db_pool_size: int = _int_env('DB_POOL_SIZE', 0)
+    db_max_overflow: int = _int_env('DB_MAX_OVERFLOW', -1)
+    sqlite_write_queue: bool = _bool_env('SQLITE_WRITE_QUEUE', True)
+    sqlite_write_batch_max: int = _int_env('SQLITE_WRITE_BATCH_MAX', 64)
+    sqlite_write_batch_delay_ms: int = _int_env('SQLITE_WRITE_BATCH_DELAY_MS', 2)
 
     trust_proxy_headers: bool = _bool_env('TRUST_PROXY_HEADERS', False)
     trusted_proxy_ips: str = os.getenv('TRUSTED_PROXY_IPS', '').strip()
 
     csrf_origin_check: bool = _bool_env('CSRF_ORIGIN_CHECK', True)
 
+    admin_api_token: str = os.getenv('ADMIN_API_TOKEN', '').strip()
+
     cors_origins: list[str] = field(default_factory=_cors_origins)
     allowed_hosts: list[str] = field(default_factory=_allowed_hosts)
 
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class SqliteProfile:
+    """Pragma set and pool sizing for one SQLITE_PROFILE."""
+
+    name: str
+    synchronous: str
+    cache_size_kib: int
+    mmap_size: int
+    temp_store: str
+    wal_autocheckpoint: int
+    pool_size: int
+    max_overflow: int
+
+
+SQLITE_PROFILES: dict[str, SqliteProfile] = {
+    # fsync on every commit; survives power loss without losing the last transactions.
+    'durable': SqliteProfile(
+        name='durable',
+        synchronous='FULL',
+        cache_size_kib=16 * 1024,
+        mmap_size=0,
+        temp_store='DEFAULT',
+        wal_autocheckpoint=1000,
+        pool_size=5,
+        max_overflow=10,
+    ),
+    # WAL + NORMAL: no corruption on crash, may lose the last commits on power loss.
+    'balanced': SqliteProfile(
+        name='balanced',
+        synchronous='NORMAL',
+        cache_size_kib=32 * 1024,
+        mmap_size=128 * 1024 * 1024,
+        temp_store='MEMORY',
+        wal_autocheckpoint=1000,
+        pool_size=10,
+        max_overflow=20,
+    ),
+    # No fsync at all: for disposable databases (dev, load tests). Power loss can corrupt the file.
+    'fast': SqliteProfile(
+        name='fast',
+        synchronous='OFF',
+        cache_size_kib=64 * 1024,
+        mmap_size=256 * 1024 * 1024,
+        temp_store='MEMORY',
+        wal_autocheckpoint=4000,
+        pool_size=20,
+        max_overflow=20,
+    ),
+}
+
+
+def get_sqlite_profile(name: str) -> SqliteProfile:
+    profile = SQLITE_PROFILES.get((name or '').strip().lower())
+    if profile is None:
+        raise RuntimeError(f'Unknown SQLITE_PROFILE: {name}')
+    return profile
+
+
+def apply_sqlite_profile(cursor: Any, profile: SqliteProfile) -> None:
+    cursor.execute(f'PRAGMA synchronous={profile.synchronous}')
+    # Negative cache_size is in KiB rather than pages.
+    cursor.execute(f'PRAGMA cache_size=-{int(profile.cache_size_kib)}')
+    cursor.execute(f'PRAGMA mmap_size={int(profile.mmap_size)}')
+    cursor.fetchall()
+    cursor.execute(f'PRAGMA temp_store={profile.temp_store}')
+    cursor.execute(f'PRAGMA wal_autocheckpoint={int(profile.wal_autocheckpoint)}')
+    cursor.fetchall()
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+WriteIntent = Callable[[Session], T]
+
+_STOP = object()
+
+
+@dataclass
+class _Pending:
+    fn: Callable[[Session], Any]
+    future: Future[Any]
+
+
+class WriteQueue:
+    """
+    Single writer thread that group-commits write intents.
+
+    An intent is a callable that performs its writes on the Session it is given and must not
+    commit; it may be re-run after a rollback, so it should have no side effects outside the DB. The writer drains up to `max_batch` intents (waiting at most `max_delay_ms` for
+    more to arrive), runs them in one transaction and commits once, so N concurrent requests
+    cost one SQLite write lock acquisition and one fsync instead of N. If any intent raises,
+    the batch is rolled back and its intents are re-run one transaction each, so a failing
+    intent only fails its own future.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        max_batch: int = 64,
+        max_delay_ms: int = 2,
+        max_pending: int = 10_000,
+    ) -> None:
+        self._session_factory = session_factory
+        self._max_batch = max(1, int(max_batch))
+        self._max_delay_s = max(0, int(max_delay_ms)) / 1000.0
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=max(1, int(max_pending)))
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._stopped = False
+
+        self._batches = 0
+        self._intents = 0
+        self._failed_batches = 0
+        self._max_batch_seen = 0
+        self._commit_ms_total = 0.0
+
+    def submit(self, fn: WriteIntent[T]) -> Future[T]:
+        if self._stopped:
+            raise RuntimeError('Write queue is stopped')
+        self._ensure_started()
+        future: Future[T] = Future()
+        self._queue.put(_Pending(fn=fn, future=future))
+        return future
+
+    def run(self, fn: WriteIntent[T], *, timeout_s: float | None = 30.0) -> T:
+        """
+        Submit an intent and wait for its result (re-raises the intent's exception).
+
+        After `timeout_s` the intent is cancelled if the writer has not picked it up yet, so a
+        caller that gives up never leaves a write behind that commits later. One already running
+        is waited for, since its outcome is what the caller has to report.
+        """
+        future = self.submit(fn)
+        try:
+            return future.result(timeout=timeout_s)
+        except FutureTimeoutError:
+            if future.cancel():
+                raise
+            return future.result()
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def metrics(self) -> dict[str, object]:
+        with self._lock:
+            batches = self._batches
+            return {
+                'depth': self.depth(),
+                'batches': batches,
+                'intents': self._intents,
+                'failedBatches': self._failed_batches,
+                'avgBatchSize': round(self._intents / batches, 2) if batches else 0.0,
+                'maxBatchSize': self._max_batch_seen,
+                'avgCommitMs': round(self._commit_ms_total / batches, 3) if batches else 0.0,
+            }
+
+    def stop(self, *, timeout_s: float = 5.0) -> None:
+        """Stop accepting intents, finish the queued ones and join the writer thread."""
+        with self._lock:
+            self._stopped = True
+            thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout=timeout_s)
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run_loop, daemon=True, name='db_writer')
+                self._thread.start()
+
+    def _run_loop(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+
+            batch: list[_Pending] = [first]
+            stop_after = False
+            deadline = time.monotonic() + self._max_delay_s
+            while len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop_after = True
+                    break
+                batch.append(item)
+
+            self._run_batch(batch)
+            if stop_after:
+                return
+
+    def _run_batch(self, batch: list[_Pending]) -> None:
+        batch = [pending for pending in batch if pending.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        started = time.perf_counter()
+        db = self._session_factory()
+        try:
+            results = [pending.fn(db) for pending in batch]
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            self._record(batch, started, failed=True)
+            if len(batch) == 1:
+                batch[0].future.set_exception(exc)
+            else:
+                for pending in batch:
+                    self._run_isolated(pending)
+            return
+        finally:
+            db.close()
+
+        self._record(batch, started, failed=False)
+        for pending, result in zip(batch, results):
+            pending.future.set_result(result)
+
+    def _run_isolated(self, pending: _Pending) -> None:
+        db = self._session_factory()
+        try:
+            result = pending.fn(db)
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            pending.future.set_exception(exc)
+            return
+        finally:
+            db.close()
+        pending.future.set_result(result)
+
+    def _record(self, batch: list[_Pending], started: float, *, failed: bool) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._batches += 1
+            self._intents += len(batch)
+            self._max_batch_seen = max(self._max_batch_seen, len(batch))
+            self._commit_ms_total += elapsed_ms
+            if failed:
+                self._failed_batches += 1
+
+
+def run_write(db: Session, writer: WriteQueue | None, fn: WriteIntent[T]) -> T:
+    """Run a write intent through the writer queue, or inline on `db` with its own commit."""
+    if writer is not None:
+        return writer.run(fn)
+    try:
+        result = fn(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return result
+
+
+async def run_write_async(db: Session, writer: WriteQueue | None, fn: WriteIntent[T]) -> T:
+    """`run_write` for async callers: awaits the writer queue, or runs inline in a worker thread."""
+    if writer is not None:
+        return await asyncio.wrap_future(writer.submit(fn))
+    return await asyncio.to_thread(run_write, db, None, fn)
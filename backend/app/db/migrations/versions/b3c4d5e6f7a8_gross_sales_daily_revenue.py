@@ -0,0 +1,42 @@
+"""record gross revenue in sales_daily
+
+Revision ID: b3c4d5e6f7a8
+Revises: a2b3c4d5e6f7
+Create Date: 2026-10-19
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3c4d5e6f7a8'
+down_revision = 'a2b3c4d5e6f7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # sales_daily.revenue was recorded after loyalty redemptions, product_sales_daily.revenue before
+    # them. product_sales_daily is gross for every day (backfilled and live) and is not affected by
+    # order-history trimming, so each day is rebuilt from the sum of its dishes.
+    sales_daily = sa.table('sales_daily', sa.column('day', sa.Date()), sa.column('revenue', sa.Float()))
+    product_sales_daily = sa.table(
+        'product_sales_daily',
+        sa.column('day', sa.Date()),
+        sa.column('revenue', sa.Float()),
+    )
+    gross = (
+        sa.select(sa.func.coalesce(sa.func.sum(product_sales_daily.c.revenue), 0.0))
+        .where(product_sales_daily.c.day == sales_daily.c.day)
+        .scalar_subquery()
+    )
+    op.execute(sales_daily.update().values(revenue=gross))
+
+
+def downgrade() -> None:
+    # The net amounts are not recoverable once rebuilt; the gross figures stay.
+    pass
@@ -0,0 +1,92 @@
+"""add order_items table
+
+Revision ID: b7c8d9e0f1a2
+Revises: 72708f938f58
+Create Date: 2026-10-19
+
+"""
+
+from __future__ import annotations
+
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7c8d9e0f1a2'
+down_revision = '72708f938f58'
+branch_labels = None
+depends_on = None
+
+_BACKFILL_BATCH = 500
+
+
+def _coerce_items(raw: object) -> list[dict]:
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            return []
+    if not isinstance(raw, list):
+        return []
+    return [item for item in raw if isinstance(item, dict)]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'order_items',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('order_id', sa.String(), nullable=False),
+        sa.Column('product_id', sa.String(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_order_items_order_id'), 'order_items', ['order_id'], unique=False)
+    op.create_index('ix_order_items_product', 'order_items', ['product_id'], unique=False)
+
+    # Backfill from the JSON snapshot in orders.items
+    bind = op.get_bind()
+    orders = sa.table('orders', sa.column('id', sa.String()), sa.column('items', sa.JSON()))
+    order_items = sa.table(
+        'order_items',
+        sa.column('order_id', sa.String()),
+        sa.column('product_id', sa.String()),
+        sa.column('title', sa.String()),
+        sa.column('price', sa.Float()),
+        sa.column('quantity', sa.Integer()),
+    )
+
+    rows: list[dict] = []
+    for order_id, raw_items in bind.execute(sa.select(orders.c.id, orders.c['items'])):
+        for item in _coerce_items(raw_items):
+            try:
+                price = float(item.get('price') or 0)
+                quantity = int(item.get('quantity') or 1)
+            except (TypeError, ValueError):
+                continue
+            rows.append(
+                {
+                    'order_id': order_id,
+                    'product_id': str(item.get('id') or ''),
+                    'title': str(item.get('title') or ''),
+                    'price': price,
+                    'quantity': quantity,
+                }
+            )
+        if len(rows) >= _BACKFILL_BATCH:
+            bind.execute(order_items.insert(), rows)
+            rows = []
+
+    if rows:
+        bind.execute(order_items.insert(), rows)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_order_items_product', table_name='order_items')
+    op.drop_index(op.f('ix_order_items_order_id'), table_name='order_items')
+    op.drop_table('order_items')
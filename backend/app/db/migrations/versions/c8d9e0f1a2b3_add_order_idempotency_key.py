@@ -0,0 +1,30 @@
+"""add orders.idempotency_key
+
+Revision ID: c8d9e0f1a2b3
+Revises: b7c8d9e0f1a2
+Create Date: 2026-10-19
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8d9e0f1a2b3'
+down_revision = 'b7c8d9e0f1a2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('orders', sa.Column('idempotency_key', sa.String(), nullable=True))
+    op.create_index('ux_orders_user_idempotency_key', 'orders', ['user_id', 'idempotency_key'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ux_orders_user_idempotency_key', table_name='orders')
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.drop_column('idempotency_key')
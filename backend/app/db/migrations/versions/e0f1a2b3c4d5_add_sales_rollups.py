@@ -0,0 +1,99 @@
+"""add sales rollup tables
+
+Revision ID: e0f1a2b3c4d5
+Revises: d9e0f1a2b3c4
+Create Date: 2026-10-19
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e0f1a2b3c4d5'
+down_revision = 'd9e0f1a2b3c4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sales_daily',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('order_count', sa.Integer(), nullable=False),
+        sa.Column('item_count', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('day'),
+    )
+    op.create_table(
+        'product_sales_daily',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('product_id', sa.String(), nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'product_id'),
+    )
+    op.create_index('ix_product_sales_daily_product', 'product_sales_daily', ['product_id'], unique=False)
+
+    # Backfill from the existing order lines in two aggregate statements.
+    orders = sa.table('orders', sa.column('id', sa.String()), sa.column('date', sa.DateTime()))
+    order_items = sa.table(
+        'order_items',
+        sa.column('order_id', sa.String()),
+        sa.column('product_id', sa.String()),
+        sa.column('title', sa.String()),
+        sa.column('price', sa.Float()),
+        sa.column('quantity', sa.Integer()),
+    )
+    sales_daily = sa.table(
+        'sales_daily',
+        sa.column('day', sa.Date()),
+        sa.column('order_count', sa.Integer()),
+        sa.column('item_count', sa.Integer()),
+        sa.column('revenue', sa.Float()),
+    )
+    product_sales_daily = sa.table(
+        'product_sales_daily',
+        sa.column('day', sa.Date()),
+        sa.column('product_id', sa.String()),
+        sa.column('title', sa.String()),
+        sa.column('quantity', sa.Integer()),
+        sa.column('revenue', sa.Float()),
+    )
+
+    day = sa.func.date(orders.c.date)
+    joined = order_items.join(orders, orders.c.id == order_items.c.order_id)
+    revenue = sa.func.sum(order_items.c.price * order_items.c.quantity)
+
+    op.execute(
+        sales_daily.insert().from_select(
+            ['day', 'order_count', 'item_count', 'revenue'],
+            sa.select(day, sa.func.count(sa.distinct(orders.c.id)), sa.func.sum(order_items.c.quantity), revenue)
+            .select_from(joined)
+            .group_by(day),
+        )
+    )
+    op.execute(
+        product_sales_daily.insert().from_select(
+            ['day', 'product_id', 'title', 'quantity', 'revenue'],
+            sa.select(
+                day,
+                order_items.c.product_id,
+                sa.func.max(order_items.c.title),
+                sa.func.sum(order_items.c.quantity),
+                revenue,
+            )
+            .select_from(joined)
+            .group_by(day, order_items.c.product_id),
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_product_sales_daily_product', table_name='product_sales_daily')
+    op.drop_table('product_sales_daily')
+    op.drop_table('sales_daily')
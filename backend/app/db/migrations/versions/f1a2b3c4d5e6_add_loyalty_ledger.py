@@ -0,0 +1,68 @@
+"""add loyalty ledger and order point columns
+
+Revision ID: f1a2b3c4d5e6
+Revises: e0f1a2b3c4d5
+Create Date: 2026-10-19
+
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1a2b3c4d5e6'
+down_revision = 'e0f1a2b3c4d5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('orders', sa.Column('points_redeemed', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('orders', sa.Column('points_earned', sa.Integer(), nullable=False, server_default='0'))
+
+    op.create_table(
+        'loyalty_ledger',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('order_id', sa.String(), nullable=True),
+        sa.Column('delta', sa.Integer(), nullable=False),
+        sa.Column('reason', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_loyalty_ledger_user_created', 'loyalty_ledger', ['user_id', 'created_at'], unique=False)
+
+    # Opening entry per user so the ledger reconciles with the existing balances.
+    users = sa.table('users', sa.column('id', sa.String()), sa.column('loyalty_points', sa.Integer()))
+    ledger = sa.table(
+        'loyalty_ledger',
+        sa.column('user_id', sa.String()),
+        sa.column('delta', sa.Integer()),
+        sa.column('reason', sa.String()),
+        sa.column('created_at', sa.DateTime()),
+    )
+    op.execute(
+        ledger.insert().from_select(
+            ['user_id', 'delta', 'reason', 'created_at'],
+            sa.select(
+                users.c.id,
+                users.c.loyalty_points,
+                sa.literal('opening'),
+                sa.literal(datetime.utcnow(), sa.DateTime()),
+            ).where(users.c.loyalty_points != 0),
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_loyalty_ledger_user_created', table_name='loyalty_ledger')
+    op.drop_table('loyalty_ledger')
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.drop_column('points_earned')
+        batch_op.drop_column('points_redeemed')
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Any
 
-from sqlalchemy import JSON, DateTime, Float, ForeignKey, Index, Integer, String
+from sqlalchemy import JSON, Date, DateTime, Float, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -48,6 +48,7 @@ class Order(Base):
     __tablename__ = 'orders'
     __table_args__ = (
         Index('ix_orders_user_date', 'user_id', 'date'),
+        Index('ux_orders_user_idempotency_key', 'user_id', 'idempotency_key', unique=True),
     )
 
     id: Mapped[str] = mapped_column(String, primary_key=True)
@@ -56,6 +57,80 @@ class Order(Base):
     items: Mapped[list[dict[str, Any]]] = mapped_column(JSON, nullable=False)
     total: Mapped[float] = mapped_column(Float, nullable=False)
     status: Mapped[str] = mapped_column(String, nullable=False)
+    idempotency_key: Mapped[str | None] = mapped_column(String, nullable=True, default=None)
+    # Bumped by every status change; transitions are compare-and-swap on (id, version).
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default='1')
+    points_redeemed: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default='0')
+    points_earned: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default='0')
+
+
+class OrderItem(Base):
+    __tablename__ = 'order_items'
+    __table_args__ = (
+        Index('ix_order_items_product', 'product_id'),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    order_id: Mapped[str] = mapped_column(ForeignKey('orders.id', ondelete='CASCADE'), index=True, nullable=False)
+    product_id: Mapped[str] = mapped_column(String, nullable=False)
+    title: Mapped[str] = mapped_column(String, nullable=False)
+    price: Mapped[float] = mapped_column(Float, nullable=False)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class LoyaltyLedgerEntry(Base):
+    """Audit trail of loyalty point changes; the balance itself lives in users.loyalty_points."""
+
+    __tablename__ = 'loyalty_ledger'
+    __table_args__ = (
+        Index('ix_loyalty_ledger_user_created', 'user_id', 'created_at'),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[str] = mapped_column(ForeignKey('users.id'), nullable=False)
+    # Plain column, not a FK: history trimming deletes old orders but keeps their ledger rows.
+    order_id: Mapped[str | None] = mapped_column(String, nullable=True, default=None)
+    delta: Mapped[int] = mapped_column(Integer, nullable=False)
+    reason: Mapped[str] = mapped_column(String, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class SalesDaily(Base):
+    """Per-day order totals, maintained incrementally by OrderService.create_order; revenue is gross."""
+
+    __tablename__ = 'sales_daily'
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    order_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    item_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    revenue: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class ProductSalesDaily(Base):
+    """Per-day, per-product quantity and gross revenue (price x quantity), maintained alongside SalesDaily."""
+
+    __tablename__ = 'product_sales_daily'
+    __table_args__ = (
+        Index('ix_product_sales_daily_product', 'product_id'),
+    )
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    product_id: Mapped[str] = mapped_column(String, primary_key=True)
+    title: Mapped[str] = mapped_column(String, nullable=False)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    revenue: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class Lease(Base):
+    """A named lease held by one worker process until `expires_at`; see services/leases.py."""
+
+    __tablename__ = 'leases'
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    holder: Mapped[str] = mapped_column(String, nullable=False)
+    acquired_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    renewed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
 
 
 class RateLimit(Base):
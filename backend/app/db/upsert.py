@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(dialect: str, model: Any) -> Any:
+    """
+    Dialect-specific INSERT supporting `on_conflict_do_update` / `excluded`.
+
+    SQLite (3.24+) and PostgreSQL share the ON CONFLICT syntax, so callers build one statement
+    for both; any other backend is rejected rather than silently falling back to read-modify-write.
+    """
+    if dialect == 'sqlite':
+        return sqlite.insert(model)
+    if dialect == 'postgresql':
+        return postgresql.insert(model)
+    raise NotImplementedError(f'Upserts are not supported for dialect {dialect!r}')
+
+
+def upsert_insert(db: Session | AsyncSession, model: Any) -> Any:
+    return dialect_insert(db.get_bind().dialect.name, model)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import logging
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse
@@ -7,20 +9,36 @@ from starlette.middleware.trustedhost import TrustedHostMiddleware
 
 from .api.errors import install_exception_handlers
 from .api.router import api_router
-import os
 from pathlib import Path
 
 from .core.logging import setup_logging
+from .core.scheduler import IntervalTrigger, Scheduler
 from .core.settings import REPO_DIR, settings
 from .services.ai_service import AiService
-from .services.delivery_service import DeliveryService
+from .services.delivery_service import DeliveryService, get_delivery_hot_addresses_path
 from .services.evotor_auth import EvotorWebhookAuth
 from .services.evotor_client import EvotorClient
-from .services.evotor_service import EvotorService
+from .services.evotor_service import EvotorService, create_runtime_config_store, get_evotor_token_store_path
 from .services.evotor_token_store import EvotorTokenStore
+from .services.leases import LeaseManager
 from .services.maintenance_service import MaintenanceService
+from .services.order_events import OrderEventBus
+from .services.readiness import ReadinessProbe
 from .services.sms import create_sms_sender
-from .core.database import SessionLocal
+from .services.warmup import StartupWarmup
+from .core.async_database import dispose_async_engines
+from .core.database import (
+    ReadSessionLocal,
+    SessionLocal,
+    create_write_queue,
+    engine,
+    read_engine,
+    sqlite_checkpoint_and_optimize,
+    sqlite_warm_hot_pages,
+)
+from .utils.http import get_default_transport
+
+logger = logging.getLogger(__name__)
 
 
 def _install_spa_routes(app: FastAPI) -> None:
@@ -68,7 +86,7 @@ def create_app() -> FastAPI:
         allow_origins=settings.cors_origins,
         allow_credentials=True,
         allow_methods=['GET', 'POST', 'PATCH', 'OPTIONS'],
-        allow_headers=['Content-Type', 'Authorization'],
+        allow_headers=['Content-Type', 'Authorization', 'Idempotency-Key'],
     )
 
     install_exception_handlers(app)
@@ -138,39 +156,133 @@ def create_app() -> FastAPI:
 
         return response
 
-    maintenance = MaintenanceService(session_factory=SessionLocal)
-    app.state.maintenance_service = maintenance
+    app.state.order_events = OrderEventBus(session_factory=ReadSessionLocal)
+    write_queue = create_write_queue()
+    app.state.write_queue = write_queue
+    readiness = ReadinessProbe(
+        bind=read_engine,
+        pools={'write': engine, 'read': read_engine} if read_engine is not engine else {'write': engine},
+        write_queue=write_queue,
+        ping_timeout_ms=settings.ready_ping_timeout_ms,
+        ping_cache_ms=settings.ready_ping_cache_ms,
+        max_pool_saturation_percent=settings.ready_max_pool_saturation_percent,
+        max_write_queue_depth=settings.ready_max_write_queue_depth,
+    )
+    app.state.readiness = readiness
 
     @app.on_event('startup')
     def _startup() -> None:
-        maintenance.start_background_cleanup(interval_ms=settings.session_cleanup_interval_ms)
+        # Migrations run before the server starts (scripts/migrate.py), so the schema is checked once here.
+        readiness.verify_schema()
+        warmup.start()
+        if leases is not None:
+            leases.start()
+        scheduler.start()
 
     @app.on_event('shutdown')
     def _shutdown() -> None:
         maintenance.stop()
+        app.state.order_events.close()
+        scheduler.stop()
+        if leases is not None:
+            leases.stop()
+        if write_queue is not None:
+            write_queue.stop()
+        save_hot_addresses()
+        readiness.close()
+        app.state.evotor_service.close()
+        http_transport.close()
 
-    app.state.sms_sender = create_sms_sender(settings)
-    app.state.ai_service = AiService()
+    @app.on_event('shutdown')
+    async def _dispose_async_engines() -> None:
+        await dispose_async_engines()
+
+    http_transport = get_default_transport()
+    app.state.http_transport = http_transport
+    app.state.sms_sender = create_sms_sender(settings, transport=http_transport)
+    app.state.ai_service = AiService(transport=http_transport)
     app.state.delivery_service = DeliveryService(
         cache_ttl_ms=settings.delivery_zone_cache_ttl_ms,
         user_agent=settings.nominatim_user_agent,
         geocoder_provider=settings.delivery_geocoder_provider,
         nominatim_base_url=settings.nominatim_base_url,
         photon_base_url=settings.photon_base_url,
+        transport=http_transport,
     )
     evotor_auth = EvotorWebhookAuth()
-    raw_token_store_path = (os.getenv('EVOTOR_TOKEN_STORE_PATH') or '').strip()
-    token_store_path = (
-        (Path(raw_token_store_path) if Path(raw_token_store_path).is_absolute() else (REPO_DIR / raw_token_store_path))
-        if raw_token_store_path
-        else (REPO_DIR / '.evotor' / 'tokens.json')
-    )
     app.state.evotor_auth = evotor_auth
     app.state.evotor_service = EvotorService(
         auth=evotor_auth,
-        token_store=EvotorTokenStore(token_store_path),
-        client=EvotorClient(),
+        token_store=EvotorTokenStore(get_evotor_token_store_path()),
+        client=EvotorClient(transport=http_transport),
+        config=create_runtime_config_store(),
+        fetch_workers=settings.evotor_fetch_workers,
+    )
+
+    # Each uvicorn worker runs create_app(); the lease keeps periodic jobs on one of them.
+    leases = LeaseManager(session_factory=SessionLocal, ttl_ms=settings.leader_lease_ttl_ms) if settings.leader_election else None
+    app.state.leases = leases
+    scheduler = Scheduler(
+        max_workers=settings.scheduler_workers,
+        is_leader=leases.is_leader if leases is not None else None,
+        register_lease=leases.register if leases is not None else None,
+    )
+    app.state.scheduler = scheduler
+
+    maintenance = MaintenanceService(
+        session_factory=SessionLocal,
+        order_history_keep=settings.order_history_keep,
+        checkpoint=sqlite_checkpoint_and_optimize,
+        caches={
+            'deliveryZoneCache': app.state.delivery_service.purge_expired_cache,
+            'evotorCache': app.state.evotor_service.purge_expired_cache,
+        },
+        sweep_batch_size=settings.expiry_sweep_batch_size,
+        sweep_max_batches=settings.expiry_sweep_max_batches,
+        is_leader=leases.is_leader if leases is not None else None,
+    )
+    app.state.maintenance_service = maintenance
+    maintenance.register_jobs(
+        scheduler,
+        cleanup_interval_ms=settings.session_cleanup_interval_ms,
+        checkpoint_interval_ms=settings.sqlite_checkpoint_interval_ms,
+        trim_cron=settings.order_history_trim_cron,
+    )
+    if settings.evotor_menu_sync_interval_ms > 0:
+        # Menu cache and catalog index are per process, so every worker syncs its own (no lease).
+        scheduler.add_job(
+            'evotor_menu_sync',
+            app.state.evotor_service.sync_menu,
+            IntervalTrigger(settings.evotor_menu_sync_interval_ms / 1000.0),
+            jitter_s=15.0,
+            timeout_s=60.0,
+        )
+
+    hot_addresses_path = get_delivery_hot_addresses_path()
+
+    def save_hot_addresses() -> None:
+        try:
+            app.state.delivery_service.save_hot_addresses(hot_addresses_path, limit=settings.warmup_hot_addresses)
+        except OSError:
+            logger.warning('Failed to save delivery address snapshot: %s', hot_addresses_path)
+
+    if settings.warmup_hot_addresses > 0:
+        # Per-worker rankings; whichever worker writes last wins, which is close enough for warm-up.
+        scheduler.add_job('delivery_hot_addresses_snapshot', save_hot_addresses, IntervalTrigger(10 * 60.0), jitter_s=60.0)
+
+    # First requests after a restart otherwise pay for the Evotor menu fetch, cold geocoder
+    # lookups and cold SQLite pages; /api/ready waits for this (or its budget) to finish.
+    warmup = StartupWarmup(
+        {
+            'menu': lambda deadline: app.state.evotor_service.sync_menu(),
+            'deliveryAddresses': lambda deadline: app.state.delivery_service.warm_hot_addresses(
+                hot_addresses_path, limit=settings.warmup_hot_addresses, deadline=deadline
+            ),
+            'sqlitePages': lambda deadline: sqlite_warm_hot_pages(deadline=deadline),
+        },
+        budget_ms=settings.warmup_budget_ms,
     )
+    app.state.warmup = warmup
 
     app.include_router(api_router, prefix='/api')
     _install_spa_routes(app)
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+
+def delete_expired_batch(
+    db: Session,
+    key: InstrumentedAttribute[Any],
+    expires: InstrumentedAttribute[Any],
+    *,
+    before: Any,
+    limit: int,
+) -> int:
+    """
+    Delete at most `limit` rows with `expires < before`, so a large backlog is removed in short
+    transactions instead of one long write lock. Walks the `expires` index; uses `key` to target rows.
+    """
+    stale = select(key).where(expires < before).limit(max(1, int(limit)))
+    result = db.execute(delete(key.class_).where(key.in_(stale)).execution_options(synchronize_session=False))
+    return int(getattr(result, 'rowcount', 0) or 0)
+
+
+def expired_backlog(
+    db: Session,
+    expires: InstrumentedAttribute[Any],
+    *,
+    before: Any,
+    cap: int,
+) -> tuple[int, Any]:
+    """(expired rows left, counted up to `cap`; the oldest `expires` value among them or None)."""
+    counted = select(expires).where(expires < before).limit(max(1, int(cap))).subquery()
+    count = int(db.execute(select(func.count()).select_from(counted)).scalar() or 0)
+    if not count:
+        return 0, None
+    oldest = db.execute(select(func.min(expires)).where(expires < before)).scalar()
+    return count, oldest
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from functools import cache
+from typing import Any
+
+from sqlalchemy import and_, case, delete, or_, select
+from sqlalchemy.orm import Session
+
+from ..db.models import Lease
+from ..db.upsert import dialect_insert
+
+
+@dataclass(frozen=True, slots=True)
+class LeaseRecord:
+    name: str
+    holder: str
+    acquired_at: datetime
+    renewed_at: datetime
+    expires_at: datetime
+
+
+_LEASE_COLUMNS = (Lease.name, Lease.holder, Lease.acquired_at, Lease.renewed_at, Lease.expires_at)
+
+
+@cache
+def _acquire_lease(dialect: str) -> Any:
+    """
+    Take or renew a lease in one statement: the conflicting row is only overwritten when the caller
+    already holds it or it has expired, so RETURNING yields a row exactly when the caller is the holder.
+    """
+    stmt = dialect_insert(dialect, Lease)
+    return stmt.on_conflict_do_update(
+        index_elements=[Lease.name],
+        set_={
+            'holder': stmt.excluded.holder,
+            'acquired_at': case((Lease.holder == stmt.excluded.holder, Lease.acquired_at), else_=stmt.excluded.acquired_at),
+            'renewed_at': stmt.excluded.renewed_at,
+            'expires_at': stmt.excluded.expires_at,
+        },
+        where=or_(Lease.holder == stmt.excluded.holder, Lease.expires_at < stmt.excluded.renewed_at),
+    ).returning(Lease.holder)
+
+
+class LeaseRepository:
+    def __init__(self, db: Session) -> None:
+        self._db = db
+
+    def try_acquire(self, name: str, *, holder: str, now: datetime, expires_at: datetime) -> bool:
+        connection = self._db.connection()
+        row = connection.execute(
+            _acquire_lease(connection.dialect.name),
+            {'name': name, 'holder': holder, 'acquired_at': now, 'renewed_at': now, 'expires_at': expires_at},
+        ).first()
+        return row is not None
+
+    def release(self, name: str, *, holder: str) -> bool:
+        result = self._db.execute(delete(Lease).where(and_(Lease.name == name, Lease.holder == holder)))
+        return int(getattr(result, 'rowcount', 0) or 0) > 0
+
+    def list_all(self) -> list[LeaseRecord]:
+        rows = self._db.execute(select(*_LEASE_COLUMNS).order_by(Lease.name)).all()
+        return [LeaseRecord(*row) for row in rows]
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from ..db.models import LoyaltyLedgerEntry, User
+
+
+class LoyaltyRepository:
+    def __init__(self, db: Session) -> None:
+        self._db = db
+
+    def apply_delta(self, user_id: str, *, delta: int, min_balance: int = 0) -> int | None:
+        """
+        Atomically add `delta` to the user's balance if it is at least `min_balance`.
+
+        One `UPDATE users SET loyalty_points = loyalty_points + ? ... RETURNING`, so concurrent
+        checkouts never lose updates. Returns the new balance, or None when the guard failed.
+        A User already loaded in this session is synchronized from the RETURNING row.
+        """
+        stmt = (
+            update(User)
+            .where(User.id == user_id, User.loyalty_points >= min_balance)
+            .values(loyalty_points=User.loyalty_points + delta)
+            .returning(User.loyalty_points)
+        )
+        row = self._db.execute(stmt).first()
+        return int(row[0]) if row else None
+
+    def add_entries(self, user_id: str, entries: list[tuple[int, str]], *, order_id: str | None, now: datetime) -> None:
+        rows = [
+            {'user_id': user_id, 'order_id': order_id, 'delta': delta, 'reason': reason, 'created_at': now}
+            for delta, reason in entries
+            if delta
+        ]
+        if rows:
+            self._db.execute(insert(LoyaltyLedgerEntry), rows)
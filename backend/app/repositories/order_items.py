@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from ..db.models import OrderItem
+
+
+class OrderItemRepository:
+    def __init__(self, db: Session) -> None:
+        self._db = db
+
+    def add_many(self, order_id: str, items: list[dict[str, Any]]) -> None:
+        """Insert all lines of one order with a single executemany."""
+        rows = [
+            {
+                'order_id': order_id,
+                'product_id': str(item['id']),
+                'title': str(item['title']),
+                'price': float(item['price']),
+                'quantity': int(item['quantity']),
+            }
+            for item in items
+        ]
+        if rows:
+            self._db.execute(insert(OrderItem), rows)
@@ -1,23 +1,167 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections.abc import Collection, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
 
-from sqlalchemy import delete, select
+from sqlalchemy import Row, Select, and_, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..db.models import Order
+from ..db.models import Order, OrderItem
+
+
+@dataclass(frozen=True)
+class OrderSummary:
+    id: str
+    user_id: str
+    date: datetime
+    total: float
+    status: str
+    item_count: int
+
+
+def _keyset_before(before: tuple[datetime, str] | None):  # type: ignore[no-untyped-def]
+    if before is None:
+        return None
+    before_date, before_id = before
+    return or_(Order.date < before_date, and_(Order.date == before_date, Order.id < before_id))
+
+
+# Statement builders shared by OrderRepository and AsyncOrderRepository.
+def _list_for_user(user_id: str, limit: int, before: tuple[datetime, str] | None) -> Select[tuple[Order]]:
+    stmt = select(Order).where(Order.user_id == user_id)
+    keyset = _keyset_before(before)
+    if keyset is not None:
+        stmt = stmt.where(keyset)
+    return stmt.order_by(Order.date.desc(), Order.id.desc()).limit(limit)
+
+
+def _list_summaries_for_user(user_id: str, limit: int, before: tuple[datetime, str] | None) -> Select[Any]:
+    stmt = select(
+        Order.id,
+        Order.user_id,
+        Order.date,
+        Order.total,
+        Order.status,
+        func.json_array_length(Order.items),
+    ).where(Order.user_id == user_id)
+    keyset = _keyset_before(before)
+    if keyset is not None:
+        stmt = stmt.where(keyset)
+    return stmt.order_by(Order.date.desc(), Order.id.desc()).limit(limit)
+
+
+def _summary(row: Row[Any]) -> OrderSummary:
+    return OrderSummary(
+        id=row[0],
+        user_id=row[1],
+        date=row[2],
+        total=row[3],
+        status=row[4],
+        item_count=int(row[5] or 0),
+    )
+
+
+def _get_for_user(user_id: str, order_id: str) -> Select[tuple[Order]]:
+    return select(Order).where(Order.id == order_id, Order.user_id == user_id).limit(1)
 
 
 class OrderRepository:
     def __init__(self, db: Session) -> None:
         self._db = db
 
-    def list_for_user(self, user_id: str, *, limit: int = 50) -> Sequence[Order]:
-        stmt = select(Order).where(Order.user_id == user_id).order_by(Order.date.desc()).limit(limit)
+    def list_for_user(
+        self,
+        user_id: str,
+        *,
+        limit: int = 50,
+        before: tuple[datetime, str] | None = None,
+    ) -> Sequence[Order]:
+        """Newest first; `before` is the (date, id) of the last row of the previous page."""
+        return self._db.execute(_list_for_user(user_id, limit, before)).scalars().all()
+
+    def list_summaries_for_user(
+        self,
+        user_id: str,
+        *,
+        limit: int = 50,
+        before: tuple[datetime, str] | None = None,
+    ) -> list[OrderSummary]:
+        """Same page as `list_for_user` without loading or decoding the `items` blob."""
+        return [_summary(row) for row in self._db.execute(_list_summaries_for_user(user_id, limit, before)).all()]
+
+    def list_created_after(self, after: tuple[datetime, str], *, limit: int = 200) -> Sequence[Order]:
+        """Orders of all users after the (date, id) cursor, oldest first; uses ix_orders_date."""
+        after_date, after_id = after
+        stmt = (
+            select(Order)
+            .where(Order.date >= after_date)
+            .where(or_(Order.date > after_date, Order.id > after_id))
+            .order_by(Order.date.asc(), Order.id.asc())
+            .limit(limit)
+        )
         return self._db.execute(stmt).scalars().all()
 
+    def get_for_user(self, user_id: str, order_id: str) -> Order | None:
+        return self._db.execute(_get_for_user(user_id, order_id)).scalars().first()
+
+    def get_by_idempotency_key(self, user_id: str, key: str) -> Order | None:
+        stmt = select(Order).where(Order.user_id == user_id, Order.idempotency_key == key).limit(1)
+        return self._db.execute(stmt).scalars().first()
+
+    def get(self, order_id: str) -> Order | None:
+        # populate_existing: status updates bypass the identity map, so never serve a stale copy.
+        return self._db.get(Order, order_id, populate_existing=True)
+
+    def compare_and_set_status(
+        self,
+        order_id: str,
+        *,
+        expected_version: int,
+        from_statuses: Collection[str],
+        status: str,
+    ) -> bool:
+        """Single `UPDATE ... WHERE id=? AND version=?`; False when another writer got there first."""
+        stmt = (
+            update(Order)
+            .where(Order.id == order_id, Order.version == expected_version, Order.status.in_(from_statuses))
+            .values(status=status, version=Order.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return self._db.execute(stmt).rowcount == 1
+
+    def bulk_set_status(
+        self,
+        order_ids: Collection[str],
+        *,
+        from_statuses: Collection[str],
+        status: str,
+    ) -> list[tuple[str, int]]:
+        """One UPDATE for many orders; returns (id, new version) of the rows that were changed."""
+        stmt = (
+            update(Order)
+            .where(Order.id.in_(order_ids), Order.status.in_(from_statuses))
+            .values(status=status, version=Order.version + 1)
+            .returning(Order.id, Order.version)
+            .execution_options(synchronize_session=False)
+        )
+        return [(row[0], int(row[1])) for row in self._db.execute(stmt).all()]
+
     def add(self, order: Order) -> None:
         self._db.add(order)
+        # Flushed now so order_items rows inserted with Core statements satisfy the FK.
+        self._db.flush()
+
+    def users_over_limit(self, *, keep: int, limit: int = 100) -> list[str]:
+        stmt = (
+            select(Order.user_id)
+            .group_by(Order.user_id)
+            .having(func.count(Order.id) > keep)
+            .limit(limit)
+        )
+        return [row[0] for row in self._db.execute(stmt).all()]
 
     def delete_stale(self, user_id: str, *, keep: int = 50) -> int:
         stmt = select(Order.id).where(Order.user_id == user_id).order_by(Order.date.desc()).offset(keep).limit(500)
@@ -25,6 +169,35 @@ class OrderRepository:
         if not stale_ids:
             return 0
 
+        self._db.execute(delete(OrderItem).where(OrderItem.order_id.in_(stale_ids)))
         self._db.execute(delete(Order).where(Order.id.in_(stale_ids)))
         return len(stale_ids)
 
+
+class AsyncOrderRepository:
+    """Order history reads of OrderRepository for `async def` routes."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        self._db = db
+
+    async def list_for_user(
+        self,
+        user_id: str,
+        *,
+        limit: int = 50,
+        before: tuple[datetime, str] | None = None,
+    ) -> Sequence[Order]:
+        return (await self._db.execute(_list_for_user(user_id, limit, before))).scalars().all()
+
+    async def list_summaries_for_user(
+        self,
+        user_id: str,
+        *,
+        limit: int = 50,
+        before: tuple[datetime, str] | None = None,
+    ) -> list[OrderSummary]:
+        rows = (await self._db.execute(_list_summaries_for_user(user_id, limit, before))).all()
+        return [_summary(row) for row in rows]
+
+    async def get_for_user(self, user_id: str, order_id: str) -> Order | None:
+        return (await self._db.execute(_get_for_user(user_id, order_id))).scalars().first()
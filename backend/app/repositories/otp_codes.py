@@ -1,11 +1,53 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime
+from functools import cache
+from typing import Any
 
-from sqlalchemy import delete, update
+from sqlalchemy import bindparam, delete, select, update
 from sqlalchemy.orm import Session
 
 from ..db.models import OtpCode
+from ..db.upsert import dialect_insert
+from .expiry import delete_expired_batch, expired_backlog
+
+
+@dataclass(frozen=True, slots=True)
+class OtpCodeRecord:
+    phone: str
+    code_hash: str
+    created_at: datetime
+    expires_at: datetime
+    attempts_left: int
+    blocked_until: datetime | None
+
+
+_OTP_CODE_COLUMNS = (
+    OtpCode.phone,
+    OtpCode.code_hash,
+    OtpCode.created_at,
+    OtpCode.expires_at,
+    OtpCode.attempts_left,
+    OtpCode.blocked_until,
+)
+_GET_OTP_CODE = select(*_OTP_CODE_COLUMNS).where(OtpCode.phone == bindparam('phone'))
+_DELETE_OTP_CODE = delete(OtpCode).where(OtpCode.phone == bindparam('phone'))
+
+
+@cache
+def _upsert_otp_code(dialect: str) -> Any:
+    stmt = dialect_insert(dialect, OtpCode)
+    return stmt.on_conflict_do_update(
+        index_elements=[OtpCode.phone],
+        set_={
+            'code_hash': stmt.excluded.code_hash,
+            'created_at': stmt.excluded.created_at,
+            'expires_at': stmt.excluded.expires_at,
+            'attempts_left': stmt.excluded.attempts_left,
+            'blocked_until': stmt.excluded.blocked_until,
+        },
+    ).returning(*_OTP_CODE_COLUMNS)
 
 
 class OtpCodeRepository:
@@ -15,6 +57,10 @@ class OtpCodeRepository:
     def get(self, phone: str) -> OtpCode | None:
         return self._db.get(OtpCode, phone)
 
+    def get_record(self, phone: str) -> OtpCodeRecord | None:
+        row = self._db.connection().execute(_GET_OTP_CODE, {'phone': phone}).first()
+        return OtpCodeRecord(*row) if row else None
+
     def upsert(
         self,
         phone: str,
@@ -24,37 +70,30 @@ class OtpCodeRepository:
         expires_at: datetime,
         attempts_left: int,
         blocked_until: datetime | None = None,
-    ) -> OtpCode:
-        existing = self.get(phone)
-        if existing:
-            existing.code_hash = code_hash
-            existing.created_at = created_at
-            existing.expires_at = expires_at
-            existing.attempts_left = attempts_left
-            existing.blocked_until = blocked_until
-            self._db.flush()
-            return existing
-
-        record = OtpCode(
-            phone=phone,
-            code_hash=code_hash,
-            created_at=created_at,
-            expires_at=expires_at,
-            attempts_left=attempts_left,
-            blocked_until=blocked_until,
-        )
-        self._db.add(record)
-        self._db.flush()
-        return record
+    ) -> OtpCodeRecord:
+        """One `INSERT ... ON CONFLICT (phone) DO UPDATE ... RETURNING`: no read, no insert race."""
+        connection = self._db.connection()
+        row = connection.execute(
+            _upsert_otp_code(connection.dialect.name),
+            {
+                'phone': phone,
+                'code_hash': code_hash,
+                'created_at': created_at,
+                'expires_at': expires_at,
+                'attempts_left': attempts_left,
+                'blocked_until': blocked_until,
+            },
+        ).one()
+        return OtpCodeRecord(*row)
 
     def delete(self, phone: str) -> None:
-        existing = self.get(phone)
-        if existing:
-            self._db.delete(existing)
+        self._db.connection().execute(_DELETE_OTP_CODE, {'phone': phone})
+
+    def delete_expired(self, *, now: datetime, limit: int = 1000) -> int:
+        return delete_expired_batch(self._db, OtpCode.phone, OtpCode.expires_at, before=now, limit=limit)
 
-    def delete_expired(self, *, now: datetime) -> int:
-        result = self._db.execute(delete(OtpCode).where(OtpCode.expires_at < now))
-        return int(getattr(result, 'rowcount', 0) or 0)
+    def expired_backlog(self, *, now: datetime, cap: int = 10_000) -> tuple[int, datetime | None]:
+        return expired_backlog(self._db, OtpCode.expires_at, before=now, cap=cap)
 
     def decrement_attempts(self, phone: str) -> bool:
         """
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..db.models import ProductSalesDaily, SalesDaily
+from ..db.upsert import upsert_insert
+
+
+class SalesRollupRepository:
+    def __init__(self, db: Session) -> None:
+        self._db = db
+
+    def record_order(self, *, day: date, items: list[dict[str, Any]]) -> None:
+        """
+        Add one order to the day and product rollups; two upserts, no reads. Revenue in both is
+        gross (menu price x quantity, before loyalty points), so a day equals the sum of its dishes.
+        """
+        products: dict[str, dict[str, Any]] = {}
+        item_count = 0
+        revenue = 0.0
+        for item in items:
+            quantity = int(item['quantity'])
+            item_count += quantity
+            row = products.setdefault(
+                str(item['id']),
+                {'day': day, 'product_id': str(item['id']), 'title': str(item['title']), 'quantity': 0, 'revenue': 0.0},
+            )
+            row['quantity'] += quantity
+            row['revenue'] += float(item['price']) * quantity
+            revenue += float(item['price']) * quantity
+
+        stmt = upsert_insert(self._db, SalesDaily).values(
+            day=day,
+            order_count=1,
+            item_count=item_count,
+            revenue=revenue,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SalesDaily.day],
+            set_={
+                'order_count': SalesDaily.order_count + stmt.excluded.order_count,
+                'item_count': SalesDaily.item_count + stmt.excluded.item_count,
+                'revenue': SalesDaily.revenue + stmt.excluded.revenue,
+            },
+        )
+        self._db.execute(stmt)
+
+        if not products:
+            return
+
+        product_stmt = upsert_insert(self._db, ProductSalesDaily)
+        product_stmt = product_stmt.on_conflict_do_update(
+            index_elements=[ProductSalesDaily.day, ProductSalesDaily.product_id],
+            set_={
+                'title': product_stmt.excluded.title,
+                'quantity': ProductSalesDaily.quantity + product_stmt.excluded.quantity,
+                'revenue': ProductSalesDaily.revenue + product_stmt.excluded.revenue,
+            },
+        )
+        self._db.execute(product_stmt, list(products.values()))
+
+    def revenue_by_day(self, *, since: date) -> list[dict[str, object]]:
+        stmt = (
+            select(SalesDaily.day, SalesDaily.order_count, SalesDaily.item_count, SalesDaily.revenue)
+            .where(SalesDaily.day >= since)
+            .order_by(SalesDaily.day)
+        )
+        return [
+            {'day': row[0].isoformat(), 'orders': int(row[1]), 'items': int(row[2]), 'grossRevenue': float(row[3])}
+            for row in self._db.execute(stmt).all()
+        ]
+
+    def top_products(self, *, since: date, limit: int = 10) -> list[dict[str, object]]:
+        quantity = func.sum(ProductSalesDaily.quantity).label('quantity')
+        stmt = (
+            select(
+                ProductSalesDaily.product_id,
+                func.max(ProductSalesDaily.title),
+                quantity,
+                func.sum(ProductSalesDaily.revenue),
+            )
+            .where(ProductSalesDaily.day >= since)
+            .group_by(ProductSalesDaily.product_id)
+            .order_by(quantity.desc())
+            .limit(limit)
+        )
+        return [
+            {'productId': row[0], 'title': row[1], 'quantity': int(row[2] or 0), 'grossRevenue': float(row[3] or 0)}
+            for row in self._db.execute(stmt).all()
+        ]
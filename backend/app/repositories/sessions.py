@@ -1,11 +1,29 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime
 
-from sqlalchemy import delete
+from sqlalchemy import bindparam, delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..db.models import Session as DbSession
+from .expiry import delete_expired_batch, expired_backlog
+
+
+@dataclass(frozen=True, slots=True)
+class SessionRecord:
+    token: str
+    user_id: str
+    created_at: datetime
+    expires_at: datetime
+
+
+# Built once: SQLAlchemy reuses the compiled form from its statement cache on every call.
+_SESSION_COLUMNS = (DbSession.token, DbSession.user_id, DbSession.created_at, DbSession.expires_at)
+_GET_SESSION = select(*_SESSION_COLUMNS).where(DbSession.token == bindparam('token'))
+_INSERT_SESSION = insert(DbSession).returning(*_SESSION_COLUMNS)
+_DELETE_SESSION = delete(DbSession).where(DbSession.token == bindparam('token'))
 
 
 class SessionRepository:
@@ -15,25 +33,27 @@ class SessionRepository:
     def get(self, token: str) -> DbSession | None:
         return self._db.get(DbSession, token)
 
-    def create(self, *, token: str, user_id: str, created_at: datetime, expires_at: datetime) -> DbSession:
-        session = DbSession(
-            token=token,
-            user_id=user_id,
-            created_at=created_at,
-            expires_at=expires_at,
-        )
-        self._db.add(session)
-        self._db.flush()
-        return session
+    def get_record(self, token: str) -> SessionRecord | None:
+        """Hot-path lookup: a Core select on the session's connection, no identity map."""
+        row = self._db.connection().execute(_GET_SESSION, {'token': token}).first()
+        return SessionRecord(*row) if row else None
+
+    def create(self, *, token: str, user_id: str, created_at: datetime, expires_at: datetime) -> SessionRecord:
+        """A single Core `INSERT ... RETURNING`; tokens are random, so there is nothing to upsert."""
+        row = self._db.connection().execute(
+            _INSERT_SESSION,
+            {'token': token, 'user_id': user_id, 'created_at': created_at, 'expires_at': expires_at},
+        ).one()
+        return SessionRecord(*row)
 
     def delete(self, token: str) -> None:
-        session = self.get(token)
-        if session:
-            self._db.delete(session)
+        self._db.connection().execute(_DELETE_SESSION, {'token': token})
 
-    def delete_expired(self, *, now: datetime) -> int:
-        result = self._db.execute(delete(DbSession).where(DbSession.expires_at < now))
-        return int(getattr(result, 'rowcount', 0) or 0)
+    def delete_expired(self, *, now: datetime, limit: int = 1000) -> int:
+        return delete_expired_batch(self._db, DbSession.token, DbSession.expires_at, before=now, limit=limit)
+
+    def expired_backlog(self, *, now: datetime, cap: int = 10_000) -> tuple[int, datetime | None]:
+        return expired_backlog(self._db, DbSession.expires_at, before=now, cap=cap)
 
     def delete_for_user(self, *, user_id: str, except_token: str | None = None) -> int:
         stmt = delete(DbSession).where(DbSession.user_id == user_id)
@@ -41,3 +61,14 @@ class SessionRepository:
             stmt = stmt.where(DbSession.token != except_token)
         result = self._db.execute(stmt)
         return int(getattr(result, 'rowcount', 0) or 0)
+
+
+class AsyncSessionRepository:
+    """The per-request lookups of SessionRepository for `async def` routes."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        self._db = db
+
+    async def get_record(self, token: str) -> SessionRecord | None:
+        row = (await self._db.execute(_GET_SESSION, {'token': token})).first()
+        return SessionRecord(*row) if row else None
@@ -1,11 +1,30 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..db.models import User
+from .loyalty import LoyaltyRepository
+
+WELCOME_POINTS = 150
+
+
+@dataclass(frozen=True, slots=True)
+class UserRecord:
+    id: str
+    phone: str
+    name: str
+    loyalty_points: int
+    joined_date: datetime
+
+
+_USER_COLUMNS = (User.id, User.phone, User.name, User.loyalty_points, User.joined_date)
+_GET_USER = select(*_USER_COLUMNS).where(User.id == bindparam('user_id'))
+_GET_LOYALTY_POINTS = select(User.loyalty_points).where(User.id == bindparam('user_id'))
 
 
 class UserRepository:
@@ -15,6 +34,20 @@ class UserRepository:
     def get_by_id(self, user_id: str) -> User | None:
         return self._db.get(User, user_id)
 
+    def get_record(self, user_id: str) -> UserRecord | None:
+        """Hot-path lookup for the per-request user snapshot; Core select, no identity map."""
+        row = self._db.connection().execute(_GET_USER, {'user_id': user_id}).first()
+        return UserRecord(*row) if row else None
+
+    def get_loyalty_points(self, user_id: str) -> int | None:
+        value = self._db.connection().execute(_GET_LOYALTY_POINTS, {'user_id': user_id}).scalar()
+        return int(value) if value is not None else None
+
+    def update_name(self, user_id: str, name: str) -> UserRecord | None:
+        stmt = update(User).where(User.id == user_id).values(name=name).returning(*_USER_COLUMNS)
+        row = self._db.connection().execute(stmt).first()
+        return UserRecord(*row) if row else None
+
     def get_by_phone(self, phone: str) -> User | None:
         stmt = select(User).where(User.phone == phone).limit(1)
         return self._db.execute(stmt).scalars().first()
@@ -28,10 +61,26 @@ class UserRepository:
             id=phone,
             phone=phone,
             name='Гость',
-            loyalty_points=150,
+            loyalty_points=WELCOME_POINTS,
             joined_date=now,
         )
         self._db.add(user)
         self._db.flush()
+        LoyaltyRepository(self._db).add_entries(user.id, [(WELCOME_POINTS, 'welcome')], order_id=None, now=now)
         return user
 
+
+
+class AsyncUserRepository:
+    """The per-request lookups of UserRepository for `async def` routes."""
+
+    def __init__(self, db: AsyncSession) -> None:
+        self._db = db
+
+    async def get_record(self, user_id: str) -> UserRecord | None:
+        row = (await self._db.execute(_GET_USER, {'user_id': user_id})).first()
+        return UserRecord(*row) if row else None
+
+    async def get_loyalty_points(self, user_id: str) -> int | None:
+        value = (await self._db.execute(_GET_LOYALTY_POINTS, {'user_id': user_id})).scalar()
+        return int(value) if value is not None else None
@@ -0,0 +1,150 @@
+"""
+Micro-benchmark: ORM identity-map lookups and read-modify-write updates vs the Core fast paths
+(prebuilt selects, ON CONFLICT upserts) used on every request.
+
+Runs against a throwaway SQLite file, one short-lived Session per iteration like a request:
+
+    python -m app.scripts.bench_repositories [iterations]
+"""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.models import Base, OtpCode, RateLimit, Session as DbSession, User
+from app.repositories.otp_codes import OtpCodeRepository
+from app.repositories.sessions import SessionRepository
+from app.repositories.users import UserRepository
+from app.services.rate_limiter import FixedWindowRateLimiter
+from app.utils.time import utc_now
+
+_TOKEN = 'bench-token'
+_PHONE = '+79990000000'
+
+
+def _seed(db: Session) -> None:
+    now = utc_now()
+    db.add(User(id=_PHONE, phone=_PHONE, name='Bench', loyalty_points=0, joined_date=now))
+    db.flush()
+    db.add(DbSession(token=_TOKEN, user_id=_PHONE, created_at=now, expires_at=now + timedelta(days=1)))
+    db.add(
+        OtpCode(
+            phone=_PHONE,
+            code_hash='0' * 64,
+            created_at=now,
+            expires_at=now + timedelta(minutes=5),
+            attempts_left=5,
+        )
+    )
+    db.commit()
+
+
+def _orm_consume(db: Session, key: str, limit: int, window_ms: int) -> int | None:
+    # The read-modify-write ORM version FixedWindowRateLimiter.consume used before the Core path.
+    now = int(time.time() * 1000)
+    bucket = db.get(RateLimit, key)
+    if bucket is None or now > bucket.reset_at_ms:
+        if bucket:
+            bucket.count = 1
+            bucket.reset_at_ms = now + window_ms
+        else:
+            db.add(RateLimit(key=key, count=1, reset_at_ms=now + window_ms))
+        db.commit()
+        return None
+    if bucket.count >= limit:
+        return max(0, bucket.reset_at_ms - now)
+    bucket.count += 1
+    db.commit()
+    return None
+
+
+def _orm_upsert_otp(db: Session) -> None:
+    # The get-then-update-or-insert OtpCodeRepository.upsert used before ON CONFLICT.
+    now = utc_now()
+    record = db.get(OtpCode, _PHONE)
+    if record is None:
+        db.add(OtpCode(phone=_PHONE, code_hash='1' * 64, created_at=now, expires_at=now, attempts_left=5))
+    else:
+        record.code_hash = '1' * 64
+        record.created_at = now
+        record.expires_at = now
+        record.attempts_left = 5
+        record.blocked_until = None
+    db.commit()
+
+
+def _upsert_otp(db: Session) -> None:
+    now = utc_now()
+    OtpCodeRepository(db).upsert(_PHONE, code_hash='1' * 64, created_at=now, expires_at=now, attempts_left=5)
+    db.commit()
+
+
+def _time(factory: sessionmaker[Session], iterations: int, fn: Callable[[Session], object]) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        db = factory()
+        try:
+            fn(db)
+        finally:
+            db.close()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main() -> int:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    big_limit = iterations * 10
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f'sqlite:///{Path(tmp) / "bench.db"}')
+        Base.metadata.create_all(engine)
+        factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+        with factory() as db:
+            _seed(db)
+
+        cases: list[tuple[str, Callable[[Session], object], Callable[[Session], object]]] = [
+            (
+                'SessionRepository',
+                lambda db: SessionRepository(db).get(_TOKEN),
+                lambda db: SessionRepository(db).get_record(_TOKEN),
+            ),
+            (
+                'UserRepository',
+                lambda db: UserRepository(db).get_by_id(_PHONE),
+                lambda db: UserRepository(db).get_record(_PHONE),
+            ),
+            (
+                'OtpCodeRepository',
+                lambda db: OtpCodeRepository(db).get(_PHONE),
+                lambda db: OtpCodeRepository(db).get_record(_PHONE),
+            ),
+            ('OtpCodeRepository.upsert', _orm_upsert_otp, _upsert_otp),
+            (
+                'FixedWindowRateLimiter',
+                lambda db: _orm_consume(db, 'bench:orm', big_limit, 60_000),
+                lambda db: FixedWindowRateLimiter(db).consume(key='bench:core', limit=big_limit, window_ms=60_000),
+            ),
+        ]
+
+        print(f'{"lookup":<28}{"orm us/op":>12}{"core us/op":>12}{"speedup":>10}')
+        for name, orm_fn, core_fn in cases:
+            # Warm both paths so statement compilation is cached before timing.
+            _time(factory, 50, orm_fn)
+            _time(factory, 50, core_fn)
+            orm_us = _time(factory, iterations, orm_fn)
+            core_us = _time(factory, iterations, core_fn)
+            print(f'{name:<28}{orm_us:>12.1f}{core_us:>12.1f}{orm_us / core_us:>9.2f}x')
+
+        engine.dispose()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,89 @@
+"""
+Benchmark the SQLITE_PROFILE presets on a scratch database file.
+
+Each profile gets a fresh WAL database and runs the same workload: small write transactions
+(one commit each, like a rate-limit hit or session rotation), primary-key reads and a checkpoint:
+
+    python -m app.scripts.bench_sqlite_profiles [transactions]
+"""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import bindparam, create_engine, event, insert, select, update
+
+from app.core.sqlite_profiles import SQLITE_PROFILES, SqliteProfile, apply_sqlite_profile
+from app.db.models import Base, RateLimit
+
+
+def _bench(profile: SqliteProfile, path: Path, transactions: int) -> dict[str, float]:
+    engine = create_engine(
+        f'sqlite:///{path}',
+        connect_args={'check_same_thread': False},
+        pool_size=profile.pool_size,
+        max_overflow=profile.max_overflow,
+    )
+
+    @event.listens_for(engine, 'connect')
+    def _pragmas(dbapi_connection: object, _record: object) -> None:
+        cur = dbapi_connection.cursor()  # type: ignore[attr-defined]
+        try:
+            cur.execute('PRAGMA journal_mode=WAL')
+            cur.fetchall()
+            apply_sqlite_profile(cur, profile)
+        finally:
+            cur.close()
+
+    Base.metadata.create_all(engine)
+    keys = [f'bench:{i % 500}' for i in range(transactions)]
+
+    started = time.perf_counter()
+    with engine.connect() as connection:
+        for i, key in enumerate(keys):
+            if i < 500:
+                connection.execute(insert(RateLimit).values(key=key, count=1, reset_at_ms=i))
+            else:
+                connection.execute(update(RateLimit).where(RateLimit.key == key).values(count=RateLimit.count + 1))
+            connection.commit()
+    write_s = time.perf_counter() - started
+
+    stmt = select(RateLimit.count).where(RateLimit.key == bindparam('k'))
+    started = time.perf_counter()
+    with engine.connect() as connection:
+        for key in keys:
+            connection.execute(stmt, {'k': key}).scalar()
+    read_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with engine.connect() as connection:
+        connection.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)').one()
+    checkpoint_ms = (time.perf_counter() - started) * 1000
+
+    engine.dispose()
+    return {
+        'commits_per_s': transactions / write_s,
+        'reads_per_s': transactions / read_s,
+        'checkpoint_ms': checkpoint_ms,
+    }
+
+
+def main() -> int:
+    transactions = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    print(f'{"profile":<10}{"commits/s":>12}{"reads/s":>12}{"checkpoint ms":>15}')
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, profile in SQLITE_PROFILES.items():
+            result = _bench(profile, Path(tmp) / f'{name}.db', transactions)
+            print(
+                f'{name:<10}{result["commits_per_s"]:>12.0f}{result["reads_per_s"]:>12.0f}'
+                f'{result["checkpoint_ms"]:>15.1f}'
+            )
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
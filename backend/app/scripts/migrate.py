@@ -6,11 +6,9 @@ from alembic import command
 from alembic.config import Config
 from sqlalchemy import inspect
 
-from app.core.database import engine
+from app.core.database import REQUIRED_TABLES, engine
 from app.core.settings import BACKEND_DIR
 
-REQUIRED_TABLES = {'users', 'sessions', 'otp_codes', 'orders'}
-
 
 def main() -> int:
     with engine.connect() as connection:
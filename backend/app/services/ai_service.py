@@ -5,6 +5,7 @@ import os
 import re
 from typing import Any
 
+from ..utils.http import HttpTransport, get_default_transport
 from .errors import ServiceError
 from .gemini_client import GeminiClient
 
@@ -60,14 +61,15 @@ def _normalize_zone_result(input_value: Any) -> dict[str, Any]:
 
 
 class AiService:
-    def __init__(self, *, user_agent: str = 'obedi-vl/1.0 (server)') -> None:
+    def __init__(self, *, user_agent: str = 'obedi-vl/1.0 (server)', transport: HttpTransport | None = None) -> None:
         self._user_agent = user_agent
+        self._transport = transport or get_default_transport()
 
     def _client(self) -> GeminiClient:
         key = _api_key()
         if not key:
             raise ServiceError('GEMINI_API_KEY is not configured', 501)
-        return GeminiClient(api_key=key, user_agent=self._user_agent)
+        return GeminiClient(api_key=key, user_agent=self._user_agent, transport=self._transport)
 
     def recommendation(self, *, message: str, history: list[dict[str, Any]], menu_items: list[dict[str, Any]]) -> str:
         if not isinstance(message, str) or not message.strip():
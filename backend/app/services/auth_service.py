@@ -1,16 +1,20 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
-from datetime import timedelta
+from collections.abc import Callable
+from datetime import datetime, timedelta
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..core.settings import settings
+from ..core.write_queue import WriteQueue, run_write, run_write_async
 from ..db.models import User
 from ..repositories.otp_codes import OtpCodeRepository
-from ..repositories.sessions import SessionRepository
-from ..repositories.users import UserRepository
+from ..repositories.sessions import AsyncSessionRepository, SessionRecord, SessionRepository
+from ..repositories.users import AsyncUserRepository, UserRecord, UserRepository
 from ..utils.phone import normalize_phone
 from ..utils.security import random_otp_code, random_session_token, sha256_hex, timing_safe_equal_hex
 from ..utils.time import utc_now
@@ -34,8 +38,8 @@ class OtpRateLimiter:
     Database-backed OTP rate limiter.
     Works across multiple processes.
     """
-    def __init__(self, db: Session) -> None:
-        self._limiter = FixedWindowRateLimiter(db)
+    def __init__(self, db: Session, *, writer: WriteQueue | None = None) -> None:
+        self._limiter = FixedWindowRateLimiter(db, writer=writer)
 
     def consume(self, *, phone: str, ip: str, now_ms: int) -> None:
         # Check IP rate limit (per hour)
@@ -70,13 +74,28 @@ class OtpRateLimiter:
 
 
 class AuthService:
-    def __init__(self, *, db: Session, sms_sender: SmsSender, rate_limiter: OtpRateLimiter) -> None:
+    def __init__(
+        self,
+        *,
+        db: Session,
+        sms_sender: SmsSender,
+        rate_limiter: OtpRateLimiter,
+        writer: WriteQueue | None = None,
+        read_db: Session | None = None,
+        async_read_db: AsyncSession | None = None,
+    ) -> None:
         self._db = db
+        self._writer = writer
         self._sms_sender = sms_sender
         self._rate_limiter = rate_limiter
         self._users = UserRepository(db)
         self._sessions = SessionRepository(db)
         self._otp_codes = OtpCodeRepository(db)
+        # Per-request session/user lookups go to the read engine when one is configured.
+        self._session_reads = SessionRepository(read_db) if read_db is not None else self._sessions
+        self._user_reads = UserRepository(read_db) if read_db is not None else self._users
+        self._async_session_reads = AsyncSessionRepository(async_read_db) if async_read_db is not None else None
+        self._async_user_reads = AsyncUserRepository(async_read_db) if async_read_db is not None else None
 
     def request_otp(self, phone_raw: str, *, client_ip: str) -> None:
         phone = normalize_phone(phone_raw)
@@ -84,7 +103,7 @@ class AuthService:
             raise InvalidPhoneError()
 
         # Check if phone is blocked
-        existing = self._otp_codes.get(phone)
+        existing = self._otp_codes.get_record(phone)
         now = utc_now()
         if existing and existing.blocked_until and now < existing.blocked_until:
             raise TooManyAttemptsError()
@@ -98,15 +117,18 @@ class AuthService:
         created_at = utc_now()
         expires_at = created_at + timedelta(milliseconds=settings.otp_ttl_ms)
 
-        self._otp_codes.upsert(
-            phone,
-            code_hash=code_hash,
-            created_at=created_at,
-            expires_at=expires_at,
-            attempts_left=settings.otp_max_attempts,
-            blocked_until=None,  # Clear any previous block when new OTP is requested
+        run_write(
+            self._db,
+            self._writer,
+            lambda db: OtpCodeRepository(db).upsert(
+                phone,
+                code_hash=code_hash,
+                created_at=created_at,
+                expires_at=expires_at,
+                attempts_left=settings.otp_max_attempts,
+                blocked_until=None,  # Clear any previous block when new OTP is requested
+            ),
         )
-        self._db.commit()
 
         try:
             self._sms_sender.send_otp(phone, code)
@@ -121,7 +143,7 @@ class AuthService:
         if not phone or len(code) != 6:
             raise InvalidInputError()
 
-        record = self._otp_codes.get(phone)
+        record = self._otp_codes.get_record(phone)
         now = utc_now()
 
         if not record or now > record.expires_at:
@@ -148,24 +170,29 @@ class AuthService:
             self._db.commit()
             raise InvalidCodeError()
 
-        self._otp_codes.delete(phone)
-
-        user = self._users.get_or_create_guest(phone, now=now)
-        if settings.session_single_active:
-            self._sessions.delete_for_user(user_id=user.id)
         token = random_session_token()
         expires_at = now + timedelta(milliseconds=settings.session_ttl_ms)
-        self._sessions.create(token=token, user_id=user.id, created_at=now, expires_at=expires_at)
 
-        self._db.commit()
-        self._db.refresh(user)
+        def sign_in(db: Session) -> User:
+            sessions = SessionRepository(db)
+            OtpCodeRepository(db).delete(phone)
+            user = UserRepository(db).get_or_create_guest(phone, now=now)
+            if settings.session_single_active:
+                sessions.delete_for_user(user_id=user.id)
+            sessions.create(token=token, user_id=user.id, created_at=now, expires_at=expires_at)
+            return user
+
+        user = run_write(self._db, self._writer, sign_in)
         return user, token
 
-    def authenticate_session(self, token: str | None) -> tuple[User | None, str | None]:
+    def authenticate_session(self, token: str | None) -> tuple[UserRecord | None, str | None]:
         if not token:
             return None, None
 
-        session = self._sessions.get(token)
+        session = self._session_reads.get_record(token)
+        if not session and self._session_reads is not self._sessions:
+            # A replica may not have the session verify-otp just wrote yet.
+            session = self._sessions.get_record(token)
         if not session:
             return None, None
 
@@ -175,26 +202,76 @@ class AuthService:
             self._db.commit()
             return None, None
 
-        user = self._users.get_by_id(session.user_id)
+        user = self._user_reads.get_record(session.user_id)
+        if not user and self._user_reads is not self._users:
+            user = self._users.get_record(session.user_id)
         if not user:
             self._sessions.delete(token)
             self._db.commit()
             return None, None
 
+        rotation = self._rotation(session, now)
+        if rotation is None:
+            return user, None
+        new_token, rotate = rotation
+        run_write(self._db, self._writer, rotate)
+        return user, new_token
+
+    async def authenticate_session_async(self, token: str | None) -> tuple[UserRecord | None, str | None]:
+        """
+        `authenticate_session` for `async def` routes: lookups run on the async session, and the
+        rare writes (expired session, rotation) go through the writer queue or a worker thread.
+        """
+        if self._async_session_reads is None or self._async_user_reads is None:
+            return await asyncio.to_thread(self.authenticate_session, token)
+        if not token:
+            return None, None
+
+        session = await self._async_session_reads.get_record(token)
+        if not session:
+            # A replica may not have the session verify-otp just wrote yet.
+            session = await asyncio.to_thread(self._sessions.get_record, token)
+        if not session:
+            return None, None
+
+        now = utc_now()
+        user = None
+        if now <= session.expires_at:
+            user = await self._async_user_reads.get_record(session.user_id)
+            if not user:
+                user = await asyncio.to_thread(self._users.get_record, session.user_id)
+        if not user:
+            await run_write_async(self._db, self._writer, lambda db: SessionRepository(db).delete(token))
+            return None, None
+
+        rotation = self._rotation(session, now)
+        if rotation is None:
+            return user, None
+        new_token, rotate = rotation
+        await run_write_async(self._db, self._writer, rotate)
+        return user, new_token
+
+    @staticmethod
+    def _rotation(session: SessionRecord, now: datetime) -> tuple[str, Callable[[Session], None]] | None:
+        """The replacement token and its write intent once the session is old enough to rotate."""
         rotate_after_ms = settings.session_rotate_after_ms
-        if rotate_after_ms > 0:
-            age_ms = int((now - session.created_at).total_seconds() * 1000)
-            if age_ms >= rotate_after_ms:
-                new_token = random_session_token()
-                expires_at = now + timedelta(milliseconds=settings.session_ttl_ms)
-                self._sessions.create(token=new_token, user_id=session.user_id, created_at=now, expires_at=expires_at)
-                self._sessions.delete(token)
-                self._db.commit()
-                return user, new_token
+        if rotate_after_ms <= 0:
+            return None
+        age_ms = int((now - session.created_at).total_seconds() * 1000)
+        if age_ms < rotate_after_ms:
+            return None
+
+        new_token = random_session_token()
+        expires_at = now + timedelta(milliseconds=settings.session_ttl_ms)
 
-        return user, None
+        def rotate(db: Session) -> None:
+            sessions = SessionRepository(db)
+            sessions.create(token=new_token, user_id=session.user_id, created_at=now, expires_at=expires_at)
+            sessions.delete(session.token)
 
-    def get_user_by_session_token(self, token: str | None) -> User | None:
+        return new_token, rotate
+
+    def get_user_by_session_token(self, token: str | None) -> UserRecord | None:
         user, _rotated = self.authenticate_session(token)
         return user
 
@@ -204,12 +281,11 @@ class AuthService:
         self._sessions.delete(token)
         self._db.commit()
 
-    def update_profile(self, user: User, *, name_raw: str) -> User:
+    def update_profile(self, user: UserRecord, *, name_raw: str) -> UserRecord:
         name = name_raw.strip() if isinstance(name_raw, str) else ''
         if not name or len(name) > 50:
             raise InvalidNameError()
 
-        user.name = name
+        updated = self._users.update_name(user.id, name)
         self._db.commit()
-        self._db.refresh(user)
-        return user
+        return updated or user
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class CatalogProduct:
+    id: str
+    title: str
+    price: float
+
+
+@dataclass(frozen=True)
+class CatalogIndex:
+    """Immutable product-id -> price/title map for one version of the menu."""
+
+    version: int
+    products: dict[str, CatalogProduct]
+
+    @classmethod
+    def build(cls, menu_items: Iterable[dict[str, Any]], *, version: int) -> 'CatalogIndex':
+        products: dict[str, CatalogProduct] = {}
+        for item in menu_items:
+            product_id = str(item.get('id') or '').strip()
+            if not product_id:
+                continue
+            try:
+                price = float(item.get('price') or 0)
+            except (TypeError, ValueError):
+                continue
+            products[product_id] = CatalogProduct(id=product_id, title=str(item.get('title') or ''), price=price)
+        return cls(version=version, products=products)
+
+    def get(self, product_id: str) -> CatalogProduct | None:
+        return self.products.get(product_id)
+
+    def __len__(self) -> int:
+        return len(self.products)
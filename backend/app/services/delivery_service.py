@@ -3,11 +3,16 @@ from __future__ import annotations
 import json
 import logging
 import math
+import os
+import threading
 import time
 import urllib.parse
-import urllib.request
-import urllib.error
+from collections import Counter
 from dataclasses import dataclass
+from pathlib import Path
+
+from ..core.settings import REPO_DIR
+from ..utils.http import HttpStatusError, HttpTransport, get_default_transport
 
 
 RESTAURANT_COORDS = {'lat': 43.096362, 'lon': 131.916723}
@@ -17,6 +22,17 @@ logger = logging.getLogger(__name__)
 
 FALLBACK_DRIVING_DISTANCE_FACTOR = 1.25
 
+# Distinct addresses whose lookup counts are kept in memory; past this the rarest half is dropped.
+_HOT_ADDRESS_CAP = 2000
+
+
+def get_delivery_hot_addresses_path() -> Path:
+    raw = (os.getenv('DELIVERY_HOT_ADDRESSES_PATH') or '').strip()
+    if raw:
+        path = Path(raw)
+        return path if path.is_absolute() else (REPO_DIR / path)
+    return REPO_DIR / '.cache' / 'delivery_addresses.json'
+
 
 @dataclass(frozen=True)
 class GeocodeResult:
@@ -42,6 +58,7 @@ class DeliveryService:
         geocoder_provider: str = 'photon',
         nominatim_base_url: str = 'https://nominatim.openstreetmap.org',
         photon_base_url: str = 'https://photon.komoot.io',
+        transport: HttpTransport | None = None,
     ) -> None:
         self._cache_ttl_ms = max(0, int(cache_ttl_ms))
         self._user_agent = (user_agent or '').strip() or 'obedi-vl/1.0 (server)'
@@ -50,12 +67,21 @@ class DeliveryService:
         self._photon_base_url = (photon_base_url or '').strip().rstrip('/') or 'https://photon.komoot.io'
         self._cache: dict[str, tuple[ZoneResult, int]] = {}
         self._osrm_disabled_until_ms: int = 0
+        self._transport = transport or get_default_transport()
+        # Lookup counts per normalized address (and the text last seen for it), for startup warm-up.
+        self._hits: Counter[str] = Counter()
+        self._hit_addresses: dict[str, str] = {}
+        self._hits_lock = threading.Lock()
 
     def resolve_zone(self, address: str) -> dict[str, object]:
         key = (address or '').strip().lower()
         if not key:
             return self._serialize(ZoneResult(found=False, formatted_address='', distance=0, zone=None))
 
+        self._record_hit(key, address.strip())
+        return self._resolve_zone(key, address)
+
+    def _resolve_zone(self, key: str, address: str) -> dict[str, object]:
         cached = self._get_cached(key)
         if cached:
             return self._serialize(cached)
@@ -106,6 +132,74 @@ class DeliveryService:
             logger.exception('Delivery zone lookup failed')
             return self._serialize(ZoneResult(found=False, formatted_address='', distance=0, zone=None))
 
+    def hot_addresses(self, limit: int) -> list[tuple[str, int]]:
+        """Most looked-up addresses that resolved to a zone, as (address, lookups)."""
+        with self._hits_lock:
+            ranked = self._hits.most_common()
+            addresses = dict(self._hit_addresses)
+        hot: list[tuple[str, int]] = []
+        for key, hits in ranked:
+            cached = self._cache.get(key)
+            if cached is not None and not cached[0].found:
+                continue
+            hot.append((addresses[key], hits))
+            if len(hot) >= limit:
+                break
+        return hot
+
+    def save_hot_addresses(self, path: Path, *, limit: int) -> int:
+        """Write the top `limit` addresses to `path` (temp file + rename); returns how many."""
+        hot = self.hot_addresses(limit)
+        if not hot:
+            return 0
+        payload = {'addresses': [{'address': address, 'hits': hits} for address, hits in hot]}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp_path, path)
+        return len(hot)
+
+    def warm_hot_addresses(self, path: Path, *, limit: int, deadline: float | None = None) -> int:
+        """
+        Resolve the addresses saved by `save_hot_addresses` (most looked-up first) into the zone
+        cache, one at a time so the geocoder sees no burst, until `deadline` (time.monotonic()).
+        Their counts seed this process's ranking. Returns how many were resolved.
+        """
+        try:
+            payload = json.loads(path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError):
+            logger.warning('Unreadable delivery address snapshot: %s', path)
+            return 0
+
+        entries = payload.get('addresses') if isinstance(payload, dict) else None
+        resolved = 0
+        for entry in (entries if isinstance(entries, list) else [])[: max(0, limit)]:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            address = entry.get('address') if isinstance(entry, dict) else None
+            hits = entry.get('hits') if isinstance(entry, dict) else None
+            if not isinstance(address, str) or not address.strip():
+                continue
+            key = address.strip().lower()
+            with self._hits_lock:
+                self._hits[key] += max(0, hits) if isinstance(hits, int) else 0
+                self._hit_addresses.setdefault(key, address.strip())
+            if self._get_cached(key) is None:
+                self._resolve_zone(key, address)
+                resolved += 1
+        return resolved
+
+    def _record_hit(self, key: str, address: str) -> None:
+        with self._hits_lock:
+            self._hits[key] += 1
+            self._hit_addresses[key] = address
+            if len(self._hits) > _HOT_ADDRESS_CAP:
+                kept = dict(self._hits.most_common(_HOT_ADDRESS_CAP // 2))
+                self._hits = Counter(kept)
+                self._hit_addresses = {key: self._hit_addresses[key] for key in kept}
+
     def _serialize(self, value: ZoneResult) -> dict[str, object]:
         if not value.found:
             return {'found': False, 'formattedAddress': value.formatted_address, 'distance': 0, 'zone': None}
@@ -129,6 +223,13 @@ class DeliveryService:
             return None
         return value
 
+    def purge_expired_cache(self) -> int:
+        now_ms = self._now_ms()
+        expired = [key for key, (_value, expires_at_ms) in list(self._cache.items()) if now_ms > expires_at_ms]
+        for key in expired:
+            self._cache.pop(key, None)
+        return len(expired)
+
     def _set_cached(self, key: str, value: ZoneResult, *, ttl_ms: int | None = None) -> None:
         effective_ttl_ms = self._cache_ttl_ms if ttl_ms is None else max(0, int(ttl_ms))
         if effective_ttl_ms <= 0:
@@ -169,10 +270,8 @@ class DeliveryService:
         return earth_radius_km * c
 
     def _request_json(self, url: str, *, timeout: int = 8, headers: dict[str, str] | None = None) -> object | None:
-        request = urllib.request.Request(url, headers=headers or {'User-Agent': self._user_agent})
-        with urllib.request.urlopen(request, timeout=timeout) as response:
-            payload = response.read().decode('utf-8', errors='replace')
-            return json.loads(payload or 'null')
+        response = self._transport.get(url, headers=headers or {'User-Agent': self._user_agent}, timeout_sec=timeout)
+        return response.raise_for_status().json()
 
     def _normalize_geocoder_provider(self, raw_value: str) -> str:
         value = (raw_value or '').strip().lower()
@@ -212,13 +311,9 @@ class DeliveryService:
 
         try:
             data = self._request_json(url, timeout=7, headers={'User-Agent': self._user_agent})
-        except urllib.error.HTTPError as exc:
-            body = ''
-            try:
-                body = exc.read().decode('utf-8', errors='replace')
-            except Exception:
-                body = ''
-            logger.warning('Nominatim geocoding blocked (%s): %s', exc.code, body[:200])
+        except HttpStatusError as exc:
+            body = exc.text()
+            logger.warning('Nominatim geocoding blocked (%s): %s', exc.status, body[:200])
             return None, True
         except Exception:
             logger.exception('Nominatim geocoding request failed')
@@ -271,13 +366,9 @@ class DeliveryService:
 
         try:
             data = self._request_json(url, timeout=7, headers={'User-Agent': self._user_agent})
-        except urllib.error.HTTPError as exc:
-            body = ''
-            try:
-                body = exc.read().decode('utf-8', errors='replace')
-            except Exception:
-                body = ''
-            logger.warning('Photon geocoding failed (%s): %s', exc.code, body[:200])
+        except HttpStatusError as exc:
+            body = exc.text()
+            logger.warning('Photon geocoding failed (%s): %s', exc.status, body[:200])
             return None, True
         except Exception:
             logger.exception('Photon geocoding request failed')
@@ -327,13 +418,9 @@ class DeliveryService:
         )
         try:
             data = self._request_json(url, timeout=3)
-        except urllib.error.HTTPError as exc:
-            body = ''
-            try:
-                body = exc.read().decode('utf-8', errors='replace')
-            except Exception:
-                body = ''
-            logger.warning('OSRM request failed (%s): %s', exc.code, body[:200])
+        except HttpStatusError as exc:
+            body = exc.text()
+            logger.warning('OSRM request failed (%s): %s', exc.status, body[:200])
             self._osrm_disabled_until_ms = self._now_ms() + 5 * 60 * 1000
             return None, True
         except TimeoutError as exc:
@@ -52,6 +52,26 @@ class EmptyOrderError(ServiceError):
         super().__init__('Empty order', 400)
 
 
+class UnknownProductError(ServiceError):
+    def __init__(self, product_ids: list[str]) -> None:
+        super().__init__('Unknown product', 400, productIds=product_ids)
+
+
+class OrderNotFoundError(ServiceError):
+    def __init__(self) -> None:
+        super().__init__('Order not found', 404)
+
+
+class OrderConflictError(ServiceError):
+    def __init__(self, *, status: str, version: int) -> None:
+        super().__init__('Order conflict', 409, status=status, version=version)
+
+
+class NotEnoughPointsError(ServiceError):
+    def __init__(self) -> None:
+        super().__init__('Not enough points', 400)
+
+
 class SmsSendError(ServiceError):
     def __init__(self) -> None:
         super().__init__('Failed to send SMS', 502)
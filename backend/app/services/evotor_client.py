@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import hashlib
 import json
-import urllib.error
+import threading
 import urllib.parse
-import urllib.request
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any
 
+from ..utils.http import HttpTransport, get_default_transport
+
 
 @dataclass(frozen=True)
 class EvotorCloudToken:
@@ -17,24 +21,25 @@ class EvotorCloudToken:
 class EvotorClient:
     V2_MIME = 'application/vnd.evotor.v2+json'
 
-    def __init__(self, *, timeout_sec: int = 8, user_agent: str = 'obedi-vl/1.0 (server)') -> None:
+    def __init__(
+        self,
+        *,
+        timeout_sec: int = 8,
+        user_agent: str = 'obedi-vl/1.0 (server)',
+        transport: HttpTransport | None = None,
+    ) -> None:
         self._timeout_sec = timeout_sec
         self._user_agent = user_agent
+        self._transport = transport or get_default_transport()
+        # sha256(token) -> auth scheme that Evotor Cloud last accepted for it.
+        self._cloud_auth_schemes: dict[str, str] = {}
+        self._metrics_lock = threading.Lock()
+        self._cloud_auth_fallbacks = 0
 
     def _request(self, url: str, *, method: str = 'GET', headers: dict[str, str] | None = None) -> tuple[int, bytes]:
-        request = urllib.request.Request(url, method=method, headers=headers or {})
-        if 'User-Agent' not in request.headers:
-            request.add_header('User-Agent', self._user_agent)
-
-        try:
-            with urllib.request.urlopen(request, timeout=self._timeout_sec) as response:
-                return int(getattr(response, 'status', response.getcode())), response.read()
-        except urllib.error.HTTPError as error:
-            try:
-                body = error.read()
-            except Exception:
-                body = b''
-            return int(error.code), body
+        request_headers = {'User-Agent': self._user_agent, **(headers or {})}
+        response = self._transport.request(method, url, headers=request_headers, timeout_sec=self._timeout_sec)
+        return response.status, response.body
 
     def _request_json(self, url: str, *, method: str = 'GET', headers: dict[str, str] | None = None) -> tuple[int, Any]:
         status, body = self._request(url, method=method, headers=headers)
@@ -97,29 +102,37 @@ class EvotorClient:
                 return [item for item in items if isinstance(item, dict)]
         return []
 
-    def _cloud_headers(self, token: str) -> dict[str, str]:
-        auth_header = token if token.lower().startswith('bearer ') else f'Bearer {token}'
-        return {
+    def _cloud_headers(self, token: str, scheme: str = 'bearer') -> dict[str, str]:
+        headers = {
             'Accept': self.V2_MIME,
             'Content-Type': self.V2_MIME,
-            'Authorization': auth_header,
         }
+        if scheme == 'x-authorization':
+            headers['x-authorization'] = token
+        else:
+            headers['Authorization'] = token if token.lower().startswith('bearer ') else f'Bearer {token}'
+        return headers
 
     def fetch_cloud_json(self, url: str, cloud_token: str) -> Any:
         token = str(cloud_token or '').strip()
         if not token:
             raise ValueError('Evotor cloud token is required')
 
-        status, data = self._request_json(url, headers=self._cloud_headers(token))
+        token_key = hashlib.sha256(token.encode('utf-8')).hexdigest()
+        scheme = self._cloud_auth_schemes.get(token_key, 'bearer')
+
+        status, data = self._request_json(url, headers=self._cloud_headers(token, scheme))
         if status in (401, 403):
-            status, data = self._request_json(
-                url,
-                headers={
-                    'Accept': self.V2_MIME,
-                    'Content-Type': self.V2_MIME,
-                    'x-authorization': token,
-                },
-            )
+            fallback = 'bearer' if scheme == 'x-authorization' else 'x-authorization'
+            with self._metrics_lock:
+                self._cloud_auth_fallbacks += 1
+            fallback_status, fallback_data = self._request_json(url, headers=self._cloud_headers(token, fallback))
+            if fallback_status not in (401, 403):
+                scheme = fallback
+                status, data = fallback_status, fallback_data
+
+        if 200 <= status < 300:
+            self._cloud_auth_schemes[token_key] = scheme
 
         if status < 200 or status >= 300:
             details = json.dumps(data, ensure_ascii=False) if data is not None else ''
@@ -127,6 +140,18 @@ class EvotorClient:
 
         return data
 
+    def metrics(self) -> dict[str, object]:
+        with self._metrics_lock:
+            fallbacks = self._cloud_auth_fallbacks
+        schemes = list(self._cloud_auth_schemes.values())
+        return {
+            'cloudAuthFallbacks': fallbacks,
+            'cachedAuthSchemes': {
+                'bearer': schemes.count('bearer'),
+                'x-authorization': schemes.count('x-authorization'),
+            },
+        }
+
     def fetch_cloud_stores(self, cloud_token: str) -> list[dict[str, Any]]:
         data = self.fetch_cloud_json('https://api.evotor.ru/stores', cloud_token)
         if isinstance(data, list):
@@ -157,3 +182,68 @@ class EvotorClient:
             url = f'{url}?{urllib.parse.urlencode(params)}'
 
         return self.fetch_cloud_json(url, cloud_token)
+
+    @staticmethod
+    def _cloud_page(data: Any) -> tuple[list[dict[str, Any]], str | None]:
+        if isinstance(data, list):
+            return [item for item in data if isinstance(item, dict)], None
+        if not isinstance(data, dict):
+            return [], None
+
+        items = data.get('items')
+        paging = data.get('paging')
+        next_cursor = paging.get('next_cursor') if isinstance(paging, dict) else None
+        return (
+            [item for item in items if isinstance(item, dict)] if isinstance(items, list) else [],
+            next_cursor.strip() if isinstance(next_cursor, str) and next_cursor.strip() else None,
+        )
+
+    def iter_cloud_products(
+        self,
+        cloud_token: str,
+        store_id: str,
+        *,
+        since: str | int | None = None,
+        max_pages: int = 1000,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Walk every page of a store's products, yielding products one at a time.
+
+        The first page is fetched before returning, so token/store errors raise here rather
+        than on first iteration. While a page is being consumed the next one is already
+        in flight, and at most two pages are held in memory at once.
+        """
+        first_page = self.fetch_cloud_products(cloud_token, store_id, since=since)
+        return self._iter_cloud_pages(cloud_token, store_id, first_page, max_pages=max_pages)
+
+    def _iter_cloud_pages(
+        self,
+        cloud_token: str,
+        store_id: str,
+        first_page: Any,
+        *,
+        max_pages: int,
+    ) -> Iterator[dict[str, Any]]:
+        items, next_cursor = self._cloud_page(first_page)
+        seen_cursors: set[str] = set()
+        pages = 1
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='evotor_prefetch') as prefetcher:
+            while True:
+                pending = None
+                if next_cursor and next_cursor not in seen_cursors and pages < max_pages:
+                    seen_cursors.add(next_cursor)
+                    pending = prefetcher.submit(self.fetch_cloud_products, cloud_token, store_id, cursor=next_cursor)
+
+                try:
+                    yield from items
+                except GeneratorExit:
+                    if pending is not None:
+                        pending.cancel()
+                    raise
+
+                if pending is None:
+                    return
+
+                items, next_cursor = self._cloud_page(pending.result())
+                pages += 1
@@ -3,12 +3,16 @@ from __future__ import annotations
 import hashlib
 import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Any
 
 from ..core.settings import REPO_DIR
 from ..utils.cache import SimpleCache
-from ..utils.envfile import upsert_env_var
+from ..utils.runtime_config import RuntimeConfigStore
+from .catalog_index import CatalogIndex
 from .evotor_auth import EvotorWebhookAuth
 from .evotor_client import EvotorClient, EvotorCloudToken
 from .evotor_token_store import EvotorTokenStore
@@ -18,28 +22,38 @@ logger = logging.getLogger(__name__)
 FALLBACK_IMAGE = 'https://images.unsplash.com/photo-1504674900247-0877df9cc836?q=80&w=1000&auto=format&fit=crop'
 
 
-def _get_env_local_path() -> Path:
-    return REPO_DIR / '.env'
+CLOUD_TOKEN_KEY = 'EVOTOR_CLOUD_TOKEN'
+STORE_UUID_KEY = 'STORE_UUID'
+STORE_ID_KEY = 'EVOTOR_STORE_ID'
 
 
-def _get_evotor_token_store_path() -> Path:
-    raw = (os.getenv('EVOTOR_TOKEN_STORE_PATH') or '').strip()
+def _resolve_repo_path(env_name: str, default: Path) -> Path:
+    raw = (os.getenv(env_name) or '').strip()
     if raw:
         path = Path(raw)
         return path if path.is_absolute() else (REPO_DIR / path)
-    return REPO_DIR / '.evotor' / 'tokens.json'
+    return default
 
 
-def _get_evotor_cloud_token_env() -> str:
-    return (os.getenv('EVOTOR_CLOUD_TOKEN') or os.getenv('EVOTOR_TOKEN') or '').strip()
+def get_evotor_token_store_path() -> Path:
+    return _resolve_repo_path('EVOTOR_TOKEN_STORE_PATH', REPO_DIR / '.evotor' / 'tokens.json')
 
 
-def _get_evotor_store_uuid_env() -> str:
-    return (os.getenv('STORE_UUID') or '').strip()
+def get_evotor_runtime_config_path() -> Path:
+    return _resolve_repo_path('EVOTOR_RUNTIME_CONFIG_PATH', REPO_DIR / '.evotor' / 'runtime.json')
 
 
-def _get_evotor_store_id_env() -> str:
-    return (os.getenv('EVOTOR_STORE_ID') or '').strip()
+def _env_defaults() -> dict[str, str]:
+    """Startup values from the environment; read once, runtime updates go to the config store."""
+    return {
+        CLOUD_TOKEN_KEY: (os.getenv('EVOTOR_CLOUD_TOKEN') or os.getenv('EVOTOR_TOKEN') or '').strip(),
+        STORE_UUID_KEY: (os.getenv('STORE_UUID') or '').strip(),
+        STORE_ID_KEY: (os.getenv('EVOTOR_STORE_ID') or '').strip(),
+    }
+
+
+def create_runtime_config_store(path: Path | None = None) -> RuntimeConfigStore:
+    return RuntimeConfigStore(path or get_evotor_runtime_config_path(), defaults=_env_defaults())
 
 
 def _hash_string(value: str) -> int:
@@ -95,23 +109,37 @@ class EvotorService:
         auth: EvotorWebhookAuth,
         token_store: EvotorTokenStore,
         client: EvotorClient,
-        env_local_path: Path | None = None,
+        config: RuntimeConfigStore | None = None,
         cache_ttl_ms: int = 5 * 60 * 1000,  # 5 minutes default
+        fetch_workers: int = 4,
     ) -> None:
         self._auth = auth
         self._token_store = token_store
         self._client = client
-        self._env_local_path = env_local_path or _get_env_local_path()
+        self._config = config or create_runtime_config_store()
         self._cache = SimpleCache(ttl_ms=cache_ttl_ms)
+        self._fetch_pool = ThreadPoolExecutor(max_workers=max(1, int(fetch_workers)), thread_name_prefix='evotor_fetch')
+        self._catalog_lock = threading.Lock()
+        self._catalog_index: CatalogIndex | None = None
+        self._catalog_source: list[dict[str, Any]] | None = None
+        self._catalog_version = 0
 
     @classmethod
     def create_default(cls) -> 'EvotorService':
         return cls(
             auth=EvotorWebhookAuth(),
-            token_store=EvotorTokenStore(_get_evotor_token_store_path()),
+            token_store=EvotorTokenStore(get_evotor_token_store_path()),
             client=EvotorClient(),
         )
 
+    @property
+    def config(self) -> RuntimeConfigStore:
+        return self._config
+
+    @property
+    def client(self) -> EvotorClient:
+        return self._client
+
     def is_webhook_authorized(self, authorization_header: str | None) -> bool:
         return self._auth.is_authorized(authorization_header)
 
@@ -144,10 +172,9 @@ class EvotorService:
             source = f'tokenStore:{user_id}'
             return EvotorCloudToken(token=token, source=source)
 
-        env_token = _get_evotor_cloud_token_env()
-        if env_token:
-            source = 'env:EVOTOR_CLOUD_TOKEN' if (os.getenv('EVOTOR_CLOUD_TOKEN') or '').strip() else 'env:EVOTOR_TOKEN'
-            return EvotorCloudToken(token=env_token, source=source)
+        config_token = self._config.get(CLOUD_TOKEN_KEY)
+        if config_token:
+            return EvotorCloudToken(token=config_token, source=f'{self._config.source(CLOUD_TOKEN_KEY)}:{CLOUD_TOKEN_KEY}')
 
         return EvotorCloudToken(token='', source='none')
 
@@ -161,16 +188,9 @@ class EvotorService:
 
         self._token_store.upsert_user_token(user_id=user_id, token=token)
 
-        os.environ['EVOTOR_CLOUD_TOKEN'] = token
-        upsert_env_var(self._env_local_path, 'EVOTOR_CLOUD_TOKEN', token)
-
-        legacy_token = (os.getenv('EVOTOR_TOKEN') or '').strip()
-        if not legacy_token:
-            os.environ['EVOTOR_TOKEN'] = token
-            upsert_env_var(self._env_local_path, 'EVOTOR_TOKEN', token)
-
-        store_uuid = _get_evotor_store_uuid_env()
-        store_id = _get_evotor_store_id_env()
+        updates: dict[str, str] = {CLOUD_TOKEN_KEY: token}
+        store_uuid = self._config.get(STORE_UUID_KEY)
+        store_id = self._config.get(STORE_ID_KEY)
 
         if not store_uuid or not store_id:
             try:
@@ -180,29 +200,28 @@ class EvotorService:
                     if not store_id and isinstance(only.get('id'), (str, int)):
                         store_id = str(only.get('id')).strip()
                         if store_id:
-                            os.environ['EVOTOR_STORE_ID'] = store_id
-                            upsert_env_var(self._env_local_path, 'EVOTOR_STORE_ID', store_id)
+                            updates[STORE_ID_KEY] = store_id
                     if not store_uuid and isinstance(only.get('uuid'), str) and only.get('uuid').strip():
                         store_uuid = str(only.get('uuid')).strip()
-                        os.environ['STORE_UUID'] = store_uuid
-                        upsert_env_var(self._env_local_path, 'STORE_UUID', store_uuid)
+                        updates[STORE_UUID_KEY] = store_uuid
             except Exception as error:
                 try:
                     stores = self._client.fetch_v1_stores(token)
                     if not store_uuid and len(stores) == 1 and stores[0].get('uuid'):
                         store_uuid = str(stores[0].get('uuid')).strip()
                         if store_uuid:
-                            os.environ['STORE_UUID'] = store_uuid
-                            upsert_env_var(self._env_local_path, 'STORE_UUID', store_uuid)
+                            updates[STORE_UUID_KEY] = store_uuid
                 except Exception as fallback_error:
                     logger.exception('Evotor store auto-detect failed: %s', error)
                     logger.exception('Evotor store auto-detect fallback failed: %s', fallback_error)
 
+        self._config.set_many(updates)
+
         if store_uuid or store_id:
             self._token_store.upsert_user_token(user_id=user_id, token=token, store_id=store_id, store_uuid=store_uuid)
 
         # Invalidate cache when new token is received
-        self._cache.clear()
+        self._invalidate_menu()
 
         return {
             'ok': True,
@@ -213,9 +232,9 @@ class EvotorService:
 
     def token_status(self, query_user_id: str | None) -> dict[str, Any]:
         resolved = self.resolve_cloud_token(query_user_id)
-        env_token = _get_evotor_cloud_token_env()
-        env_store_id = _get_evotor_store_id_env()
-        env_store_uuid = _get_evotor_store_uuid_env()
+        env_token = self._config.get(CLOUD_TOKEN_KEY)
+        env_store_id = self._config.get(STORE_ID_KEY)
+        env_store_uuid = self._config.get(STORE_UUID_KEY)
 
         env_token_hash = hashlib.sha256(env_token.encode('utf-8')).hexdigest() if env_token else ''
 
@@ -244,6 +263,11 @@ class EvotorService:
         except Exception:
             rel_path = str(self._token_store.path)
 
+        try:
+            config_rel_path = str(self._config.path.relative_to(REPO_DIR))
+        except Exception:
+            config_rel_path = str(self._config.path)
+
         return {
             'ok': True,
             'env': {
@@ -253,6 +277,12 @@ class EvotorService:
                 'evotorStoreId': env_store_id or None,
                 'storeUuid': env_store_uuid or None,
             },
+            'runtimeConfig': {
+                'path': config_rel_path,
+                'version': self._config.version,
+                # 'runtime' (runtime.json), 'env' or 'none' per key; see RuntimeConfigStore.
+                'sources': {key: self._config.source(key) for key in (CLOUD_TOKEN_KEY, STORE_UUID_KEY, STORE_ID_KEY)},
+            },
             'tokenStore': {
                 'path': rel_path,
                 'users': users_list,
@@ -260,7 +290,7 @@ class EvotorService:
         }
 
     def list_stores(self) -> list[dict[str, str]]:
-        token = _get_evotor_cloud_token_env()
+        token = self._config.get(CLOUD_TOKEN_KEY)
         if not token:
             raise ValueError('EVOTOR_CLOUD_TOKEN is not configured')
 
@@ -283,8 +313,8 @@ class EvotorService:
         if not normalized:
             raise ValueError('storeUuid is required')
 
-        os.environ['STORE_UUID'] = normalized
-        upsert_env_var(self._env_local_path, 'STORE_UUID', normalized)
+        self._config.set(STORE_UUID_KEY, normalized)
+        self._invalidate_menu()
         return normalized
 
     def cloud_stores(self, query_user_id: str | None) -> tuple[list[dict[str, Any]], str]:
@@ -316,18 +346,131 @@ class EvotorService:
             resolved.source,
         )
 
+    def stream_cloud_products(
+        self,
+        *,
+        query_user_id: str | None,
+        store_id: str,
+        since: str | int | None,
+    ) -> tuple[Iterator[dict[str, Any]], str]:
+        resolved = self.resolve_cloud_token(query_user_id)
+        if not resolved.token:
+            raise ValueError('Evotor cloud token is not configured')
+        return self._client.iter_cloud_products(resolved.token, store_id, since=since), resolved.source
+
     def products_menu_items(self) -> list[dict[str, Any]]:
-        token = _get_evotor_cloud_token_env()
-        store_uuid = _get_evotor_store_uuid_env()
+        token = self._config.get(CLOUD_TOKEN_KEY)
+        store_uuid = self._config.get(STORE_UUID_KEY)
         if not token or not store_uuid:
             return []
 
         cache_key = f'products:v1:{store_uuid}'
+        items = self._cache.cached(cache_key, lambda: self._fetch_menu_items(token, store_uuid))
+        self._refresh_catalog_index(items)
+        return items
+
+    def sync_menu(self) -> int:
+        """
+        Refetch the default store's menu into the cache and catalog index, ignoring the cached
+        copy; run periodically so requests keep finding a warm menu. Returns the item count.
+        """
+        token = self._config.get(CLOUD_TOKEN_KEY)
+        store_uuid = self._config.get(STORE_UUID_KEY)
+        if not token or not store_uuid:
+            return 0
+
+        items = self._fetch_menu_items(token, store_uuid)
+        self._cache.set(f'products:v1:{store_uuid}', items)
+        self._refresh_catalog_index(items)
+        return len(items)
+
+    def catalog_index(self) -> CatalogIndex | None:
+        """
+        Index of the last menu served by `products_menu_items`, or None if no menu was loaded yet.
+        Never touches the network, so it is safe to call on the checkout path.
+        """
+        return self._catalog_index
+
+    def _refresh_catalog_index(self, items: list[dict[str, Any]]) -> None:
+        if self._catalog_source is items:
+            return
+        with self._catalog_lock:
+            if self._catalog_source is items:
+                return
+            self._catalog_version += 1
+            self._catalog_index = CatalogIndex.build(items, version=self._catalog_version)
+            self._catalog_source = items
+
+    def purge_expired_cache(self) -> int:
+        return self._cache.purge_expired()
+
+    def _invalidate_menu(self) -> None:
+        self._cache.clear()
+        with self._catalog_lock:
+            self._catalog_index = None
+            self._catalog_source = None
 
-        def fetch_products() -> list[dict[str, Any]]:
-            raw_items = self._client.fetch_v1_products(token, store_uuid)
-            items = [item for item in raw_items if float(item.get('price') or 0) > 0]
-            return [_map_evotor_to_menu_item(item) for item in items]
+    def _fetch_menu_items(self, token: str, store_uuid: str) -> list[dict[str, Any]]:
+        raw_items = self._client.fetch_v1_products(token, store_uuid)
+        items = [item for item in raw_items if float(item.get('price') or 0) > 0]
+        return [_map_evotor_to_menu_item(item) for item in items]
 
-        return self._cache.cached(cache_key, fetch_products)
+    def _menu_store_targets(self) -> list[tuple[str, str]]:
+        """(store_uuid, token) pairs: the configured default store first, then every token-store record."""
+        targets: dict[str, str] = {}
+
+        default_token = self._config.get(CLOUD_TOKEN_KEY)
+        default_store_uuid = self._config.get(STORE_UUID_KEY)
+        if default_token and default_store_uuid:
+            targets[default_store_uuid] = default_token
+
+        users = self._token_store.read().get('users')
+        if isinstance(users, dict):
+            for record in users.values():
+                rec = record if isinstance(record, dict) else {}
+                token = str(rec.get('token') or '').strip()
+                store_uuid = str(rec.get('storeUuid') or '').strip()
+                if token and store_uuid and store_uuid not in targets:
+                    targets[store_uuid] = token
+
+        return list(targets.items())
+
+    def multi_store_menu_items(self) -> list[dict[str, Any]]:
+        """
+        Menus of every known store, fetched concurrently on the bounded fetch pool.
+
+        The combined result is cached under one key; per-store entries are refreshed too,
+        so `products_menu_items` for the default store is warm afterwards.
+        """
+        cache_key = 'products:v1:all-stores'
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        targets = self._menu_store_targets()
+        futures = [
+            (store_uuid, self._fetch_pool.submit(self._fetch_menu_items, token, store_uuid))
+            for store_uuid, token in targets
+        ]
+
+        menus: list[dict[str, Any]] = []
+        failed = False
+        for store_uuid, future in futures:
+            try:
+                items = future.result()
+            except Exception:
+                logger.exception('Evotor menu fetch failed for store %s', store_uuid)
+                failed = True
+                menus.append({'storeUuid': store_uuid, 'ok': False, 'items': []})
+                continue
+
+            self._cache.set(f'products:v1:{store_uuid}', items)
+            menus.append({'storeUuid': store_uuid, 'ok': True, 'items': items})
+
+        if not failed:
+            self._cache.set(cache_key, menus)
+        return menus
+
+    def close(self) -> None:
+        self._fetch_pool.shutdown(wait=False, cancel_futures=True)
 
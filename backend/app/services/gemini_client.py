@@ -1,17 +1,25 @@
 from __future__ import annotations
 
 import json
-import urllib.error
 import urllib.parse
-import urllib.request
 from typing import Any
 
+from ..utils.http import HttpTransport, get_default_transport
+
 
 class GeminiClient:
-    def __init__(self, *, api_key: str, timeout_sec: int = 12, user_agent: str = 'obedi-vl/1.0 (server)') -> None:
+    def __init__(
+        self,
+        *,
+        api_key: str,
+        timeout_sec: int = 12,
+        user_agent: str = 'obedi-vl/1.0 (server)',
+        transport: HttpTransport | None = None,
+    ) -> None:
         self._api_key = api_key.strip()
         self._timeout_sec = timeout_sec
         self._user_agent = user_agent
+        self._transport = transport or get_default_transport()
 
     def _url(self, model: str) -> str:
         encoded_key = urllib.parse.quote(self._api_key, safe='')
@@ -36,22 +44,19 @@ class GeminiClient:
             payload['generationConfig'] = generation_config
 
         body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
-        request = urllib.request.Request(
+        response = self._transport.post(
             self._url(model),
-            data=body,
-            method='POST',
+            body=body,
             headers={
                 'Content-Type': 'application/json',
                 'User-Agent': self._user_agent,
             },
+            timeout_sec=self._timeout_sec,
         )
 
-        try:
-            with urllib.request.urlopen(request, timeout=self._timeout_sec) as response:
-                raw = response.read().decode('utf-8', errors='replace')
-        except urllib.error.HTTPError as error:
-            raw = error.read().decode('utf-8', errors='replace')
-            raise RuntimeError(f'Gemini request failed ({error.code}): {raw[:300]}') from error
+        raw = response.text()
+        if not response.ok:
+            raise RuntimeError(f'Gemini request failed ({response.status}): {raw[:300]}')
 
         try:
             data = json.loads(raw) if raw else {}
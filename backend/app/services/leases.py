@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import logging
+import os
+import secrets
+import socket
+import threading
+import time
+from collections.abc import Callable
+from datetime import timedelta
+
+from sqlalchemy.orm import Session
+
+from ..repositories.leases import LeaseRepository
+from ..utils.time import isoformat_z, utc_now
+
+logger = logging.getLogger(__name__)
+
+
+def default_holder_id() -> str:
+    """host:pid plus a random suffix, so a recycled pid never inherits a dead worker's lease."""
+    return f'{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(2)}'
+
+
+class LeaseManager:
+    """
+    Leader election between worker processes via rows in the `leases` table.
+
+    A heartbeat thread takes or renews every registered lease each `ttl_ms / 3`. A worker treats
+    itself as the holder only until two renewals could have been missed, which is before the row
+    expires for everyone else. If the holder dies, its row expires after `ttl_ms` and the next
+    heartbeat of another worker takes it over. `stop()` releases held leases right away.
+    """
+
+    def __init__(
+        self,
+        *,
+        session_factory: Callable[[], Session],
+        ttl_ms: int = 30_000,
+        holder: str | None = None,
+    ) -> None:
+        self.holder = holder or default_holder_id()
+        self._session_factory = session_factory
+        self._ttl_s = max(1.0, ttl_ms / 1000.0)
+        self._renew_interval_s = self._ttl_s / 3
+        self._names: list[str] = []
+        self._held_until: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def register(self, name: str) -> None:
+        with self._lock:
+            if name not in self._names:
+                self._names.append(name)
+
+    def is_leader(self, name: str) -> bool:
+        with self._lock:
+            return time.monotonic() < self._held_until.get(name, 0.0)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._heartbeat_loop, daemon=True, name='lease_heartbeat')
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self._renew_interval_s + 1)
+        self.release_all()
+
+    def renew(self) -> dict[str, bool]:
+        """Take or renew each registered lease once; returns name -> held."""
+        with self._lock:
+            names = list(self._names)
+
+        held: dict[str, bool] = {}
+        for name in names:
+            started = time.monotonic()
+            now = utc_now()
+            db = self._session_factory()
+            try:
+                acquired = LeaseRepository(db).try_acquire(
+                    name,
+                    holder=self.holder,
+                    now=now,
+                    expires_at=now + timedelta(seconds=self._ttl_s),
+                )
+                db.commit()
+            except Exception:
+                db.rollback()
+                logger.exception('lease_renew_failed', extra={'lease': name})
+                acquired = False
+            finally:
+                db.close()
+
+            with self._lock:
+                was_leader = started < self._held_until.get(name, 0.0)
+                if acquired:
+                    self._held_until[name] = started + self._ttl_s - self._renew_interval_s
+                elif was_leader:
+                    self._held_until.pop(name, None)
+            if acquired != was_leader:
+                logger.info('lease_acquired' if acquired else 'lease_lost', extra={'lease': name, 'holder': self.holder})
+            held[name] = acquired
+        return held
+
+    def release_all(self) -> None:
+        with self._lock:
+            names = [name for name, until in self._held_until.items() if time.monotonic() < until]
+            self._held_until.clear()
+        if not names:
+            return
+
+        db = self._session_factory()
+        try:
+            repo = LeaseRepository(db)
+            for name in names:
+                repo.release(name, holder=self.holder)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception('lease_release_failed')
+        finally:
+            db.close()
+
+    def snapshot(self) -> dict[str, object]:
+        """Who holds each lease, for the admin API."""
+        now = utc_now()
+        db = self._session_factory()
+        try:
+            records = LeaseRepository(db).list_all()
+        finally:
+            db.close()
+        return {
+            'worker': self.holder,
+            'leases': [
+                {
+                    'name': record.name,
+                    'holder': record.holder,
+                    'isSelf': record.holder == self.holder,
+                    'expired': record.expires_at < now,
+                    'acquiredAt': isoformat_z(record.acquired_at),
+                    'renewedAt': isoformat_z(record.renewed_at),
+                    'expiresAt': isoformat_z(record.expires_at),
+                }
+                for record in records
+            ],
+        }
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop_event.is_set():
+            self.renew()
+            self._stop_event.wait(self._renew_interval_s)
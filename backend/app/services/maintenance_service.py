@@ -2,70 +2,308 @@ from __future__ import annotations
 
 import logging
 import threading
-from collections.abc import Callable
-from datetime import datetime
+import time
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timezone
 
 from sqlalchemy.orm import Session
 
+from ..core.scheduler import CronTrigger, IntervalTrigger, Scheduler
+from ..repositories.orders import OrderRepository
 from ..repositories.otp_codes import OtpCodeRepository
 from ..repositories.sessions import SessionRepository
-from ..utils.time import utc_now
+from ..utils.time import isoformat_z, utc_now
+from .rate_limiter import FixedWindowRateLimiter
 
 logger = logging.getLogger(__name__)
 
+# Lease name (services/leases.py) that decides which worker runs the maintenance jobs.
+MAINTENANCE_LEASE = 'maintenance'
+
+EXPIRY_SWEEP_JOB = 'expiry_sweep'
+CACHE_PURGE_JOB = 'cache_purge'
+TRIM_ORDER_HISTORY_JOB = 'trim_order_history'
+SQLITE_CHECKPOINT_JOB = 'sqlite_checkpoint'
+
+# While a sweep leaves expired rows behind, the next one runs after this instead of the full interval.
+_BACKLOG_INTERVAL_S = 5.0
+_BACKLOG_COUNT_CAP = 10_000
+
+
+@dataclass
+class ExpiryStats:
+    """Totals for one TTL table or cache, plus what the last sweep left behind."""
+
+    deleted: int = 0
+    batches: int = 0
+    backlog: int = 0
+    lag_ms: int = 0
+    last_sweep_ms: float = 0.0
+    last_sweep_at: datetime | None = None
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            'deleted': self.deleted,
+            'batches': self.batches,
+            'backlog': self.backlog,
+            'lagMs': self.lag_ms,
+            'lastSweepMs': round(self.last_sweep_ms, 3),
+            'lastSweepAt': isoformat_z(self.last_sweep_at) if self.last_sweep_at else None,
+        }
+
+
+@dataclass(frozen=True)
+class _ExpiringTable:
+    name: str
+    # (db, limit) -> rows deleted; the sweeper commits after each call.
+    delete_batch: Callable[[Session, int], int]
+    # db -> (expired rows left, capped; age in ms of the oldest of them)
+    backlog: Callable[[Session], tuple[int, int]]
+
 
 class MaintenanceService:
-    def __init__(self, *, session_factory: Callable[[], Session]) -> None:
+    def __init__(
+        self,
+        *,
+        session_factory: Callable[[], Session],
+        order_history_keep: int = 50,
+        checkpoint: Callable[[], dict[str, int] | None] | None = None,
+        caches: Mapping[str, Callable[[], int]] | None = None,
+        sweep_batch_size: int = 500,
+        sweep_max_batches: int = 20,
+        is_leader: Callable[[str], bool] | None = None,
+    ) -> None:
         self._session_factory = session_factory
+        self._order_history_keep = max(1, int(order_history_keep))
+        # In-memory TTL caches swept alongside the tables: name -> purge function returning entries dropped.
+        self._caches = dict(caches or {})
+        self._sweep_batch_size = max(1, int(sweep_batch_size))
+        self._sweep_max_batches = max(1, int(sweep_max_batches))
+        self._expiry_stats: dict[str, ExpiryStats] = {}
+        self._backlogged = False
+        self._checkpoint = checkpoint
         self._stop_event = threading.Event()
-        self._thread: threading.Thread | None = None
-
-    def start_background_cleanup(self, *, interval_ms: int) -> None:
-        if interval_ms <= 0:
-            return
-        if self._thread and self._thread.is_alive():
-            return
-
-        self._thread = threading.Thread(
-            target=self._cleanup_loop,
-            args=(interval_ms,),
-            daemon=True,
-            name='maintenance_cleanup',
-        )
-        self._thread.start()
+        self._scheduler: Scheduler | None = None
+        # Leadership is re-checked between batches: a long sweep or trim must not outlive its lease.
+        self._is_leader = is_leader
+        self._lease: str | None = None
+
+    def register_jobs(
+        self,
+        scheduler: Scheduler,
+        *,
+        cleanup_interval_ms: int,
+        checkpoint_interval_ms: int,
+        trim_cron: str = '',
+        lease: str | None = MAINTENANCE_LEASE,
+    ) -> None:
+        """
+        Schedule the expiry sweep, cache purge, order-history trim and SQLite checkpoint as separate
+        jobs, so a long sweep does not hold back the checkpoint. Database jobs run under `lease`;
+        the cache purge runs in every worker. A non-positive interval disables a job.
+        """
+        self._scheduler = scheduler
+        self._lease = lease
+        if cleanup_interval_ms > 0:
+            interval_s = cleanup_interval_ms / 1000.0
+            scheduler.add_job(
+                EXPIRY_SWEEP_JOB,
+                self._sweep_job,
+                IntervalTrigger(interval_s),
+                jitter_s=min(30.0, interval_s / 10),
+                timeout_s=max(60.0, interval_s),
+                lease=lease,
+            )
+            if self._caches:
+                scheduler.add_job(
+                    CACHE_PURGE_JOB,
+                    self._cache_purge_job,
+                    IntervalTrigger(interval_s),
+                    jitter_s=min(30.0, interval_s / 10),
+                    timeout_s=60.0,
+                )
+            scheduler.add_job(
+                TRIM_ORDER_HISTORY_JOB,
+                self._trim_job,
+                CronTrigger(trim_cron) if trim_cron else IntervalTrigger(interval_s),
+                jitter_s=min(30.0, interval_s / 10),
+                timeout_s=max(60.0, interval_s),
+                lease=lease,
+            )
+        if self._checkpoint is not None and checkpoint_interval_ms > 0:
+            scheduler.add_job(
+                SQLITE_CHECKPOINT_JOB,
+                self._checkpoint_job,
+                IntervalTrigger(checkpoint_interval_ms / 1000.0),
+                timeout_s=60.0,
+                lease=lease,
+            )
 
     def stop(self) -> None:
+        """Make a running sweep or trim return after its current batch."""
         self._stop_event.set()
 
     def cleanup_expired(self, *, now: datetime | None = None) -> dict[str, int]:
+        """Sweep the TTL tables and purge the in-memory caches; rows/entries deleted per name."""
+        return {**self.sweep_expired_tables(now=now), **self.purge_expired_caches()}
+
+    def sweep_expired_tables(self, *, now: datetime | None = None) -> dict[str, int]:
+        """
+        Delete expired sessions, OTP codes and rate-limit buckets in chunks of `sweep_batch_size`,
+        one short transaction each, pausing between chunks for as long as the last one took so
+        request writes get the lock in between. A table gets at most `sweep_max_batches` chunks per
+        sweep; what is left shows up as backlog and lag in `expiry_metrics()` and brings the next
+        sweep forward.
+        """
         now_dt = now or utc_now()
+        now_ms = int(now_dt.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+        deleted: dict[str, int] = {}
+        tables = self._expiring_tables(now_dt, now_ms)
+        for table in tables:
+            if deleted and self._should_stop():
+                break
+            deleted[table.name] = self._sweep_table(table)
+
+        self._backlogged = any(self._expiry_stats[name].backlog for name in deleted)
+        return deleted
+
+    def purge_expired_caches(self) -> dict[str, int]:
+        """Per-process caches: every worker purges its own, so this job is never leased."""
+        return {name: self._purge_cache(name, purge) for name, purge in self._caches.items()}
+
+    def expiry_metrics(self) -> dict[str, object]:
+        return {name: stats.as_dict() for name, stats in list(self._expiry_stats.items())}
+
+    @staticmethod
+    def _expiring_tables(now: datetime, now_ms: int) -> list[_ExpiringTable]:
+        def lag_ms(oldest: datetime | None) -> int:
+            return max(0, int((now - oldest).total_seconds() * 1000)) if oldest else 0
+
+        def sessions_backlog(db: Session) -> tuple[int, int]:
+            count, oldest = SessionRepository(db).expired_backlog(now=now, cap=_BACKLOG_COUNT_CAP)
+            return count, lag_ms(oldest)
+
+        def otp_backlog(db: Session) -> tuple[int, int]:
+            count, oldest = OtpCodeRepository(db).expired_backlog(now=now, cap=_BACKLOG_COUNT_CAP)
+            return count, lag_ms(oldest)
+
+        def rate_limits_backlog(db: Session) -> tuple[int, int]:
+            count, oldest = FixedWindowRateLimiter(db).expired_backlog(now_ms=now_ms, cap=_BACKLOG_COUNT_CAP)
+            return count, max(0, now_ms - oldest) if oldest is not None else 0
+
+        return [
+            _ExpiringTable(
+                'sessions',
+                lambda db, limit: SessionRepository(db).delete_expired(now=now, limit=limit),
+                sessions_backlog,
+            ),
+            _ExpiringTable(
+                'otp_codes',
+                lambda db, limit: OtpCodeRepository(db).delete_expired(now=now, limit=limit),
+                otp_backlog,
+            ),
+            _ExpiringTable(
+                'rate_limits',
+                lambda db, limit: FixedWindowRateLimiter(db).cleanup_expired(now_ms=now_ms, limit=limit),
+                rate_limits_backlog,
+            ),
+        ]
+
+    def _sweep_table(self, table: _ExpiringTable) -> int:
+        stats = self._expiry_stats.setdefault(table.name, ExpiryStats())
+        started = time.perf_counter()
+        deleted = 0
         db = self._session_factory()
         try:
-            sessions = SessionRepository(db)
-            otps = OtpCodeRepository(db)
+            for _ in range(self._sweep_max_batches):
+                batch_started = time.perf_counter()
+                count = table.delete_batch(db, self._sweep_batch_size)
+                db.commit()
+                deleted += count
+                stats.batches += 1
+                if count < self._sweep_batch_size or self._should_stop():
+                    break
+                self._stop_event.wait(max(0.005, time.perf_counter() - batch_started))
+
+            stats.backlog, stats.lag_ms = table.backlog(db)
+        finally:
+            db.close()
 
-            deleted_sessions = sessions.delete_expired(now=now_dt)
-            deleted_otps = otps.delete_expired(now=now_dt)
+        stats.deleted += deleted
+        stats.last_sweep_ms = (time.perf_counter() - started) * 1000
+        stats.last_sweep_at = utc_now()
+        return deleted
 
-            if deleted_sessions or deleted_otps:
-                db.commit()
+    def _purge_cache(self, name: str, purge: Callable[[], int]) -> int:
+        stats = self._expiry_stats.setdefault(name, ExpiryStats())
+        started = time.perf_counter()
+        deleted = purge()
+        stats.deleted += deleted
+        stats.batches += 1
+        stats.last_sweep_ms = (time.perf_counter() - started) * 1000
+        stats.last_sweep_at = utc_now()
+        return deleted
+
+    def trim_order_history(self, *, max_users: int = 100) -> dict[str, int]:
+        """Keep only the newest `order_history_keep` orders per user, one short transaction per user."""
+        db = self._session_factory()
+        try:
+            orders = OrderRepository(db)
+            deleted_orders = 0
+            users = orders.users_over_limit(keep=self._order_history_keep, limit=max_users)
+            for user_id in users:
+                while True:
+                    deleted = orders.delete_stale(user_id, keep=self._order_history_keep)
+                    if not deleted:
+                        break
+                    db.commit()
+                    deleted_orders += deleted
+                    if self._should_stop():
+                        break
+                if self._should_stop():
+                    break
 
             return {
-                'deletedSessions': deleted_sessions,
-                'deletedOtps': deleted_otps,
+                'trimmedUsers': len(users),
+                'deletedOrders': deleted_orders,
             }
         finally:
             db.close()
 
-    def _cleanup_loop(self, interval_ms: int) -> None:
-        interval_s = max(0.1, interval_ms / 1000.0)
-        while not self._stop_event.is_set():
-            try:
-                result = self.cleanup_expired()
-                if result.get('deletedSessions') or result.get('deletedOtps'):
-                    logger.info('cleanup_expired', extra=result)
-            except Exception:
-                logger.exception('cleanup_expired_failed')
+    def _should_stop(self) -> bool:
+        if self._stop_event.is_set():
+            return True
+        if self._lease is not None and self._is_leader is not None and not self._is_leader(self._lease):
+            logger.warning('maintenance_lease_lost', extra={'lease': self._lease})
+            return True
+        return False
+
+    def checkpoint_database(self) -> dict[str, int] | None:
+        """Run the configured WAL checkpoint + PRAGMA optimize (SQLite only)."""
+        if self._checkpoint is None:
+            return None
+        return self._checkpoint()
+
+    def _sweep_job(self) -> None:
+        result = self.sweep_expired_tables()
+        if any(result.values()):
+            logger.info('cleanup_expired', extra=result)
+        if self._backlogged and self._scheduler is not None:
+            self._scheduler.reschedule(EXPIRY_SWEEP_JOB, delay_s=_BACKLOG_INTERVAL_S)
+
+    def _cache_purge_job(self) -> None:
+        purged = self.purge_expired_caches()
+        if any(purged.values()):
+            logger.info('purge_expired_caches', extra=purged)
 
-            self._stop_event.wait(interval_s)
+    def _trim_job(self) -> None:
+        trimmed = self.trim_order_history()
+        if trimmed.get('deletedOrders'):
+            logger.info('trim_order_history', extra=trimmed)
 
+    def _checkpoint_job(self) -> None:
+        checkpointed = self.checkpoint_database()
+        if checkpointed:
+            logger.info('sqlite_checkpoint', extra=checkpointed)
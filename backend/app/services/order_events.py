@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from ..db.models import Order
+from ..repositories.orders import OrderRepository
+from ..utils.time import isoformat_z, utc_now
+
+logger = logging.getLogger(__name__)
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def order_cursor(date: datetime, order_id: str) -> str:
+    """Resume cursor of a created order: zero-padded epoch microseconds + id, ordered like (date, id)."""
+    dt = date if date.tzinfo else date.replace(tzinfo=timezone.utc)
+    return f'{(dt - _EPOCH) // timedelta(microseconds=1):016d}:{order_id}'
+
+
+def parse_order_cursor(cursor: str) -> tuple[datetime, str] | None:
+    # A bare epoch-microseconds value is accepted too and means "everything after this instant".
+    date_us, _, order_id = (cursor or '').strip().partition(':')
+    if not date_us.isdigit() or len(date_us) > 16:
+        return None
+    date = (_EPOCH + timedelta(microseconds=int(date_us))).replace(tzinfo=None)
+    return date, order_id
+
+
+@dataclass(frozen=True)
+class OrderEvent:
+    type: str
+    payload: dict[str, Any]
+    # Only 'order.created' events carry a cursor; clients resume from the last one they saw.
+    cursor: str | None = None
+
+    @classmethod
+    def created(cls, order: Order) -> 'OrderEvent':
+        return cls(
+            type='order.created',
+            payload={
+                'id': order.id,
+                'userId': order.user_id,
+                'date': isoformat_z(order.date),
+                'items': order.items,
+                'total': order.total,
+                'status': order.status,
+                'version': order.version,
+            },
+            cursor=order_cursor(order.date, order.id),
+        )
+
+    @classmethod
+    def status_changed(cls, *, order_id: str, status: str, version: int | None = None) -> 'OrderEvent':
+        payload: dict[str, Any] = {'id': order_id, 'status': status}
+        if version is not None:
+            payload['version'] = version
+        return cls(type='order.status', payload=payload)
+
+
+@dataclass(eq=False)
+class OrderSubscription:
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue[OrderEvent | None]
+    overflowed: bool = field(default=False)
+
+
+class OrderEventBus:
+    """
+    In-process pub/sub for order events.
+
+    Publishers (request threads) hand events to each subscriber's asyncio queue via
+    `call_soon_threadsafe`. A subscriber that falls `queue_size` events behind gets a
+    `None` sentinel and should reconnect, resuming from its last cursor via `replay_after`.
+
+    Order dates are taken before the write commits, so orders can become visible out of date
+    order (group commit, concurrent checkouts). Catch-up therefore never trusts a cursor as a
+    high-water mark: it re-reads the last `lookback` of orders and drops the ids it already
+    delivered. While anyone is subscribed, one poller thread per process does this every
+    `poll_interval_s` to pick up orders written by other workers; subscribers never query.
+    Delivery is at-least-once across reconnects, so clients dedupe by order id.
+    """
+
+    def __init__(
+        self,
+        *,
+        session_factory: Callable[[], Session],
+        queue_size: int = 256,
+        poll_interval_s: float = 2.0,
+        lookback: timedelta = timedelta(minutes=2),
+        max_seen: int = 10_000,
+    ) -> None:
+        self._session_factory = session_factory
+        self._queue_size = max(1, int(queue_size))
+        self._poll_interval_s = max(0.1, float(poll_interval_s))
+        self._lookback = lookback
+        self._max_seen = max(1, int(max_seen))
+        self._lock = threading.Lock()
+        self._subscribers: set[OrderSubscription] = set()
+        # Created orders already delivered to this process's subscribers: id -> order date. Only
+        # tracked while someone is subscribed, and kept to `lookback` / `max_seen` entries.
+        self._seen: dict[str, datetime] = {}
+        self._poller: threading.Thread | None = None
+        self._stop_event = threading.Event()
+
+    def publish(self, event: OrderEvent) -> None:
+        if event.type == 'order.created' and not self._mark_seen(event):
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(self._offer, subscription, event)
+            except RuntimeError:
+                # Event loop already closed; the subscription is going away.
+                continue
+
+    @contextmanager
+    def subscribe(self) -> Iterator[OrderSubscription]:
+        subscription = OrderSubscription(loop=asyncio.get_running_loop(), queue=asyncio.Queue(self._queue_size + 1))
+        with self._lock:
+            self._subscribers.add(subscription)
+            self._ensure_poller()
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscription)
+                if not self._subscribers:
+                    self._seen.clear()
+
+    def replay_after(self, cursor: str, *, page_size: int = 200) -> list[OrderEvent]:
+        """Orders from `lookback` before the cursor on, oldest first; may repeat ones the client has."""
+        after = parse_order_cursor(cursor)
+        if after is None:
+            return []
+        return [OrderEvent.created(order) for order in self._created_since(after[0] - self._lookback, page_size)]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def close(self) -> None:
+        self._stop_event.set()
+        if self._poller is not None:
+            self._poller.join(timeout=5.0)
+
+    def _created_since(self, since: datetime, page_size: int) -> list[Order]:
+        db = self._session_factory()
+        try:
+            orders: list[Order] = []
+            after: tuple[datetime, str] = (since, '')
+            while True:
+                page = OrderRepository(db).list_created_after(after, limit=page_size)
+                orders.extend(page)
+                if len(page) < page_size:
+                    return orders
+                after = (page[-1].date, page[-1].id)
+        finally:
+            db.close()
+
+    def _mark_seen(self, event: OrderEvent) -> bool:
+        order_id = str(event.payload.get('id'))
+        with self._lock:
+            if not self._subscribers:
+                return True
+            if order_id in self._seen:
+                return False
+            parsed = parse_order_cursor(event.cursor or '')
+            self._seen[order_id] = parsed[0] if parsed else datetime.min
+            # Entries arrive roughly in date order, so trimming from the oldest insert is enough here;
+            # _poll_once drops any stragglers.
+            cutoff = utc_now() - self._lookback
+            while self._seen:
+                oldest_id, oldest_date = next(iter(self._seen.items()))
+                if oldest_date >= cutoff and len(self._seen) <= self._max_seen:
+                    break
+                del self._seen[oldest_id]
+            return True
+
+    def _ensure_poller(self) -> None:
+        if self._poller is not None and self._poller.is_alive():
+            return
+        self._poller = threading.Thread(target=self._poll_loop, daemon=True, name='order_events_poller')
+        self._poller.start()
+
+    def _poll_loop(self) -> None:
+        while not self._stop_event.wait(self._poll_interval_s):
+            if not self.subscriber_count():
+                continue
+            try:
+                self._poll_once()
+            except Exception:
+                logger.exception('order_events_poll_failed')
+
+    def _poll_once(self) -> None:
+        since = utc_now() - self._lookback
+        for order in self._created_since(since, 200):
+            self.publish(OrderEvent.created(order))
+        with self._lock:
+            self._seen = {order_id: date for order_id, date in self._seen.items() if date >= since}
+
+    def _offer(self, subscription: OrderSubscription, event: OrderEvent) -> None:
+        if subscription.overflowed:
+            return
+        if subscription.queue.qsize() >= self._queue_size:
+            subscription.overflowed = True
+            subscription.queue.put_nowait(None)
+            return
+        subscription.queue.put_nowait(event)
@@ -1,27 +1,189 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+import binascii
 import secrets
 import time
+from datetime import datetime
 from typing import Any
 
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from ..core.settings import settings
+from ..core.write_queue import WriteQueue, run_write
 from ..db.models import Order
-from ..repositories.orders import OrderRepository
+from ..repositories.loyalty import LoyaltyRepository
+from ..repositories.order_items import OrderItemRepository
+from ..repositories.orders import AsyncOrderRepository, OrderRepository, OrderSummary
+from ..repositories.sales_rollups import SalesRollupRepository
+from ..repositories.users import UserRepository
 from ..utils.time import utc_now
-from .errors import EmptyOrderError
+from .catalog_index import CatalogIndex
+from .errors import (
+    EmptyOrderError,
+    InvalidInputError,
+    NotEnoughPointsError,
+    OrderConflictError,
+    OrderNotFoundError,
+    UnknownProductError,
+)
+from .order_events import OrderEvent, OrderEventBus
+
+MAX_PAGE_SIZE = 50
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+MAX_BULK_TRANSITION = 500
+
+ORDER_STATUSES = ('pending', 'cooking', 'delivering', 'delivered', 'cancelled')
+
+# Statuses an order may move *from* to reach each target status; delivered/cancelled are final.
+_STATUS_SOURCES: dict[str, tuple[str, ...]] = {
+    'cooking': ('pending',),
+    'delivering': ('pending', 'cooking'),
+    'delivered': ('pending', 'cooking', 'delivering'),
+    'cancelled': ('pending', 'cooking', 'delivering'),
+}
+
+
+def encode_order_cursor(date: datetime, order_id: str) -> str:
+    raw = f'{date.isoformat()}|{order_id}'.encode('utf-8')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def decode_order_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        date_raw, order_id = raw.split('|', 1)
+        return datetime.fromisoformat(date_raw), order_id
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise InvalidInputError() from exc
 
 
 class OrderService:
-    def __init__(self, *, db: Session) -> None:
+    def __init__(
+        self,
+        *,
+        db: Session,
+        catalog: CatalogIndex | None = None,
+        events: OrderEventBus | None = None,
+        writer: WriteQueue | None = None,
+        read_db: Session | None = None,
+        async_read_db: AsyncSession | None = None,
+    ) -> None:
         self._db = db
+        self._events = events
+        self._writer = writer
+        # When a menu catalog is loaded, prices and titles come from it rather than the client.
+        self._catalog = catalog if catalog else None
         self._orders = OrderRepository(db)
+        # History reads go to the read engine; anything that precedes a write stays on `db`.
+        self._order_reads = OrderRepository(read_db) if read_db is not None else self._orders
+        self._async_order_reads = AsyncOrderRepository(async_read_db) if async_read_db is not None else None
+        self._users = UserRepository(db)
+
+    def list_orders(
+        self,
+        *,
+        user_id: str,
+        limit: int = MAX_PAGE_SIZE,
+        cursor: str | None = None,
+    ) -> tuple[list[Order], str | None]:
+        """One page of a user's orders (newest first) and the cursor of the next page."""
+        page_size = max(1, min(MAX_PAGE_SIZE, int(limit)))
+        before = decode_order_cursor(cursor) if cursor else None
+        rows = list(self._order_reads.list_for_user(user_id, limit=page_size + 1, before=before))
+        return self._page(rows, page_size)
+
+    def list_order_summaries(
+        self,
+        *,
+        user_id: str,
+        limit: int = MAX_PAGE_SIZE,
+        cursor: str | None = None,
+    ) -> tuple[list[OrderSummary], str | None]:
+        page_size = max(1, min(MAX_PAGE_SIZE, int(limit)))
+        before = decode_order_cursor(cursor) if cursor else None
+        rows = self._order_reads.list_summaries_for_user(user_id, limit=page_size + 1, before=before)
+        return self._page(rows, page_size)
+
+    def get_order(self, *, user_id: str, order_id: str) -> Order:
+        order = self._order_reads.get_for_user(user_id, order_id)
+        if not order:
+            raise OrderNotFoundError()
+        return order
+
+    async def list_orders_async(
+        self,
+        *,
+        user_id: str,
+        limit: int = MAX_PAGE_SIZE,
+        cursor: str | None = None,
+    ) -> tuple[list[Order], str | None]:
+        if self._async_order_reads is None:
+            return await asyncio.to_thread(self.list_orders, user_id=user_id, limit=limit, cursor=cursor)
+        page_size = max(1, min(MAX_PAGE_SIZE, int(limit)))
+        before = decode_order_cursor(cursor) if cursor else None
+        rows = list(await self._async_order_reads.list_for_user(user_id, limit=page_size + 1, before=before))
+        return self._page(rows, page_size)
+
+    async def list_order_summaries_async(
+        self,
+        *,
+        user_id: str,
+        limit: int = MAX_PAGE_SIZE,
+        cursor: str | None = None,
+    ) -> tuple[list[OrderSummary], str | None]:
+        if self._async_order_reads is None:
+            return await asyncio.to_thread(self.list_order_summaries, user_id=user_id, limit=limit, cursor=cursor)
+        page_size = max(1, min(MAX_PAGE_SIZE, int(limit)))
+        before = decode_order_cursor(cursor) if cursor else None
+        rows = await self._async_order_reads.list_summaries_for_user(user_id, limit=page_size + 1, before=before)
+        return self._page(rows, page_size)
+
+    async def get_order_async(self, *, user_id: str, order_id: str) -> Order:
+        if self._async_order_reads is None:
+            return await asyncio.to_thread(self.get_order, user_id=user_id, order_id=order_id)
+        order = await self._async_order_reads.get_for_user(user_id, order_id)
+        if not order:
+            raise OrderNotFoundError()
+        return order
+
+    @staticmethod
+    def _page(rows: list[Any], page_size: int) -> tuple[list[Any], str | None]:
+        if len(rows) <= page_size:
+            return rows, None
+        page = rows[:page_size]
+        last = page[-1]
+        return page, encode_order_cursor(last.date, last.id)
+
+    def create_order(
+        self,
+        *,
+        user_id: str,
+        items: list[dict[str, Any]],
+        idempotency_key: str | None = None,
+        redeem_points: int = 0,
+    ) -> Order:
+        """
+        Create an order. With an idempotency key, a retry of an already stored request
+        returns the original order instead of writing a new one.
 
-    def list_orders(self, *, user_id: str) -> list[Order]:
-        return list(self._orders.list_for_user(user_id))
+        Up to LOYALTY_MAX_REDEEM_PERCENT of the order can be paid with points; `total` is the
+        amount left to pay, and LOYALTY_ACCRUAL_PERCENT of it is credited back as points.
+        """
+        key = (idempotency_key or '').strip() or None
+        if key is not None:
+            if len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+                raise InvalidInputError()
+            existing = self._orders.get_by_idempotency_key(user_id, key)
+            if existing:
+                return existing
 
-    def create_order(self, *, user_id: str, items: list[dict[str, Any]]) -> Order:
         normalized: list[dict[str, Any]] = []
+        unknown_ids: list[str] = []
         for raw in items[:100]:
             if not isinstance(raw, dict):
                 continue
@@ -40,15 +202,30 @@ class OrderService:
                 quantity = 1
 
             quantity = max(1, min(99, quantity))
+            if self._catalog is not None and item_id:
+                product = self._catalog.get(item_id)
+                if product is None:
+                    unknown_ids.append(item_id)
+                    continue
+                title = product.title or title
+                price = product.price
+
             if not item_id or not title or price < 0:
                 continue
 
             normalized.append({**raw, 'id': item_id, 'title': title, 'price': price, 'quantity': quantity})
 
+        if unknown_ids:
+            raise UnknownProductError(unknown_ids)
+
         if len(normalized) == 0:
             raise EmptyOrderError()
 
-        total = sum(float(item.get('price', 0)) * int(item.get('quantity', 1)) for item in normalized)
+        subtotal = sum(float(item.get('price', 0)) * int(item.get('quantity', 1)) for item in normalized)
+        max_redeem = int(subtotal * max(0, settings.loyalty_max_redeem_percent) // 100)
+        redeemed = min(max(0, int(redeem_points or 0)), max_redeem)
+        total = subtotal - redeemed
+        earned = int(total * max(0, settings.loyalty_accrual_percent) // 100)
 
         order = Order(
             id=f'{int(time.time() * 1000)}_{secrets.token_hex(4)}',
@@ -57,15 +234,96 @@ class OrderService:
             items=normalized,
             total=total,
             status='pending',
+            idempotency_key=key,
+            points_redeemed=redeemed,
+            points_earned=earned,
         )
 
-        self._orders.add(order)
-        self._db.commit()
-        self._db.refresh(order)
+        def persist(db: Session) -> None:
+            loyalty = LoyaltyRepository(db)
+            if redeemed or earned:
+                if loyalty.apply_delta(user_id, delta=earned - redeemed, min_balance=redeemed) is None:
+                    raise NotEnoughPointsError()
+            OrderRepository(db).add(order)
+            OrderItemRepository(db).add_many(order.id, normalized)
+            loyalty.add_entries(
+                user_id,
+                [(-redeemed, 'redemption'), (earned, 'accrual')],
+                order_id=order.id,
+                now=order.date,
+            )
+            SalesRollupRepository(db).record_order(day=order.date.date(), items=normalized)
+
+        try:
+            run_write(self._db, self._writer, persist)
+        except IntegrityError:
+            # A concurrent request with the same key won the race; return its order.
+            self._db.rollback()
+            existing = self._orders.get_by_idempotency_key(user_id, key) if key else None
+            if existing:
+                return existing
+            raise
+
+        if self._events is not None:
+            self._events.publish(OrderEvent.created(order))
+
+        # History trimming runs in MaintenanceService.trim_order_history, off the checkout path.
+        return order
+
+    def loyalty_balance(self, user_id: str) -> int:
+        return self._users.get_loyalty_points(user_id) or 0
 
-        deleted = self._orders.delete_stale(user_id, keep=50)
-        if deleted:
+    def transition_status(self, *, order_id: str, status: str, expected_version: int) -> Order:
+        """
+        Move one order to `status` if it is still at `expected_version`. A stale version or a
+        transition that is not allowed from the current status raises OrderConflictError with
+        the current state, so the caller can refresh and retry.
+        """
+        sources = _STATUS_SOURCES.get(status)
+        if not sources:
+            raise InvalidInputError()
+
+        changed = self._orders.compare_and_set_status(
+            order_id,
+            expected_version=expected_version,
+            from_statuses=sources,
+            status=status,
+        )
+        if changed:
             self._db.commit()
+        else:
+            self._db.rollback()
 
+        order = self._orders.get(order_id)
+        if order is None:
+            raise OrderNotFoundError()
+        if not changed:
+            raise OrderConflictError(status=order.status, version=order.version)
+
+        if self._events is not None:
+            self._events.publish(OrderEvent.status_changed(order_id=order.id, status=order.status, version=order.version))
         return order
 
+    def bulk_transition_status(self, *, order_ids: list[str], status: str) -> tuple[list[tuple[str, int]], list[str]]:
+        """
+        Move many orders to `status` in one UPDATE. Orders whose current status does not allow
+        the transition (or that do not exist) are skipped. Returns ((id, version) updated, skipped ids).
+        """
+        sources = _STATUS_SOURCES.get(status)
+        if not sources:
+            raise InvalidInputError()
+
+        unique_ids = list(dict.fromkeys(str(order_id).strip() for order_id in order_ids if str(order_id).strip()))
+        if not unique_ids or len(unique_ids) > MAX_BULK_TRANSITION:
+            raise InvalidInputError()
+
+        updated = self._orders.bulk_set_status(unique_ids, from_statuses=sources, status=status)
+        self._db.commit()
+
+        updated_ids = {order_id for order_id, _ in updated}
+        skipped = [order_id for order_id in unique_ids if order_id not in updated_ids]
+
+        if self._events is not None:
+            for order_id, version in updated:
+                self._events.publish(OrderEvent.status_changed(order_id=order_id, status=status, version=version))
+        return updated, skipped
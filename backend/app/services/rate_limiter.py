@@ -1,26 +1,100 @@
 from __future__ import annotations
 
 import time
+from functools import cache
+from typing import Any
 
-from sqlalchemy import delete, update
+from sqlalchemy import Row, bindparam, case
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from ..core.write_queue import WriteQueue, run_write, run_write_async
 from ..db.models import RateLimit
+from ..db.upsert import dialect_insert
+from ..repositories.expiry import delete_expired_batch, expired_backlog
+
+
+@cache
+def _consume_statement(dialect: str) -> Any:
+    """
+    The whole check-and-count as one `INSERT ... ON CONFLICT (key) DO UPDATE ... RETURNING`.
+
+    A missing or expired bucket starts over at 1; otherwise the count goes up, stopping at
+    limit + 1 so a blocked key does not keep growing. A returned count above the limit means denied.
+    """
+    stmt = dialect_insert(dialect, RateLimit)
+    expired = RateLimit.reset_at_ms < bindparam('now_ms')
+    return stmt.on_conflict_do_update(
+        index_elements=[RateLimit.key],
+        set_={
+            'count': case(
+                (expired, 1),
+                (RateLimit.count <= bindparam('bucket_limit'), RateLimit.count + 1),
+                else_=RateLimit.count,
+            ),
+            'reset_at_ms': case((expired, stmt.excluded.reset_at_ms), else_=RateLimit.reset_at_ms),
+        },
+    ).returning(RateLimit.count, RateLimit.reset_at_ms)
+
+
+def _consume_params(key: str, limit: int, window_ms: int, now: int) -> dict[str, object]:
+    return {'key': key, 'count': 1, 'reset_at_ms': now + window_ms, 'now_ms': now, 'bucket_limit': limit}
+
+
+def _retry_after(row: Row[Any], limit: int, now: int) -> int | None:
+    count, reset_at_ms = row
+    return max(0, reset_at_ms - now) if count > limit else None
 
 
 class FixedWindowRateLimiter:
     """
-    Database-backed rate limiter using SQLite.
-    Thread-safe and works across multiple processes.
+    Database-backed rate limiter (SQLite or PostgreSQL).
+    Thread-safe and works across multiple processes: each consume is a single atomic upsert.
     """
-    def __init__(self, db: Session) -> None:
+    def __init__(
+        self,
+        db: Session,
+        *,
+        writer: WriteQueue | None = None,
+        async_db: AsyncSession | None = None,
+    ) -> None:
         self._db = db
+        self._writer = writer
+        self._async_db = async_db
 
     def consume(self, *, key: str, limit: int, window_ms: int, now_ms: int | None = None) -> int | None:
         """
         Try to consume from rate limit bucket.
         Returns None if allowed, or retry_after_ms if rate limited.
+        With a writer queue, the check-and-update runs on the writer thread and is group-committed.
         """
+        bucket = self._normalize(key, limit, window_ms, now_ms)
+        if bucket is None:
+            return None
+        return run_write(self._db, self._writer, lambda db: self._consume(db, *bucket))
+
+    async def consume_async(self, *, key: str, limit: int, window_ms: int, now_ms: int | None = None) -> int | None:
+        """
+        `consume` for `async def` routes: awaits the writer queue, or runs on the async session;
+        without either it falls back to the sync path in a worker thread.
+        """
+        bucket = self._normalize(key, limit, window_ms, now_ms)
+        if bucket is None:
+            return None
+
+        if self._writer is not None or self._async_db is None:
+            return await run_write_async(self._db, self._writer, lambda db: self._consume(db, *bucket))
+
+        try:
+            retry_after = await self._consume_async(self._async_db, *bucket)
+            await self._async_db.commit()
+        except Exception:
+            await self._async_db.rollback()
+            raise
+        return retry_after
+
+    @staticmethod
+    def _normalize(key: str, limit: int, window_ms: int, now_ms: int | None) -> tuple[str, int, int, int] | None:
         normalized_key = str(key or '').strip()
         if not normalized_key:
             normalized_key = 'unknown'
@@ -32,48 +106,32 @@ class FixedWindowRateLimiter:
             return None
 
         now = int(now_ms) if isinstance(now_ms, int) else int(time.time() * 1000)
+        return normalized_key, normalized_limit, normalized_window_ms, now
 
-        # Get or create bucket
-        bucket = self._db.get(RateLimit, normalized_key)
-
-        # Reset bucket if window expired
-        if bucket is None or now > bucket.reset_at_ms:
-            if bucket:
-                # Update existing bucket
-                bucket.count = 1
-                bucket.reset_at_ms = now + normalized_window_ms
-            else:
-                # Create new bucket
-                bucket = RateLimit(
-                    key=normalized_key,
-                    count=1,
-                    reset_at_ms=now + normalized_window_ms
-                )
-                self._db.add(bucket)
-            self._db.commit()
-            return None
+    @staticmethod
+    def _consume(db: Session, key: str, limit: int, window_ms: int, now: int) -> int | None:
+        connection = db.connection()
+        row = connection.execute(
+            _consume_statement(connection.dialect.name), _consume_params(key, limit, window_ms, now)
+        ).one()
+        return _retry_after(row, limit, now)
 
-        # Check if over limit
-        if bucket.count >= normalized_limit:
-            retry_after_ms = max(0, bucket.reset_at_ms - now)
-            return retry_after_ms
-
-        # Increment count atomically
-        stmt = (
-            update(RateLimit)
-            .where(RateLimit.key == normalized_key)
-            .values(count=RateLimit.count + 1)
-        )
-        self._db.execute(stmt)
-        self._db.commit()
-        return None
+    @staticmethod
+    async def _consume_async(db: AsyncSession, key: str, limit: int, window_ms: int, now: int) -> int | None:
+        connection = await db.connection()
+        row = (
+            await connection.execute(
+                _consume_statement(connection.dialect.name), _consume_params(key, limit, window_ms, now)
+            )
+        ).one()
+        return _retry_after(row, limit, now)
 
-    def cleanup_expired(self, *, now_ms: int | None = None) -> int:
-        """Remove expired rate limit buckets"""
+    def cleanup_expired(self, *, now_ms: int | None = None, limit: int = 1000) -> int:
+        """Remove up to `limit` expired rate limit buckets"""
         now = int(now_ms) if isinstance(now_ms, int) else int(time.time() * 1000)
-        result = self._db.execute(
-            delete(RateLimit).where(RateLimit.reset_at_ms < now)
-        )
+        deleted = delete_expired_batch(self._db, RateLimit.key, RateLimit.reset_at_ms, before=now, limit=limit)
         self._db.commit()
-        return int(getattr(result, 'rowcount', 0) or 0)
+        return deleted
 
+    def expired_backlog(self, *, now_ms: int, cap: int = 10_000) -> tuple[int, int | None]:
+        return expired_backlog(self._db, RateLimit.reset_at_ms, before=now_ms, cap=cap)
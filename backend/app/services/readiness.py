@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+
+from sqlalchemy import Engine, inspect
+
+from ..core.database import REQUIRED_TABLES, pool_status
+from ..core.write_queue import WriteQueue
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class SchemaCheck:
+    ok: bool
+    missing_tables: tuple[str, ...]
+
+
+class ReadinessProbe:
+    """
+    What `/api/ready` checks, kept cheap enough for an orchestrator probing every few seconds.
+
+    The schema is reflected at startup and, once every required table exists, never again. Until
+    then (a worker started before scripts/migrate.py finished) it is re-reflected at most once per
+    `ping_cache_ms`, so the probe turns ready without a restart once the migration lands.
+    Liveness is a `SELECT 1` reused for `ping_cache_ms`, run on one background thread and waited
+    on for at most `ping_timeout_ms`, so a stuck database or an exhausted pool fails the probe
+    quickly instead of piling up probe threads.
+    Pool saturation and writer-queue depth past their limits also report not ready, so the load
+    balancer sheds load before requests start queueing.
+    """
+
+    def __init__(
+        self,
+        *,
+        bind: Engine,
+        pools: dict[str, Engine],
+        write_queue: WriteQueue | None,
+        ping_timeout_ms: int = 500,
+        ping_cache_ms: int = 1000,
+        max_pool_saturation_percent: int = 100,
+        max_write_queue_depth: int = 1000,
+    ) -> None:
+        self._bind = bind
+        self._pools = dict(pools)
+        self._write_queue = write_queue
+        self._ping_timeout_s = max(1, int(ping_timeout_ms)) / 1000.0
+        self._ping_cache_s = max(0, int(ping_cache_ms)) / 1000.0
+        self._max_pool_saturation_percent = max(0, int(max_pool_saturation_percent))
+        self._max_write_queue_depth = max(0, int(max_write_queue_depth))
+
+        self._lock = threading.Lock()
+        self._schema: SchemaCheck | None = None
+        self._schema_checked_at: float | None = None
+        self._ping_ok = False
+        self._pinged_at: float | None = None
+        self._ping_inflight: Future[None] | None = None
+        self._ping_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ready_ping')
+
+    def verify_schema(self) -> SchemaCheck | None:
+        """Reflect the table list and remember the outcome; None if the database is unreachable."""
+        self._schema_checked_at = time.monotonic()
+        try:
+            tables = set(inspect(self._bind).get_table_names())
+        except Exception:
+            logger.exception('schema_check_failed')
+            self._schema = None
+            return None
+        check = SchemaCheck(ok=REQUIRED_TABLES.issubset(tables), missing_tables=tuple(sorted(REQUIRED_TABLES - tables)))
+        if not check.ok:
+            logger.error('schema_check_missing_tables', extra={'missingTables': list(check.missing_tables)})
+        self._schema = check
+        return check
+
+    def ping(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self._pinged_at is not None and now - self._pinged_at < self._ping_cache_s:
+                return self._ping_ok
+            if self._ping_inflight is None or self._ping_inflight.done():
+                self._ping_inflight = self._ping_pool.submit(self._ping_once)
+            inflight = self._ping_inflight
+
+        try:
+            inflight.result(timeout=self._ping_timeout_s)
+            ok = True
+        except FutureTimeoutError:
+            ok = False
+        except Exception:
+            logger.warning('ready_ping_failed', exc_info=True)
+            ok = False
+
+        with self._lock:
+            self._ping_ok = ok
+            self._pinged_at = time.monotonic()
+        return ok
+
+    def check(self) -> tuple[bool, dict[str, object]]:
+        """(ready, body) for `/api/ready`."""
+        if not self.ping():
+            return False, {'db': {'ok': False}}
+
+        schema = self._current_schema()
+        if schema is None:
+            return False, {'db': {'ok': True}, 'schema': {'ok': False}}
+        if not schema.ok:
+            return False, {'db': {'ok': True}, 'schema': {'ok': False, 'missingTables': list(schema.missing_tables)}}
+
+        pools = {name: pool_status(bind) for name, bind in self._pools.items()}
+        depth = self._write_queue.depth() if self._write_queue is not None else None
+        pools_ok = not self._max_pool_saturation_percent or all(
+            status is None or float(status['saturationPercent']) < self._max_pool_saturation_percent  # type: ignore[arg-type]
+            for status in pools.values()
+        )
+        queue_ok = not self._max_write_queue_depth or depth is None or depth < self._max_write_queue_depth
+        return pools_ok and queue_ok, {
+            'db': {'ok': True},
+            'schema': {'ok': True},
+            'load': {
+                'ok': pools_ok and queue_ok,
+                'pools': pools,
+                'writeQueueDepth': depth,
+            },
+        }
+
+    def close(self) -> None:
+        self._ping_pool.shutdown(wait=False, cancel_futures=True)
+
+    def _ping_once(self) -> None:
+        with self._bind.connect() as connection:
+            connection.exec_driver_sql('SELECT 1').scalar()
+
+    def _current_schema(self) -> SchemaCheck | None:
+        schema = self._schema
+        if schema is not None and schema.ok:
+            return schema
+        checked_at = self._schema_checked_at
+        if checked_at is not None and time.monotonic() - checked_at < self._ping_cache_s:
+            return schema
+        return self.verify_schema()
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from sqlalchemy.orm import Session
+
+from ..repositories.sales_rollups import SalesRollupRepository
+from ..utils.time import utc_now
+
+
+class ReportingService:
+    """Dashboard reads served from the pre-aggregated sales rollups (UTC days, today included)."""
+
+    def __init__(self, *, db: Session) -> None:
+        self._rollups = SalesRollupRepository(db)
+
+    def top_dishes(self, *, days: int, limit: int) -> list[dict[str, object]]:
+        since = utc_now().date() - timedelta(days=days - 1)
+        return self._rollups.top_products(since=since, limit=limit)
+
+    def revenue_by_day(self, *, days: int) -> list[dict[str, object]]:
+        since = utc_now().date() - timedelta(days=days - 1)
+        return self._rollups.revenue_by_day(since=since)
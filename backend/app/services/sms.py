@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-import json
 import urllib.parse
-import urllib.request
 from typing import Protocol
 
 from ..core.settings import Settings
+from ..utils.http import HttpTransport, get_default_transport
 
 
 class SmsSender(Protocol):
@@ -18,10 +17,11 @@ class ConsoleSmsSender:
 
 
 class SmsRuSender:
-    def __init__(self, *, api_id: str, sender: str, user_agent: str) -> None:
+    def __init__(self, *, api_id: str, sender: str, user_agent: str, transport: HttpTransport | None = None) -> None:
         self._api_id = api_id
         self._sender = sender
         self._user_agent = user_agent
+        self._transport = transport or get_default_transport()
 
     def send_otp(self, phone: str, code: str) -> None:
         text = f'Obedi VL: код {code}. Никому не сообщайте этот код.'
@@ -38,15 +38,17 @@ class SmsRuSender:
 
         params = urllib.parse.urlencode(query)
         url = f'https://sms.ru/sms/send?{params}'
-        request = urllib.request.Request(url, headers={'User-Agent': self._user_agent})
-        with urllib.request.urlopen(request, timeout=8) as response:
-            payload = response.read().decode('utf-8', errors='replace')
-            data = json.loads(payload or '{}')
-            if data.get('status') != 'OK':
-                raise RuntimeError(f'SMS.RU error: {payload}')
+        # Never retried: a repeated request would send a second SMS.
+        response = self._transport.get(url, headers={'User-Agent': self._user_agent}, timeout_sec=8, retries=0)
+        payload = response.text()
+        if not response.ok:
+            raise RuntimeError(f'SMS.RU request failed ({response.status}): {payload[:200]}')
+        data = response.json() or {}
+        if data.get('status') != 'OK':
+            raise RuntimeError(f'SMS.RU error: {payload}')
 
 
-def create_sms_sender(settings: Settings) -> SmsSender:
+def create_sms_sender(settings: Settings, *, transport: HttpTransport | None = None) -> SmsSender:
     if settings.sms_provider == 'console':
         return ConsoleSmsSender()
 
@@ -57,6 +59,7 @@ def create_sms_sender(settings: Settings) -> SmsSender:
             api_id=settings.sms_ru_api_id,
             sender=settings.sms_sender,
             user_agent='obedi-vl/1.0 (server)',
+            transport=transport,
         )
 
     raise RuntimeError(f'Unknown SMS_PROVIDER: {settings.sms_provider}')
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _TaskState:
+    state: str = 'pending'
+    duration_ms: float = 0.0
+    result: object = None
+    error: str | None = None
+
+
+class StartupWarmup:
+    """
+    Fills caches after a restart so the first requests don't pay for cold lookups.
+
+    The tasks run concurrently on their own threads, each getting the shared deadline
+    (time.monotonic()) to stop early. The warm-up is ready once every task has returned or the
+    budget has run out; tasks still running then keep going in the background, because threads
+    cannot be cancelled. `/ready` reports not ready until then, so rolling restarts only route
+    traffic to warm workers.
+    """
+
+    def __init__(self, tasks: Mapping[str, Callable[[float], object]], *, budget_ms: int) -> None:
+        self._tasks = dict(tasks)
+        self._budget_s = max(0, int(budget_ms)) / 1000.0
+        self._states = {name: _TaskState() for name in self._tasks}
+        self._lock = threading.Lock()
+        self._started_at: float | None = None
+        self._finished_at: float | None = None
+        self._timed_out = False
+
+    def start(self) -> None:
+        if self._started_at is not None:
+            return
+        self._started_at = time.monotonic()
+        if not self._tasks or self._budget_s <= 0:
+            self._finished_at = self._started_at
+            return
+        threading.Thread(target=self._run, daemon=True, name='startup_warmup').start()
+
+    def is_ready(self) -> bool:
+        if self._started_at is None:
+            return False
+        return self._finished_at is not None or time.monotonic() - self._started_at >= self._budget_s
+
+    def status(self) -> dict[str, object]:
+        started_at = self._started_at
+        finished_at = self._finished_at
+        with self._lock:
+            tasks = {
+                name: {
+                    'state': state.state,
+                    'durationMs': round(state.duration_ms, 3),
+                    'result': state.result,
+                    'error': state.error,
+                }
+                for name, state in self._states.items()
+            }
+        elapsed_s = 0.0
+        if started_at is not None:
+            elapsed_s = (finished_at if finished_at is not None else time.monotonic()) - started_at
+        return {
+            'ready': self.is_ready(),
+            'timedOut': self._timed_out or (finished_at is None and self.is_ready()),
+            'elapsedMs': round(elapsed_s * 1000, 3),
+            'budgetMs': round(self._budget_s * 1000),
+            'tasks': tasks,
+        }
+
+    def _run(self) -> None:
+        assert self._started_at is not None
+        deadline = self._started_at + self._budget_s
+        pool = ThreadPoolExecutor(max_workers=len(self._tasks), thread_name_prefix='warmup')
+        pending: set[Future[None]] = {
+            pool.submit(self._run_task, name, fn, deadline) for name, fn in self._tasks.items()
+        }
+        pool.shutdown(wait=False)
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._timed_out = True
+                break
+            _done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+
+        self._finished_at = time.monotonic()
+        logger.info(
+            'startup_warmup_finished',
+            extra={'elapsedMs': round((self._finished_at - self._started_at) * 1000), 'timedOut': self._timed_out},
+        )
+
+    def _run_task(self, name: str, fn: Callable[[float], object], deadline: float) -> None:
+        started = time.perf_counter()
+        with self._lock:
+            self._states[name].state = 'running'
+        try:
+            result = fn(deadline)
+        except Exception as exc:
+            logger.exception('startup_warmup_failed', extra={'task': name})
+            with self._lock:
+                state = self._states[name]
+                state.state = 'failed'
+                state.error = f'{type(exc).__name__}: {exc}'
+                state.duration_ms = (time.perf_counter() - started) * 1000
+            return
+
+        with self._lock:
+            state = self._states[name]
+            state.state = 'done'
+            state.result = result
+            state.duration_ms = (time.perf_counter() - started) * 1000
@@ -54,6 +54,14 @@ class SimpleCache:
         if normalized_key:
             self._cache.pop(normalized_key, None)
 
+    def purge_expired(self) -> int:
+        """Drop every expired entry (get() only drops the ones it is asked for); returns how many"""
+        now_ms = int(time.time() * 1000)
+        expired = [key for key, (timestamp_ms, _value) in list(self._cache.items()) if now_ms - timestamp_ms > self._ttl_ms]
+        for key in expired:
+            self._cache.pop(key, None)
+        return len(expired)
+
     def clear(self) -> None:
         """Clear all cached values"""
         self._cache.clear()
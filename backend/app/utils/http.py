@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import http.client
+import json
+import ssl
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass, field
+from typing import Any
+
+from ..core.settings import settings
+
+_IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+# Errors that mean the connection is unusable (stale keep-alive socket, reset by peer, ...).
+_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    http.client.CannotSendRequest,
+    http.client.ResponseNotReady,
+    ConnectionError,
+)
+
+
+@dataclass(frozen=True)
+class HttpResponse:
+    status: int
+    body: bytes
+    headers: dict[str, str]
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    def text(self) -> str:
+        return self.body.decode('utf-8', errors='replace')
+
+    def json(self) -> Any:
+        text = self.text()
+        return json.loads(text) if text else None
+
+    def raise_for_status(self) -> 'HttpResponse':
+        if not self.ok:
+            raise HttpStatusError(self.status, self.body)
+        return self
+
+
+class HttpStatusError(RuntimeError):
+    def __init__(self, status: int, body: bytes) -> None:
+        super().__init__(f'HTTP {status}')
+        self.status = status
+        self.body = body
+
+    def text(self) -> str:
+        return self.body.decode('utf-8', errors='replace')
+
+
+@dataclass
+class _HostMetrics:
+    requests: int = 0
+    errors: int = 0
+    server_errors: int = 0
+    retries: int = 0
+    connections_opened: int = 0
+    connections_reused: int = 0
+    total_latency_ms: float = 0.0
+    max_latency_ms: float = 0.0
+
+    def to_dict(self) -> dict[str, object]:
+        avg = self.total_latency_ms / self.requests if self.requests else 0.0
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'serverErrors': self.server_errors,
+            'retries': self.retries,
+            'connectionsOpened': self.connections_opened,
+            'connectionsReused': self.connections_reused,
+            'avgLatencyMs': round(avg, 2),
+            'maxLatencyMs': round(self.max_latency_ms, 2),
+        }
+
+
+@dataclass
+class _HostPool:
+    idle: list[http.client.HTTPConnection] = field(default_factory=list)
+    metrics: _HostMetrics = field(default_factory=_HostMetrics)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class HttpTransport:
+    """
+    Outbound HTTP client shared by all integrations (Evotor, SMS.RU, Gemini, geocoders).
+
+    Keeps up to `pool_size_per_host` idle keep-alive connections per (scheme, host, port),
+    so repeated calls skip DNS, TCP and TLS setup. Connection-level failures are retried up to
+    `max_retries` times for idempotent methods; other methods are retried only when the failure
+    came from a reused (possibly stale) pooled connection. Pass `retries=0` for calls that must
+    never be repeated. Timeouts are not retried. HTTP error statuses are returned, not raised;
+    use `HttpResponse.raise_for_status` when needed.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout_sec: float = 8.0,
+        max_retries: int = 1,
+        pool_size_per_host: int = 4,
+        user_agent: str = 'obedi-vl/1.0 (server)',
+    ) -> None:
+        self._timeout_sec = max(0.1, float(timeout_sec))
+        self._max_retries = max(0, int(max_retries))
+        self._pool_size = max(0, int(pool_size_per_host))
+        self._user_agent = user_agent
+        self._ssl_context = ssl.create_default_context()
+        self._pools: dict[tuple[str, str, int], _HostPool] = {}
+        self._pools_lock = threading.Lock()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        body: bytes | None = None,
+        timeout_sec: float | None = None,
+        retries: int | None = None,
+    ) -> HttpResponse:
+        method_norm = method.upper()
+        parsed = urllib.parse.urlsplit(url)
+        scheme = parsed.scheme.lower()
+        if scheme not in ('http', 'https') or not parsed.hostname:
+            raise ValueError(f'Unsupported URL: {url[:100]}')
+
+        port = parsed.port or (443 if scheme == 'https' else 80)
+        key = (scheme, parsed.hostname, port)
+        target = parsed.path or '/'
+        if parsed.query:
+            target = f'{target}?{parsed.query}'
+
+        request_headers = {'User-Agent': self._user_agent, 'Accept-Encoding': 'identity'}
+        request_headers.update(headers or {})
+
+        timeout = self._timeout_sec if timeout_sec is None else max(0.1, float(timeout_sec))
+        max_retries = self._max_retries if retries is None else max(0, int(retries))
+        pool = self._pool_for(key)
+
+        attempt = 0
+        started = time.perf_counter()
+        while True:
+            connection, reused = self._acquire(pool, key, timeout)
+            sent = False
+            try:
+                connection.request(method_norm, target, body=body, headers=request_headers)
+                sent = True
+                response = connection.getresponse()
+                payload = response.read()
+            except _CONNECTION_ERRORS as exc:
+                connection.close()
+                # A reused socket may have been closed by the server between requests, so
+                # non-idempotent calls get one retry when sending on a pooled connection failed.
+                # Once the request is out, the server may already have acted on it: no retry.
+                retry_stale = reused and attempt == 0 and not sent
+                if attempt < max_retries and (method_norm in _IDEMPOTENT_METHODS or retry_stale):
+                    attempt += 1
+                    self._record_retry(pool)
+                    continue
+                self._record(pool, started, error=True)
+                raise ConnectionError(f'{method_norm} {key[1]} failed: {exc}') from exc
+            except BaseException:
+                connection.close()
+                self._record(pool, started, error=True)
+                raise
+
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(pool, connection)
+
+            self._record(pool, started, error=False, status=response.status)
+            return HttpResponse(
+                status=int(response.status),
+                body=payload,
+                headers={name.lower(): value for name, value in response.getheaders()},
+            )
+
+    def get(self, url: str, **kwargs: Any) -> HttpResponse:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> HttpResponse:
+        return self.request('POST', url, **kwargs)
+
+    def metrics(self) -> dict[str, dict[str, object]]:
+        with self._pools_lock:
+            pools = list(self._pools.items())
+
+        snapshot: dict[str, dict[str, object]] = {}
+        for (scheme, host, port), pool in pools:
+            with pool.lock:
+                snapshot[f'{scheme}://{host}:{port}'] = {**pool.metrics.to_dict(), 'idleConnections': len(pool.idle)}
+        return snapshot
+
+    def close(self) -> None:
+        with self._pools_lock:
+            pools = list(self._pools.values())
+        for pool in pools:
+            with pool.lock:
+                idle, pool.idle = pool.idle, []
+            for connection in idle:
+                connection.close()
+
+    def _pool_for(self, key: tuple[str, str, int]) -> _HostPool:
+        with self._pools_lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = _HostPool()
+                self._pools[key] = pool
+            return pool
+
+    def _acquire(
+        self,
+        pool: _HostPool,
+        key: tuple[str, str, int],
+        timeout: float,
+    ) -> tuple[http.client.HTTPConnection, bool]:
+        with pool.lock:
+            connection = pool.idle.pop() if pool.idle else None
+            if connection is not None:
+                pool.metrics.connections_reused += 1
+            else:
+                pool.metrics.connections_opened += 1
+
+        if connection is not None:
+            connection.timeout = timeout
+            if connection.sock is not None:
+                connection.sock.settimeout(timeout)
+            return connection, True
+
+        scheme, host, port = key
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context), False
+        return http.client.HTTPConnection(host, port, timeout=timeout), False
+
+    def _release(self, pool: _HostPool, connection: http.client.HTTPConnection) -> None:
+        with pool.lock:
+            if len(pool.idle) < self._pool_size:
+                pool.idle.append(connection)
+                return
+        connection.close()
+
+    def _record(self, pool: _HostPool, started: float, *, error: bool, status: int = 0) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with pool.lock:
+            metrics = pool.metrics
+            metrics.requests += 1
+            metrics.total_latency_ms += elapsed_ms
+            metrics.max_latency_ms = max(metrics.max_latency_ms, elapsed_ms)
+            if error:
+                metrics.errors += 1
+            elif status >= 500:
+                metrics.server_errors += 1
+
+    def _record_retry(self, pool: _HostPool) -> None:
+        with pool.lock:
+            pool.metrics.retries += 1
+
+
+_default_transport: HttpTransport | None = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport() -> HttpTransport:
+    """Process-wide transport configured from `Settings`; shared by every outbound client."""
+    global _default_transport
+    if _default_transport is None:
+        with _default_transport_lock:
+            if _default_transport is None:
+                _default_transport = HttpTransport(
+                    timeout_sec=settings.http_timeout_ms / 1000.0,
+                    max_retries=settings.http_max_retries,
+                    pool_size_per_host=settings.http_pool_size_per_host,
+                )
+    return _default_transport
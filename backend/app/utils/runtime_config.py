@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from .time import isoformat_z, utc_now
+
+try:  # POSIX only; on other platforms writes are serialized per process.
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+
+def _fingerprint(value: str) -> str:
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+class RuntimeConfigStore:
+    """
+    Versioned key/value store for settings that change at runtime (Evotor token, store ids).
+
+    The document lives in a single JSON file that is replaced atomically (write temp + rename),
+    so readers never observe a partial write. Each process keeps an in-memory snapshot and only
+    re-reads the file when its stat signature changes, checked at most every `check_interval_ms`.
+    Writers take an exclusive lock file and bump `version`, so concurrent workers don't lose updates.
+
+    Every write also records a fingerprint of each startup default. If a default has changed
+    since then (e.g. EVOTOR_CLOUD_TOKEN rotated in the environment), the newer env value wins and
+    the stored copy is dropped at startup instead of silently shadowing it.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        defaults: Mapping[str, str] | None = None,
+        check_interval_ms: int = 1000,
+    ) -> None:
+        self._path = path
+        self._lock_path = path.with_name(path.name + '.lock')
+        self._defaults = {key: value for key, value in (defaults or {}).items() if value}
+        self._check_interval_s = max(0, int(check_interval_ms)) / 1000.0
+        self._lock = threading.Lock()
+        self._values: dict[str, str] = {}
+        self._version = 0
+        self._signature: tuple[int, int] | None = None
+        self._checked_at = 0.0
+        self._reload()
+        self._drop_stale_values()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def version(self) -> int:
+        self._maybe_reload()
+        return self._version
+
+    def get(self, key: str, default: str = '') -> str:
+        """Return the stored value, falling back to the startup env default."""
+        self._maybe_reload()
+        value = self._values.get(key)
+        if value:
+            return value
+        return self._defaults.get(key, default)
+
+    def source(self, key: str) -> str:
+        """Where `get(key)` resolves from: 'runtime', 'env' or 'none'."""
+        self._maybe_reload()
+        if self._values.get(key):
+            return 'runtime'
+        if self._defaults.get(key):
+            return 'env'
+        return 'none'
+
+    def snapshot(self) -> dict[str, str]:
+        self._maybe_reload()
+        return {**self._defaults, **{k: v for k, v in self._values.items() if v}}
+
+    def set(self, key: str, value: str) -> int:
+        return self.set_many({key: value})
+
+    def set_many(self, values: Mapping[str, str]) -> int:
+        """Persist several keys in one atomic write. Returns the new version."""
+        updates = {str(key): str(value if value is not None else '').strip() for key, value in values.items()}
+        if not updates:
+            return self.version
+
+        with self._lock, self._exclusive_file_lock():
+            document = self._read_document()
+            current = document.get('values') if isinstance(document.get('values'), dict) else {}
+            merged = {**current, **updates}
+            version = int(document.get('version') or 0) + 1
+            self._write_document(
+                {
+                    'version': version,
+                    'updatedAt': isoformat_z(utc_now()),
+                    'values': merged,
+                    'defaults': self._default_fingerprints(),
+                }
+            )
+            self._apply(merged, version)
+            self._signature = self._stat_signature()
+            self._checked_at = time.monotonic()
+            return version
+
+    def _default_fingerprints(self) -> dict[str, str]:
+        return {key: _fingerprint(value) for key, value in self._defaults.items()}
+
+    def _drop_stale_values(self) -> None:
+        """Drop stored values whose env default changed after they were written."""
+        if not self._defaults:
+            return
+        with self._lock, self._exclusive_file_lock():
+            document = self._read_document()
+            current = document.get('values') if isinstance(document.get('values'), dict) else {}
+            if not current:
+                return
+            recorded = document.get('defaults') if isinstance(document.get('defaults'), dict) else {}
+            fingerprints = self._default_fingerprints()
+            if recorded == fingerprints:
+                return
+            # A key without a recorded fingerprint predates this check; it only gets a baseline.
+            stale = [key for key, fingerprint in fingerprints.items() if key in current and recorded.get(key, fingerprint) != fingerprint]
+            values = {key: value for key, value in current.items() if key not in stale}
+            version = int(document.get('version') or 0) + 1
+            self._write_document(
+                {'version': version, 'updatedAt': isoformat_z(utc_now()), 'values': values, 'defaults': fingerprints}
+            )
+            self._apply(values, version)
+            self._signature = self._stat_signature()
+            self._checked_at = time.monotonic()
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now - self._checked_at < self._check_interval_s:
+            return
+        with self._lock:
+            if now - self._checked_at < self._check_interval_s:
+                return
+            self._checked_at = now
+            if self._stat_signature() != self._signature:
+                self._reload()
+
+    def _reload(self) -> None:
+        signature = self._stat_signature()
+        document = self._read_document()
+        values = document.get('values') if isinstance(document.get('values'), dict) else {}
+        self._apply(values, int(document.get('version') or 0))
+        self._signature = signature
+        self._checked_at = time.monotonic()
+
+    def _apply(self, values: Mapping[str, Any], version: int) -> None:
+        self._values = {str(k): str(v) for k, v in values.items() if isinstance(v, (str, int))}
+        self._version = version
+
+    def _stat_signature(self) -> tuple[int, int] | None:
+        try:
+            stat = self._path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_document(self) -> dict[str, Any]:
+        try:
+            content = self._path.read_text(encoding='utf-8')
+        except FileNotFoundError:
+            return {}
+        try:
+            data = json.loads(content) if content.strip() else {}
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _write_document(self, document: dict[str, Any]) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=f'.{self._path.name}.', dir=str(self._path.parent))
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as handle:
+                json.dump(document, handle, ensure_ascii=False)
+                handle.write('\n')
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.chmod(tmp_name, 0o600)
+            os.replace(tmp_name, self._path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except FileNotFoundError:
+                pass
+            raise
+
+    @contextmanager
+    def _exclusive_file_lock(self) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+
+        self._lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._lock_path, 'a+') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
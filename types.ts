@@ -41,5 +41,6 @@ export interface Order {
   date: string;
   items: CartItem[];
   total: number;
-  status: 'pending' | 'delivered';
+  status: 'pending' | 'cooking' | 'delivering' | 'delivered' | 'cancelled';
+  version?: number;
 }
\ No newline at end of file